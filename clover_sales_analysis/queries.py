@@ -37,6 +37,18 @@ class SalesQueries:
     GROUP BY coi.clover_name
     """
 
+    # Items of several orders in one round trip; format placeholders with one %s per order
+    GET_ITEMS_FOR_ORDERS = """
+    SELECT 
+        coi.order_id,
+        coi.clover_name,
+        COUNT(*) as quantity,
+        SUM(coi.final_price) as total_price
+    FROM clover_orders_items coi
+    WHERE coi.order_id IN ({placeholders})
+    GROUP BY coi.order_id, coi.clover_name
+    """
+
     GET_DAILY_SALES = """
     SELECT 
         DATE(created_time) as date,
@@ -101,4 +113,19 @@ class SalesQueries:
     GROUP BY 
         DATE(co.created_time), 
         WEEKDAY(co.created_time)
-    """
\ No newline at end of file
+    """
+
+    # Daily totals from the rollup maintained by DatabaseOperations.save_orders (shared/sales_rollup.py)
+    GET_DAILY_ROLLUP = """
+    SELECT 
+        date,
+        weekday,
+        SUM(total_sales) as total_sales,
+        SUM(total_tips) as total_tips,
+        SUM(total_mods) as total_mods,
+        SUM(order_discounts) as order_discounts,
+        SUM(item_discounts) as item_discounts
+    FROM clover_daily_rollup
+    WHERE level = 'platform' AND date BETWEEN %s AND %s
+    GROUP BY date, weekday
+    """
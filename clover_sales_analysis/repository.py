@@ -4,6 +4,7 @@ from typing import List, Dict, Any, Tuple, Optional
 import pandas as pd
 from decimal import Decimal
 from shared.database_manager import DatabaseManager
+from shared.sales_rollup import DailyRollup, SUMMARY_METRICS, rollup_days
 from clover_sales_analysis.queries import SalesQueries
 from clover_sales_analysis.models import Order, OrderItem
 
@@ -85,6 +86,21 @@ class SalesRepository:
             ) for item in results
         ]
 
+    def get_items_for_orders(self, order_ids: List[str]) -> Dict[str, List[OrderItem]]:
+        """Retrieve the items of several orders with one query, keyed by order ID."""
+        order_ids = list(dict.fromkeys(order_ids))
+        items: Dict[str, List[OrderItem]] = {order_id: [] for order_id in order_ids}
+        if not order_ids:
+            return items
+        query = SalesQueries.GET_ITEMS_FOR_ORDERS.format(placeholders=', '.join(['%s'] * len(order_ids)))
+        for item in self.db.fetch_all(query, tuple(order_ids)):
+            items.setdefault(item['order_id'], []).append(OrderItem(
+                clover_name=item['clover_name'],
+                quantity=item['quantity'],
+                total_price=Decimal(str(item['total_price']))
+            ))
+        return items
+
     def get_daily_summary(self, start_date: datetime, end_date: datetime) -> Tuple[Dict, Dict]:
         """
         Get daily sales summary and historical averages.
@@ -96,89 +112,31 @@ class SalesRepository:
         Returns:
             Tuple containing (current_day_summary, historical_summary)
         """
-        params = (start_date, end_date)
-
-        # Fetch all required data
-        sales_df = self._fetch_and_process_summary(
-            SalesQueries.GET_DAILY_SALES,
-            params,
-            'total_sales'
-        )
-
-        tips_df = self._fetch_and_process_summary(
-            SalesQueries.GET_DAILY_TIPS,
-            params,
-            'total_tips'
-        )
-
-        mods_df = self._fetch_and_process_summary(
-            SalesQueries.GET_DAILY_MODIFICATIONS,
-            params,
-            'total_mods'
-        )
-
-        order_discounts_df = self._fetch_and_process_summary(
-            SalesQueries.GET_ORDER_DISCOUNTS,
-            params,
-            'total_order_discounts'
-        )
-
-        item_discounts_df = self._fetch_and_process_summary(
-            SalesQueries.GET_ITEM_DISCOUNTS,
-            params,
-            'total_item_discounts'
-        )
-
-        # Initialize summaries
+        df = self._fetch_daily_rollup(start_date, end_date)
         current_day = {}
         historical_summary = {}
-
-        # Process each metric
-        metric_dfs = {
-            'total_sales': sales_df,
-            'total_tips': tips_df,
-            'total_mods': mods_df,
-            'order_discounts': order_discounts_df,
-            'item_discounts': item_discounts_df
-        }
+        if df.empty:
+            return current_day, historical_summary
 
         analysis_date = end_date.date() - pd.Timedelta(days=1)
-
-        for metric_name, df in metric_dfs.items():
-            if not df.empty:
-                # Get current day value
-                current_day_data = df[df['date'] == analysis_date]
-                if not current_day_data.empty:
-                    value_col = df.columns[2]  # The value column is always the third column
-                    current_day[metric_name] = float(current_day_data[value_col].iloc[0])
-
-                # Get historical average
-                historical_data = df[
-                    (df['date'] < analysis_date) &
-                    (df['weekday'] == analysis_date.weekday())
-                    ]
-                if not historical_data.empty:
-                    value_col = df.columns[2]  # The value column is always the third column
-                    historical_summary[f'avg_{metric_name}'] = float(historical_data[value_col].mean())
+        current_day_data = df[df['date'] == analysis_date]
+        historical_data = df[(df['date'] < analysis_date) & (df['weekday'] == analysis_date.weekday())]
+        for metric_name in SUMMARY_METRICS:
+            if not current_day_data.empty:
+                current_day[metric_name] = float(current_day_data[metric_name].iloc[0])
+            if not historical_data.empty:
+                historical_summary[f'avg_{metric_name}'] = float(historical_data[metric_name].mean())
 
         return current_day, historical_summary
 
-    def _fetch_and_process_summary(self, query: str, params: Tuple, value_column: str) -> pd.DataFrame:
-        """
-        Helper method to fetch and process summary data.
-
-        Args:
-            query: SQL query to execute
-            params: Query parameters
-            value_column: Name of the value column to process
-
-        Returns:
-            Processed DataFrame
-        """
-        results = self.db.fetch_all(query, params)
+    def _fetch_daily_rollup(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Daily totals (one row per date) from the sales rollup, built first if needed."""
+        DailyRollup(self.db._get_table_file).ensure_built()
+        results = self.db.fetch_all(SalesQueries.GET_DAILY_ROLLUP, rollup_days(start_date, end_date))
         df = pd.DataFrame(results)
         if not df.empty:
-            df[value_column] = df[value_column].apply(self._decimal_to_float)
+            for metric_name in SUMMARY_METRICS:
+                df[metric_name] = df[metric_name].apply(self._decimal_to_float).fillna(0.0)
         return df
 
     def get_order_by_id(self, order_id: str) -> Optional[Order]:
@@ -204,9 +162,10 @@ class SalesRepository:
         WHERE o.order_id = %s
         """
 
-        result = self.db.fetch_one(query, (order_id,))
-        if not result:
+        results = self.db.fetch_all(query, (order_id,))
+        if not results:
             return None
+        result = results[0]
 
         items = self.get_order_items(order_id)
 
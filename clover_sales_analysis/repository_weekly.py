@@ -5,6 +5,7 @@ import pandas as pd
 import streamlit as st
 from decimal import Decimal
 from shared.database_manager import DatabaseManager
+from shared.sales_rollup import DailyRollup, SUMMARY_METRICS, rollup_days
 from clover_sales_analysis.queries import SalesQueries
 from clover_sales_analysis.models import Order, OrderItem
 
@@ -49,20 +50,9 @@ class SalesRepository:
         df = pd.DataFrame(results)
         return self._process_dataframe(df, numeric_columns=['final_price'])
 
-    def get_order_items(self, order_id: str, connection=None) -> List[OrderItem]:
+    def get_order_items(self, order_id: str) -> List[OrderItem]:
         """Retrieve items for a specific order."""
-        if connection:
-            # Use existing connection
-            with connection.cursor(dictionary=True) as cursor:
-                cursor.execute(SalesQueries.GET_ORDER_ITEMS, (order_id,))
-                results = cursor.fetchall()
-        else:
-            # Create new connection
-            with self.db.pool.get_connection() as connection:
-                with connection.cursor(dictionary=True) as cursor:
-                    cursor.execute(SalesQueries.GET_ORDER_ITEMS, (order_id,))
-                    results = cursor.fetchall()
-
+        results = self.db.fetch_all(SalesQueries.GET_ORDER_ITEMS, (order_id,))
         return [
             OrderItem(
                 clover_name=item['clover_name'],
@@ -71,18 +61,40 @@ class SalesRepository:
             ) for item in results
         ]
 
+    def get_items_for_orders(self, order_ids: List[str]) -> Dict[str, List[OrderItem]]:
+        """Retrieve the items of several orders with one query, keyed by order ID."""
+        order_ids = list(dict.fromkeys(order_ids))
+        items: Dict[str, List[OrderItem]] = {order_id: [] for order_id in order_ids}
+        if not order_ids:
+            return items
+        query = SalesQueries.GET_ITEMS_FOR_ORDERS.format(placeholders=', '.join(['%s'] * len(order_ids)))
+        for item in self.db.fetch_all(query, tuple(order_ids)):
+            items.setdefault(item['order_id'], []).append(OrderItem(
+                clover_name=item['clover_name'],
+                quantity=item['quantity'],
+                total_price=Decimal(str(item['total_price']))
+            ))
+        return items
+
     def get_daily_summary(self, start_date: datetime, end_date: datetime) -> Tuple[Dict, Dict]:
-        """Get daily sales summary and historical averages."""
-        daily_mods = self._get_daily_modifications_totals((start_date, end_date))
-        return daily_mods, daily_mods
-
-    def _get_daily_modifications_totals(self, params: tuple) -> Dict:
-        """Get daily modifications and discounts totals."""
-        return {
-            'total_mods': 0,
-            'order_discounts': 0,
-            'item_discounts': 0
-        }
+        """
+        Get sales totals of the date range and their weekly averages, from the daily sales rollup.
+        Returns (range_totals, historical_summary) where historical_summary holds 'avg_<metric>'
+        averaged over the weeks of the range.
+        """
+        DailyRollup(self.db._get_table_file).ensure_built()
+        results = self.db.fetch_all(SalesQueries.GET_DAILY_ROLLUP, rollup_days(start_date, end_date))
+        df = pd.DataFrame(results)
+        if df.empty:
+            return {metric: 0.0 for metric in SUMMARY_METRICS}, {f'avg_{metric}': 0.0 for metric in SUMMARY_METRICS}
+
+        for metric in SUMMARY_METRICS:
+            df[metric] = df[metric].apply(self._decimal_to_float).fillna(0.0)
+        weekly = df.groupby(pd.to_datetime(df['date']).dt.strftime('%Y-%U'))[list(SUMMARY_METRICS)].sum()
+        return (
+            {metric: float(df[metric].sum()) for metric in SUMMARY_METRICS},
+            {f'avg_{metric}': float(weekly[metric].mean()) for metric in SUMMARY_METRICS},
+        )
 
     def get_order_by_id(self, order_id: str) -> Optional[Order]:
         """Retrieve a specific order by ID with all its items."""
@@ -100,27 +112,19 @@ class SalesRepository:
         """
 
         try:
-            with self.db.pool.get_connection() as connection:
-                with connection.cursor(dictionary=True) as cursor:
-                    cursor.execute(query, (order_id,))
-                    result = cursor.fetchone()
-                    cursor.fetchall()  # Consume any remaining results
-
-                    if not result:
-                        return None
-
-                    # Use the same connection for getting order items
-                    items = self.get_order_items(order_id, connection)
-
-                    return Order(
-                        order_id=result['order_id'],
-                        created_time=result['created_time'],
-                        total=Decimal(str(result['total'])),
-                        delivery_method=result['delivery_method'],
-                        delivery_platform=result['delivery_platform'],
-                        tip_amount=Decimal(str(result['tip_amount'])),
-                        items=items
-                    )
+            results = self.db.fetch_all(query, (order_id,))
+            if not results:
+                return None
+            result = results[0]
+            return Order(
+                order_id=result['order_id'],
+                created_time=result['created_time'],
+                total=Decimal(str(result['total'])),
+                delivery_method=result['delivery_method'],
+                delivery_platform=result['delivery_platform'],
+                tip_amount=Decimal(str(result['tip_amount'])),
+                items=self.get_order_items(order_id)
+            )
         except Exception as e:
             st.error(f"Error fetching order: {e}")
-            return None
\ No newline at end of file
+            return None
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Any
 import pandas as pd
 from clover_sales_analysis.repository import SalesRepository
+from shared.sales_outliers import period_totals, same_weekday_masks, to_records, tip_percentage, zscore_outliers
 
 
 class SalesAnalyzer:
@@ -43,216 +44,92 @@ class SalesAnalyzer:
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
         order_z_threshold = 3  # Specific threshold for orders
 
-        analysis_df = df[df['created_time'].dt.date == analysis_date.date()]
-        historical_df = df[
-            (df['created_time'].dt.date < analysis_date.date()) &
-            (df['weekday'] == weekday)
-            ]
-
-        if historical_df.empty or analysis_df.empty:
+        current, baseline = same_weekday_masks(df['created_time'].dt.date, df['weekday'], analysis_date.date())
+        outliers = zscore_outliers(df, 'total', current, baseline, order_z_threshold)
+        if outliers.empty:
             return []
 
-        mean_total = historical_df['total'].astype(float).mean()
-        std_total = historical_df['total'].astype(float).std()
-
-        if std_total == 0:
-            return []
-
-        outliers = []
-        for _, row in analysis_df.iterrows():
-            total = float(row['total'])
-            z_score = (total - mean_total) / std_total
-            if abs(z_score) > order_z_threshold:
-                order_items = self.repository.get_order_items(row['order_id'])
-
-                outliers.append({
-                    'order_id': row['order_id'],
-                    'total': total,
-                    'created_time': row['created_time'],
-                    'z_score': z_score,
-                    'historical_mean': mean_total,
-                    'deviation_percentage': ((total - mean_total) / mean_total) * 100,
-                    'delivery_method': row['delivery_method'],
-                    'delivery_platform': row['delivery_platform'],
-                    'tip_amount': row['tip_amount'],
-                    'items': order_items
-                })
-
-        return outliers
+        items = self.repository.get_items_for_orders(outliers['order_id'].tolist())
+        records = to_records(outliers, {
+            'order_id': 'order_id',
+            'total': 'total',
+            'created_time': 'created_time',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+            'delivery_method': 'delivery_method',
+            'delivery_platform': 'delivery_platform',
+            'tip_amount': 'tip_amount',
+        })
+        for record in records:
+            record['items'] = items.get(record['order_id'], [])
+        return records
+
+    def _daily_group_outliers(self, df: pd.DataFrame, analysis_date: datetime, key: str,
+                              first_cols: Tuple[str, ...] = ()) -> pd.DataFrame:
+        """Daily sales per `key` value compared with the same weekday in the lookback window"""
+        daily = period_totals(df.assign(date=df['created_time'].dt.date), [key], ['date', 'weekday'],
+                              'final_price', first_cols)
+        current, baseline = same_weekday_masks(daily['date'], daily['weekday'], analysis_date.date())
+        return zscore_outliers(daily, 'total_sales', current, baseline, self.z_score_threshold, keys=[key])
 
     def detect_item_outliers(self, df: pd.DataFrame, analysis_date: datetime) -> List[Dict]:
         """Detect items with unusual sales patterns"""
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        # Group by item and date
-        df['date'] = df['created_time'].dt.date
-        df['final_price'] = df['final_price'].astype(float)
-
-        price_outliers = []
-
-        for item_sku in df['item_sku'].unique():
-            if pd.isna(item_sku):
-                continue
-
-            item_df = df[df['item_sku'] == item_sku]
-
-            # Daily aggregations
-            daily_stats = item_df.groupby(['date', 'weekday']).agg({
-                'final_price': ['sum', 'count'],
-                'item_name': 'first'
-            }).reset_index()
-
-            daily_stats.columns = ['date', 'weekday', 'total_sales', 'quantity', 'item_name']
-
-            # Filter for same weekday
-            historical = daily_stats[
-                (daily_stats['date'] < analysis_date.date()) &
-                (daily_stats['weekday'] == weekday)
-                ]
-            current = daily_stats[daily_stats['date'] == analysis_date.date()]
-
-            if len(historical) < 2 or historical.empty or current.empty:
-                continue
-
-            # Check sales amount
-            sales_mean = historical['total_sales'].astype(float).mean()
-            sales_std = historical['total_sales'].astype(float).std()
-
-            if sales_std == 0:
-                continue
-
-            for _, row in current.iterrows():
-                total_sales = float(row['total_sales'])
-                sales_z_score = (total_sales - sales_mean) / sales_std
-                if abs(sales_z_score) > self.z_score_threshold:
-                    price_outliers.append({
-                        'item_sku': item_sku,
-                        'item_name': row['item_name'],
-                        'total_sales': total_sales,
-                        'historical_mean_sales': sales_mean,
-                        'z_score': sales_z_score,
-                        'deviation_percentage': ((total_sales - sales_mean) / sales_mean) * 100
-                    })
-
-        return price_outliers
+        outliers = self._daily_group_outliers(df, analysis_date, 'item_sku', ('item_name',))
+        return to_records(outliers, {
+            'item_sku': 'item_sku',
+            'item_name': 'item_name',
+            'total_sales': 'total_sales',
+            'historical_mean': 'historical_mean_sales',
+            'z_score': 'z_score',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def detect_category_outliers(self, df: pd.DataFrame, analysis_date: datetime) -> List[Dict]:
         """Detect categories with unusual sales patterns"""
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        # Group by category and date
-        df['date'] = df['created_time'].dt.date
-        df['final_price'] = df['final_price'].astype(float)
-
-        category_outliers = []
-
-        for category in df['category_name'].unique():
-            if pd.isna(category):
-                continue
-
-            cat_df = df[df['category_name'] == category]
-
-            # Daily aggregations
-            daily_stats = cat_df.groupby(['date', 'weekday']).agg({
-                'final_price': ['sum', 'count'],
-                'category_name': 'first'
-            }).reset_index()
-
-            daily_stats.columns = ['date', 'weekday', 'total_sales', 'quantity', 'category_name']
-
-            # Filter for same weekday
-            historical = daily_stats[
-                (daily_stats['date'] < analysis_date.date()) &
-                (daily_stats['weekday'] == weekday)
-                ]
-            current = daily_stats[daily_stats['date'] == analysis_date.date()]
-
-            if historical.empty or current.empty:
-                continue
-
-            # Calculate statistics
-            sales_mean = historical['total_sales'].astype(float).mean()
-            sales_std = historical['total_sales'].astype(float).std()
-
-            if sales_std == 0:
-                continue
-
-            for _, row in current.iterrows():
-                total_sales = float(row['total_sales'])
-                sales_z_score = (total_sales - sales_mean) / sales_std
-                if abs(sales_z_score) > self.z_score_threshold:
-                    category_outliers.append({
-                        'category_name': category,
-                        'total_sales': total_sales,
-                        'historical_mean_sales': sales_mean,
-                        'z_score': sales_z_score,
-                        'deviation_percentage': ((total_sales - sales_mean) / sales_mean) * 100
-                    })
-
-        return category_outliers
+        outliers = self._daily_group_outliers(df, analysis_date, 'category_name')
+        return to_records(outliers, {
+            'category_name': 'category_name',
+            'total_sales': 'total_sales',
+            'historical_mean': 'historical_mean_sales',
+            'z_score': 'z_score',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def detect_tip_outliers(self, df: pd.DataFrame, analysis_date: datetime) -> List[Dict]:
         """Detect orders with unusual tip amounts"""
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        # Calculate tip percentage
-        df['tip_percentage'] = df.apply(
-            lambda row: (float(row['tip_amount']) / float(row['total'])) * 100 if float(row['total']) > 0 else 0,
-            axis=1
-        )
-
-        # Filter for orders with positive tips
-        analysis_df = df[
-            (df['created_time'].dt.date == analysis_date.date()) &
-            (df['tip_amount'] > 0)
-        ]
+        df['tip_percentage'] = tip_percentage(df['tip_amount'], df['total'])
 
-        historical_df = df[
-            (df['created_time'].dt.date < analysis_date.date()) &
-            (df['weekday'] == weekday) &
-            (df['tip_amount'] > 0)
-        ]
-
-        if historical_df.empty or analysis_df.empty:
+        # Only orders with tips are compared
+        current, baseline = same_weekday_masks(df['created_time'].dt.date, df['weekday'], analysis_date.date())
+        has_tip = df['tip_amount'].astype(float) > 0
+        outliers = zscore_outliers(df, 'tip_amount', current & has_tip, baseline & has_tip, self.z_score_threshold)
+        if outliers.empty:
             return []
 
-        mean_tip = historical_df['tip_amount'].astype(float).mean()
-        std_tip = historical_df['tip_amount'].astype(float).std()
-
-        if std_tip == 0:
-            return []
-
-        outliers = []
-        for _, row in analysis_df.iterrows():
-            tip = float(row['tip_amount'])
-            if tip > 0:  # Only analyze orders with tips
-                z_score = (tip - mean_tip) / std_tip
-                if abs(z_score) > self.z_score_threshold:
-                    order_items = self.repository.get_order_items(row['order_id'])
-
-                    outliers.append({
-                        'order_id': row['order_id'],
-                        'total': row['total'],
-                        'tip_amount': tip,
-                        'tip_percentage': row['tip_percentage'],
-                        'z_score': z_score,
-                        'historical_mean': mean_tip,
-                        'deviation_percentage': ((tip - mean_tip) / mean_tip) * 100,
-                        'delivery_method': row['delivery_method'],
-                        'delivery_platform': row['delivery_platform'],
-                        'items': order_items
-                    })
-
-        return outliers
\ No newline at end of file
+        items = self.repository.get_items_for_orders(outliers['order_id'].tolist())
+        records = to_records(outliers, {
+            'order_id': 'order_id',
+            'total': 'total',
+            'tip_amount': 'tip_amount',
+            'tip_percentage': 'tip_percentage',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+            'delivery_method': 'delivery_method',
+            'delivery_platform': 'delivery_platform',
+        })
+        for record in records:
+            record['items'] = items.get(record['order_id'], [])
+        return records
@@ -4,6 +4,7 @@ import pandas as pd
 from decimal import Decimal
 from clover_sales_analysis.repository_weekly import SalesRepository
 from clover_sales_analysis.models import Order, OrderItem
+from shared.sales_outliers import period_totals, to_records, tip_percentage, zscore_outliers
 
 
 class SalesAnalyzer:
@@ -105,174 +106,91 @@ class SalesAnalyzer:
     def _detect_order_outliers(self, df: pd.DataFrame, start_date: date, end_date: date) -> List[Dict]:
         """Detect orders with unusual totals in the week"""
         current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-        current_week_orders = df[current_week_mask]
-        historical_orders = df[df['date'] < start_date]
-
-        # Calculate historical statistics
-        hist_mean = historical_orders['total'].mean()
-        hist_std = historical_orders['total'].std()
+        outliers = zscore_outliers(df, 'total', current_week_mask, df['date'] < start_date, self.z_score_threshold)
+        return self._order_records(outliers, {
+            'order_id': 'order_id',
+            'total': 'total',
+            'created_time': 'created_time',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+            'delivery_method': 'delivery_method',
+            'delivery_platform': 'delivery_platform',
+            'tip_amount': 'tip_amount',
+        })
 
-        if hist_std == 0:
+    def _order_records(self, outliers: pd.DataFrame, columns: Dict[str, str]) -> List[Dict]:
+        """Outlier orders as dicts with their items, fetched in one query"""
+        if outliers.empty:
             return []
-
-        outliers = []
-        for _, order in current_week_orders.iterrows():
-            z_score = (float(order['total']) - hist_mean) / hist_std
-            if abs(z_score) > self.z_score_threshold:
-                # Get detailed order information
-                order_details = self.repository.get_order_by_id(order['order_id'])
-                if order_details:
-                    outliers.append({
-                        'order_id': order['order_id'],
-                        'total': float(order['total']),
-                        'created_time': order['created_time'],
-                        'z_score': z_score,
-                        'historical_mean': hist_mean,
-                        'deviation_percentage': ((float(order['total']) - hist_mean) / hist_mean) * 100,
-                        'delivery_method': order['delivery_method'],
-                        'delivery_platform': order['delivery_platform'],
-                        'tip_amount': float(order['tip_amount']),
-                        'items': order_details.items
-                    })
-
-        return outliers
-
-    # analysis/weekly_sales_analyzer.py
+        items = self.repository.get_items_for_orders(outliers['order_id'].tolist())
+        records = to_records(outliers, columns)
+        for record in records:
+            record['total'] = float(record['total'])
+            record['tip_amount'] = float(record['tip_amount'])
+            record['items'] = items.get(record['order_id'], [])
+        return records
+
+    def _weekly_group_outliers(self, df: pd.DataFrame, start_date: date, end_date: date, key: str,
+                               first_cols: Tuple[str, ...] = ()) -> pd.DataFrame:
+        """This week's sales per `key` value compared with its weekly totals before the week"""
+        current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date)
+        historical_mask = df['date'] < start_date
+        periods = df[current_week_mask | historical_mask].assign(
+            period=df['created_time'].dt.strftime('%Y-%U').where(historical_mask, 'current')
+        )
+        weekly = period_totals(periods, [key], ['period'], 'final_price', first_cols)
+        is_current = weekly['period'] == 'current'
+        return zscore_outliers(weekly, 'total_sales', is_current, ~is_current, self.z_score_threshold, keys=[key])
 
     def _detect_item_outliers(self, df: pd.DataFrame, start_date: date, end_date: date) -> List[Dict]:
         """Detect items with unusual sales patterns in the week"""
         if df.empty:
             return []
 
-        # Add year-week column before using it
-        df['year_week'] = df['created_time'].dt.strftime('%Y-%U')
-
-        current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-
-        # Group by item and calculate weekly totals
-        current_week_items = df[current_week_mask].groupby(['item_sku', 'item_name']).agg({
-            'final_price': 'sum'
-        }).reset_index()
-
-        # Historical comparison
-        historical_df = df[df['date'] < start_date]
-        historical_items = historical_df.groupby(['item_sku', 'year_week']).agg({
-            'final_price': 'sum'
-        }).reset_index()
-
-        outliers = []
-        for _, item in current_week_items.iterrows():
-            historical_sales = historical_items[historical_items['item_sku'] == item['item_sku']]
-
-            if not historical_sales.empty:
-                hist_mean = historical_sales['final_price'].mean()
-                hist_std = historical_sales['final_price'].std()
-
-                if hist_std > 0:
-                    z_score = (float(item['final_price']) - hist_mean) / hist_std
-                    if abs(z_score) > self.z_score_threshold:
-                        outliers.append({
-                            'item_sku': item['item_sku'],
-                            'item_name': item['item_name'],
-                            'total_sales': float(item['final_price']),
-                            'historical_mean_sales': float(hist_mean),
-                            'z_score': z_score,
-                            'deviation_percentage': ((float(item['final_price']) - hist_mean) / hist_mean) * 100
-                        })
-
-        return outliers
-
-    # analysis/weekly_sales_analyzer.py
+        outliers = self._weekly_group_outliers(df, start_date, end_date, 'item_sku', ('item_name',))
+        return to_records(outliers, {
+            'item_sku': 'item_sku',
+            'item_name': 'item_name',
+            'total_sales': 'total_sales',
+            'historical_mean': 'historical_mean_sales',
+            'z_score': 'z_score',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def _detect_category_outliers(self, df: pd.DataFrame, start_date: date, end_date: date) -> List[Dict]:
         """Detect categories with unusual sales patterns in the week"""
         if df.empty:
             return []
 
-        # Add year-week column before using it
-        df['year_week'] = df['created_time'].dt.strftime('%Y-%U')
-
-        current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-
-        # Group by category and calculate weekly totals
-        current_week_categories = df[current_week_mask].groupby('category_name').agg({
-            'final_price': 'sum'
-        }).reset_index()
-
-        # Historical comparison
-        historical_df = df[df['date'] < start_date]
-        historical_categories = historical_df.groupby(['category_name', 'year_week']).agg({
-            'final_price': 'sum'
-        }).reset_index()
-
-        outliers = []
-        for _, category in current_week_categories.iterrows():
-            if pd.isna(category['category_name']):
-                continue
-
-            historical_sales = historical_categories[
-                historical_categories['category_name'] == category['category_name']
-                ]
-
-            if not historical_sales.empty:
-                hist_mean = historical_sales['final_price'].mean()
-                hist_std = historical_sales['final_price'].std()
-
-                if hist_std > 0:
-                    z_score = (float(category['final_price']) - hist_mean) / hist_std
-                    if abs(z_score) > self.z_score_threshold:
-                        outliers.append({
-                            'category_name': category['category_name'],
-                            'total_sales': float(category['final_price']),
-                            'historical_mean_sales': float(hist_mean),
-                            'z_score': z_score,
-                            'deviation_percentage': ((float(category['final_price']) - hist_mean) / hist_mean) * 100
-                        })
-
-        return outliers
+        outliers = self._weekly_group_outliers(df, start_date, end_date, 'category_name')
+        return to_records(outliers, {
+            'category_name': 'category_name',
+            'total_sales': 'total_sales',
+            'historical_mean': 'historical_mean_sales',
+            'z_score': 'z_score',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def _detect_tip_outliers(self, df: pd.DataFrame, start_date: date, end_date: date) -> List[Dict]:
         """Detect orders with unusual tip amounts in the week"""
-        # Calculate tip percentages for all orders
-        df = df.copy()  # Create a copy to avoid modifying the original DataFrame
-        df['tip_percentage'] = df.apply(
-            lambda row: (float(row['tip_amount']) / float(row['total'])) * 100 if float(row['total']) > 0 else 0,
-            axis=1
-        )
-
-        current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-        current_week_orders = df[current_week_mask]
-        historical_orders = df[df['date'] < start_date]
-
-        # Calculate historical statistics
-        hist_mean = historical_orders['tip_amount'].mean()
-        hist_std = historical_orders['tip_amount'].std()
-
-        if hist_std == 0:
-            return []
-
-        outliers = []
-        for _, order in current_week_orders.iterrows():
-            if float(order['tip_amount']) > 0:  # Only analyze orders with tips
-                z_score = (float(order['tip_amount']) - hist_mean) / hist_std
-                if abs(z_score) > self.z_score_threshold:
-                    # Get detailed order information
-                    order_details = self.repository.get_order_by_id(order['order_id'])
-                    if order_details:
-                        outliers.append({
-                            'order_id': order['order_id'],
-                            'total': float(order['total']),
-                            'tip_amount': float(order['tip_amount']),
-                            'tip_percentage': float(order['tip_percentage']),
-                            'z_score': z_score,
-                            'historical_mean': hist_mean,
-                            'deviation_percentage': ((float(order['tip_amount']) - hist_mean) / hist_mean) * 100,
-                            'delivery_method': order['delivery_method'],
-                            'delivery_platform': order['delivery_platform'],
-                            'items': order_details.items
-                        })
-
-        return outliers
+        df = df.assign(tip_percentage=tip_percentage(df['tip_amount'], df['total']))
+
+        # Baseline is every earlier order; only orders with tips are flagged
+        current_week_mask = (df['date'] >= start_date) & (df['date'] <= end_date) & (df['tip_amount'].astype(float) > 0)
+        outliers = zscore_outliers(df, 'tip_amount', current_week_mask, df['date'] < start_date,
+                                   self.z_score_threshold)
+        return self._order_records(outliers, {
+            'order_id': 'order_id',
+            'total': 'total',
+            'tip_amount': 'tip_amount',
+            'tip_percentage': 'tip_percentage',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+            'delivery_method': 'delivery_method',
+            'delivery_platform': 'delivery_platform',
+        })
 
     def _get_daily_breakdown(self, df: pd.DataFrame, start_date: date, end_date: date) -> List[Dict]:
         """Get daily breakdown of sales metrics within the week"""
@@ -27,6 +27,9 @@ def load_secrets():
     env_map = {
         "MRPEASY_API_KEY": "MRPEASY_API_KEY",
         "MRPEASY_API_SECRET": "MRPEASY_API_SECRET",
+        "MRPEASY_REQUESTS_PER_MINUTE": "MRPEASY_REQUESTS_PER_MINUTE",
+        "MRPEASY_RATE_BURST": "MRPEASY_RATE_BURST",
+        "MRPEASY_POOL_SIZE": "MRPEASY_POOL_SIZE",
         "clover_api_key": "clover_api_key",
         "clover_merchant_id": "clover_merchant_id",
         "BOXHERO_API_TOKEN": "BOXHERO_API_TOKEN",
@@ -36,6 +39,8 @@ def load_secrets():
         "mysql_user": "mysql_user",
         "mysql_password": "mysql_password",
         "mysql_database": "mysql_database",
+        "mysql_pool_size": "mysql_pool_size",
+        "mysql_pool_idle_seconds": "mysql_pool_idle_seconds",
         "starship_db_host": "starship_db_host",
         "starship_db_port": "starship_db_port",
         "starship_db_user": "starship_db_user",
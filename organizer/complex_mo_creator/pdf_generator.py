@@ -1,13 +1,13 @@
 # component_tree_pdf_generator.py
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
 from reportlab.graphics.barcode import code128
 from io import BytesIO
 from datetime import datetime
 import pandas as pd
+from shared.pdf_styles import paragraph_style, sample_styles
 
 
 class DateFormatter:
@@ -69,12 +69,12 @@ class EnhancedComponentTreePDFGenerator:
 
     def __init__(self):
         # Get base styles
-        self.styles = getSampleStyleSheet()
+        self.styles = sample_styles()
 
         # Title style with modern typography
-        self.title_style = ParagraphStyle(
+        self.title_style = paragraph_style(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent='Heading1',
             fontSize=18,
             spaceAfter=20,
             fontName='Helvetica-Bold',
@@ -82,9 +82,9 @@ class EnhancedComponentTreePDFGenerator:
         )
 
         # Date style with subtle appearance
-        self.date_style = ParagraphStyle(
+        self.date_style = paragraph_style(
             'CustomDate',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=11,
             alignment=1,
             spaceAfter=15,
@@ -92,9 +92,9 @@ class EnhancedComponentTreePDFGenerator:
         )
 
         # Section subtitle style
-        self.subtitle_style = ParagraphStyle(
+        self.subtitle_style = paragraph_style(
             'CustomSubtitle',
-            parent=self.styles['Heading2'],
+            parent='Heading2',
             fontSize=14,
             spaceAfter=15,
             fontName='Helvetica-Bold',
@@ -102,45 +102,45 @@ class EnhancedComponentTreePDFGenerator:
         )
 
         # Table cell style
-        self.cell_style = ParagraphStyle(
+        self.cell_style = paragraph_style(
             'CustomCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             alignment=1
         )
 
         # Item style for parts table
-        self.item_style = ParagraphStyle(
+        self.item_style = paragraph_style(
             'ItemCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             textColor=colors.HexColor('#2C3E50')
         )
 
         # Smaller font style for related manufacturing orders
-        self.small_item_style = ParagraphStyle(
+        self.small_item_style = paragraph_style(
             'SmallItemCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=8,  # Smaller font size
             leading=10,  # Reduced leading for tighter line spacing
             textColor=colors.HexColor('#2C3E50')
         )
 
         # Component style for indented components
-        self.component_style = ParagraphStyle(
+        self.component_style = paragraph_style(
             'ComponentCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=9,  # Slightly smaller font size
             leading=12,  # Reduced leading for tighter line spacing
             textColor=colors.HexColor('#34495E')
         )
 
         # Header style for tables
-        self.header_style = ParagraphStyle(
+        self.header_style = paragraph_style(
             'HeaderCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             fontName='Helvetica-Bold',
@@ -148,9 +148,9 @@ class EnhancedComponentTreePDFGenerator:
         )
 
         # Code style for lot numbers
-        self.code_style = ParagraphStyle(
+        self.code_style = paragraph_style(
             'CustomCode',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=12,
             alignment=1,
             spaceAfter=8,
@@ -158,9 +158,9 @@ class EnhancedComponentTreePDFGenerator:
         )
 
         # Description style for indented items
-        self.description_style = ParagraphStyle(
+        self.description_style = paragraph_style(
             'DescriptionCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             leftIndent=0,
@@ -304,7 +304,7 @@ class EnhancedComponentTreePDFGenerator:
                 indent = "&nbsp;" * (level * 4)  # HTML spaces for indentation
 
                 # Create indented style for this item
-                indented_style = ParagraphStyle(
+                indented_style = paragraph_style(
                     f'Level{level}',
                     parent=self.description_style,
                     leftIndent=level * 12  # 12 points per level
@@ -348,7 +348,7 @@ class EnhancedComponentTreePDFGenerator:
                     component_level = component.get("level", 0)
                     component_indent = "&nbsp;" * (component_level * 4)
 
-                    component_style = ParagraphStyle(
+                    component_style = paragraph_style(
                         f'Level{component_level}',
                         parent=self.description_style,
                         leftIndent=component_level * 12
@@ -1,8 +1,9 @@
 # cache_manager.py
 from typing import Dict, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
-from shared.api_manager import APIManager
+from shared.api_manager import APIManager, MRPeasyAPIError
+from shared.reference_cache import get_reference_cache
 from datetime import datetime, timedelta
 
 @dataclass
@@ -12,6 +13,10 @@ class CacheData:
     lots: Dict[str, Any]      # Keyed by lot_code
     initialized: bool = False
     last_updated: Optional[datetime] = None
+    # Secondary indexes over `products`, rebuilt whenever products are loaded
+    products_by_id: Dict[Any, Any] = field(default_factory=dict)          # Keyed by product_id
+    products_by_article_id: Dict[Any, Any] = field(default_factory=dict)  # Keyed by article_id
+    products_by_code_upper: Dict[str, Any] = field(default_factory=dict)  # Keyed by upper-cased code
 
 class CacheManager:
     """Manages caching of product and lot data"""
@@ -35,23 +40,31 @@ class CacheManager:
             return
 
         try:
-            # Fetch all products
-            products = api_manager.fetch_all_products()
-            if products:
-                self.cache.products = {
+            # Products and lots come from the persistent reference cache, which
+            # streams pages from MRPeasy only when its own copy is missing or stale
+            reference_cache = get_reference_cache()
+            try:
+                products = {
                     product['code']: product
-                    for product in products
+                    for product in reference_cache.get_all('items', api_manager)
                     if 'code' in product
                 }
+                if products:
+                    self.cache.products = products
+                    self._rebuild_product_indexes()
+            except MRPeasyAPIError as e:
+                logging.error(f"Error fetching products for cache: {str(e)}")
 
-            # Fetch all lots
-            lots = api_manager.fetch_stock_lots()
-            if lots:
-                self.cache.lots = {
+            try:
+                lots = {
                     lot['code']: lot
-                    for lot in lots
+                    for lot in reference_cache.get_all('lots', api_manager)
                     if 'code' in lot
                 }
+                if lots:
+                    self.cache.lots = lots
+            except MRPeasyAPIError as e:
+                logging.error(f"Error fetching lots for cache: {str(e)}")
 
             self.cache.initialized = True
             self.cache.last_updated = current_time
@@ -61,9 +74,33 @@ class CacheManager:
             logging.error(f"Error initializing cache: {str(e)}")
             raise
 
+    def _rebuild_product_indexes(self) -> None:
+        """Build O(1) lookups by product_id, article_id and case-insensitive code"""
+        by_id, by_article_id, by_code_upper = {}, {}, {}
+        for code, product in self.cache.products.items():
+            if product.get('product_id') is not None:
+                by_id.setdefault(product['product_id'], product)
+            if product.get('article_id') is not None:
+                by_article_id.setdefault(product['article_id'], product)
+            by_code_upper.setdefault(str(code).strip().upper(), product)
+        self.cache.products_by_id = by_id
+        self.cache.products_by_article_id = by_article_id
+        self.cache.products_by_code_upper = by_code_upper
+
     def get_product(self, item_code: str) -> Optional[Dict]:
-        """Get product details from cache"""
-        return self.cache.products.get(item_code)
+        """Get product details from cache (exact code first, then case-insensitive)"""
+        product = self.cache.products.get(item_code)
+        if product is None and item_code:
+            product = self.cache.products_by_code_upper.get(item_code.strip().upper())
+        return product
+
+    def get_product_by_id(self, product_id: Any) -> Optional[Dict]:
+        """Get product details by MRPeasy product_id"""
+        return self.cache.products_by_id.get(product_id)
+
+    def get_product_by_article_id(self, article_id: Any) -> Optional[Dict]:
+        """Get product details by MRPeasy article_id"""
+        return self.cache.products_by_article_id.get(article_id)
 
     def get_lot(self, lot_code: str) -> Optional[Dict]:
         """Get lot details from cache"""
@@ -82,8 +119,13 @@ class CacheManager:
         return (current_time - self.cache.last_updated) >= timedelta(minutes=self.CACHE_EXPIRY_MINUTES)
 
     def clear_cache(self) -> None:
-        """Clear the cache"""
+        """Clear the cache (including the persistent copy, so the next load re-downloads)"""
+        get_reference_cache().invalidate('items')
+        get_reference_cache().invalidate('lots')
         self.cache.products.clear()
+        self.cache.products_by_id.clear()
+        self.cache.products_by_article_id.clear()
+        self.cache.products_by_code_upper.clear()
         self.cache.lots.clear()
         self.cache.initialized = False
         self.cache.last_updated = None
\ No newline at end of file
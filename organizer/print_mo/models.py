@@ -100,7 +100,7 @@ class PartLot(BaseModel):
                     # Get purchase order details if pur_ord_id exists
                     pur_ord_id = lot_details.get('pur_ord_id')
                     if pur_ord_id:
-                        po_details = api_manager.get_single_purchase_order(pur_ord_id)
+                        po_details = api_manager.get_purchase_order_cached(pur_ord_id)
                         if po_details:
                             # Find matching product in PO
                             for product in po_details.get('products', []):
@@ -146,12 +146,7 @@ class Part(BaseModel):
         if product_id and api_manager:
             try:
                 cache_manager = CacheManager()
-                # Find product in cache where product_id matches
-                product_details = next(
-                    (prod for prod in cache_manager.cache.products.values()
-                     if prod.get('product_id') == product_id),
-                    None
-                )
+                product_details = cache_manager.get_product_by_id(product_id)
                 if not product_details:
                     logging.warning(f"Could not find product details for product_id {product_id}")
             except Exception as e:
@@ -167,6 +162,20 @@ class Part(BaseModel):
             item_title=product_details.get('title') if product_details else None
         )
 
+def prefetch_purchase_orders(detailed_mos: List[Dict[str, Any]], api_manager: 'APIManager') -> None:
+    """Fetch, in one concurrent pass, every purchase order referenced by the booked lots
+    of the given MO details, so building the models hits the PO cache only."""
+    cache_manager = CacheManager()
+    pur_ord_ids = set()
+    for mo in detailed_mos:
+        for part in (mo or {}).get('parts', []):
+            for lot in part.get('lots', []):
+                lot_details = cache_manager.get_lot(lot.get('code'))
+                if lot_details and lot_details.get('pur_ord_id'):
+                    pur_ord_ids.add(lot_details['pur_ord_id'])
+    if pur_ord_ids:
+        api_manager.prefetch_purchase_orders(pur_ord_ids)
+
 @dataclass
 class Note(BaseModel):
     """Model for note data"""
@@ -213,6 +222,8 @@ class ManufacturingOrder(BaseModel):
                 cache_manager = CacheManager()
                 if not cache_manager.is_initialized():
                     cache_manager.initialize_cache(api_manager)
+                # One concurrent pass for all POs behind this MO's booked lots
+                prefetch_purchase_orders([data], api_manager)
 
             # Convert Unix timestamp to human readable date if present
             start_date = None
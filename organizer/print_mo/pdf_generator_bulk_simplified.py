@@ -1,16 +1,18 @@
 # pdf_generator.py
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable, KeepInFrame
 from reportlab.graphics.barcode import code128
 from io import BytesIO
 from datetime import datetime
+from functools import partial
 from typing import Union, List, Optional, Tuple
 import logging
 import math
 import re
+from shared.pdf_render import PARALLEL_MIN_DOCUMENTS, render_in_parallel
+from shared.pdf_styles import paragraph_style, sample_styles
 
 
 class DateFormatter:
@@ -162,17 +164,22 @@ class HatchedCell(Flowable):
         self.canv.restoreState()
 
 
+def _render_mos(generator_cls, mos: List) -> bytes:
+    """Worker-process entry point: one in-process combined PDF for a chunk of MOs"""
+    return generator_cls().create_combined_pdf(mos, max_workers=1)
+
+
 class PDFGenerator:
     """Class for generating PDF reports of Manufacturing Order data"""
 
     def __init__(self):
         # Get base styles
-        self.styles = getSampleStyleSheet()
+        self.styles = sample_styles()
 
         # Title style with modern typography
-        self.title_style = ParagraphStyle(
+        self.title_style = paragraph_style(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent='Heading1',
             fontSize=18,
             spaceAfter=20,
             fontName='Helvetica-Bold',
@@ -180,9 +187,9 @@ class PDFGenerator:
         )
 
         # Code style for MO numbers
-        self.code_style = ParagraphStyle(
+        self.code_style = paragraph_style(
             'CustomCode',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=14,
             alignment=1,
             spaceAfter=8,
@@ -190,9 +197,9 @@ class PDFGenerator:
         )
 
         # Date style with subtle appearance
-        self.date_style = ParagraphStyle(
+        self.date_style = paragraph_style(
             'CustomDate',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=11,
             alignment=1,
             spaceAfter=15,
@@ -200,9 +207,9 @@ class PDFGenerator:
         )
 
         # Section subtitle style
-        self.subtitle_style = ParagraphStyle(
+        self.subtitle_style = paragraph_style(
             'CustomSubtitle',
-            parent=self.styles['Heading2'],
+            parent='Heading2',
             fontSize=14,
             spaceAfter=15,
             fontName='Helvetica-Bold',
@@ -210,36 +217,36 @@ class PDFGenerator:
         )
 
         # Table cell style
-        self.cell_style = ParagraphStyle(
+        self.cell_style = paragraph_style(
             'CustomCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             alignment=1
         )
 
         # Item style for parts table
-        self.item_style = ParagraphStyle(
+        self.item_style = paragraph_style(
             'ItemCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=12,  # Reduced leading for single line items
             textColor=colors.HexColor('#2C3E50')
         )
 
         # Single line item style for parts table
-        self.single_line_item_style = ParagraphStyle(
+        self.single_line_item_style = paragraph_style(
             'SingleLineItemCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=9,  # Slightly smaller font size
             leading=10,  # Minimal leading for single line display
             textColor=colors.HexColor('#2C3E50')
         )
 
         # Header style for tables
-        self.header_style = ParagraphStyle(
+        self.header_style = paragraph_style(
             'HeaderCell',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=10,
             leading=14,
             fontName='Helvetica-Bold',
@@ -247,9 +254,9 @@ class PDFGenerator:
         )
 
         # Notice style for bag packaging instructions
-        self.notice_style = ParagraphStyle(
+        self.notice_style = paragraph_style(
             'NoticeStyle',
-            parent=self.styles['Normal'],
+            parent='Normal',
             fontSize=13,
             alignment=1,
             spaceAfter=15,
@@ -281,8 +288,15 @@ class PDFGenerator:
         container_types = ['bag', 'tray', 'container', 'bucket', 'pail']
         return any(uom.lower().startswith(container_type) for container_type in container_types)
 
-    def create_combined_pdf(self, mos: List) -> bytes:
-        """Generate a combined PDF report for multiple manufacturing orders"""
+    def create_combined_pdf(self, mos: List, max_workers: Optional[int] = None) -> bytes:
+        """
+        Generate a combined PDF report for multiple manufacturing orders.
+        Large batches are rendered in chunks on worker processes (max_workers, default
+        all cores) and their pages concatenated; max_workers=1 renders in this process.
+        """
+        if max_workers != 1 and len(mos) >= PARALLEL_MIN_DOCUMENTS:
+            return render_in_parallel(partial(_render_mos, type(self)), mos, max_workers)
+
         buffer = BytesIO()
 
         # Create the PDF document with reduced margins for better space usage
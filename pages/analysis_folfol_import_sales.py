@@ -1,15 +1,16 @@
 # to run test: "pytest --cov=. tests/ -v" in terminal
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from config import secrets
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional, Set
+from typing import List, Dict, Any, Tuple, Optional, Set, Iterator
 import streamlit as st
 import requests
 import pytz
 import re
 import time
 import json
+from shared.api_manager import TokenBucket
 from shared.database_operations import DatabaseOperations
 from ratelimit import limits, sleep_and_retry
 
@@ -23,6 +24,13 @@ class Config:
     # Batch processing settings
     MAX_WORKERS = 30
     BATCH_SIZE = 100
+
+    # Line items: use the expanded orders payload, fetch /line_items only for incomplete orders
+    TRUST_EXPANDED_LINE_ITEMS = True
+    EXPANDED_LINE_ITEMS_LIMIT = 100  # a full expanded collection may have been truncated
+    LINE_ITEMS_WORKERS = 8
+    LINE_ITEMS_MAX_ATTEMPTS = 3
+    RETRY_BACKOFF_SECONDS = 1.0
     
     @staticmethod
     def validate_config() -> None:
@@ -81,6 +89,10 @@ class DeliveryInfo:
         return platform, method, delivery_time
 
 
+# Shared by every Clover request: paces calls to the quota and backs off together on 429
+_clover_limiter = TokenBucket(Config.REQUESTS_PER_MINUTE, burst=Config.LINE_ITEMS_WORKERS)
+
+
 class CloverAPI:
     def __init__(self):
         self.config = Config()
@@ -98,76 +110,115 @@ class CloverAPI:
         self._session.headers.update({"Authorization": f"Bearer {self.config.get_clover_api_key()}"})
 
     def _make_request(self, url: str, params: Dict = None) -> Dict:
+        _clover_limiter.acquire()
         response = self._session.get(url, params=params)
         response.raise_for_status()
         return response.json()
 
+    def fetch_orders(self, start_date: datetime, offset: int = 0) -> List[Dict[str, Any]]:
+        return self._fetch_orders_page(int(start_date.timestamp() * 1000), offset)
+
     @sleep_and_retry
     @limits(calls=Config.REQUESTS_PER_MINUTE, period=60)
-    def fetch_orders(self, start_date: datetime, offset: int = 0) -> List[Dict[str, Any]]:
+    def _fetch_orders_page(self, since_ms: int, offset: int = 0) -> List[Dict[str, Any]]:
         url = f"{self.config.API_BASE_URL}/{self.config.get_clover_merchant_id()}/orders"
         params = {
-            "filter": f"createdTime>{int(start_date.timestamp() * 1000)}",
-            "expand": "lineItems,lineItems.modifications,payments,discounts",
-            "limit": 100,
+            "filter": f"createdTime>{since_ms}",
+            "expand": "lineItems,lineItems.modifications,lineItems.discounts,payments,discounts",
+            # Oldest first: orders created during a sync land after the saved offset
+            "orderBy": "createdTime ASC",
+            "limit": self.config.BATCH_SIZE,
             "offset": offset
         }
         response = self._make_request(url, params)
         return response.get('elements', [])
 
-    def _fetch_line_items_batch(self, order_ids: Set[str]) -> List[Dict[str, Any]]:
-        """Fetch line items for multiple orders concurrently."""
-        def fetch_single_order(order_id: str) -> Dict[str, Any]:
-            url = f"{self.config.API_BASE_URL}/{self.config.get_clover_merchant_id()}/orders/{order_id}/line_items"
-            params = {"expand": "discounts,modifications"}
-
-            for attempt in range(3):
-                try:
-                    time.sleep(0.25)
-                    items = self._make_request(url, params).get('elements', [])
-                    return {"order_id": order_id, "items": items}
-                except Exception:
-                    if attempt == 2:
-                        return {"order_id": order_id, "items": []}
-                    time.sleep(1)
-
-            return {"order_id": order_id, "items": []}
-
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            for order_id in order_ids:
-                futures.append(executor.submit(fetch_single_order, order_id))
-                time.sleep(0.25)
-
-            return [future.result() for future in as_completed(futures)]
+    def _fetch_order_line_items(self, order_id: str) -> Dict[str, Any]:
+        """Fetch one order's line items. A 429 holds every Clover request for Retry-After."""
+        url = f"{self.config.API_BASE_URL}/{self.config.get_clover_merchant_id()}/orders/{order_id}/line_items"
+        params = {"expand": "discounts,modifications"}
 
-    def fetch_all_orders(self, start_date: datetime) -> List[Dict[str, Any]]:
-        all_orders = []
-        offset = 0
-
-        while True:
-            orders = self.fetch_orders(start_date, offset)
-            if not orders:
-                break
-            all_orders.extend(orders)
-            offset += len(orders)
+        for attempt in range(self.config.LINE_ITEMS_MAX_ATTEMPTS):
+            try:
+                items = self._make_request(url, params).get('elements', [])
+                return {"order_id": order_id, "items": items}
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429:
+                    _clover_limiter.penalize(self._retry_after(e.response))
+                    continue
+            except Exception:
+                pass
+            if attempt < self.config.LINE_ITEMS_MAX_ATTEMPTS - 1:
+                time.sleep(self.config.RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+        return {"order_id": order_id, "items": []}
 
-        if not all_orders:
-            return []
+    @staticmethod
+    def _retry_after(response) -> float:
+        try:
+            return max(1.0, float(response.headers.get('Retry-After', 1)))
+        except (TypeError, ValueError):
+            return 1.0
 
-        order_batches = [all_orders[i:i + self.config.BATCH_SIZE]
-                         for i in range(0, len(all_orders), self.config.BATCH_SIZE)]
+    def _fetch_line_items_batch(self, order_ids: Set[str]) -> List[Dict[str, Any]]:
+        """Fetch line items for multiple orders concurrently, paced by the shared limiter."""
+        with ThreadPoolExecutor(max_workers=self.config.LINE_ITEMS_WORKERS) as executor:
+            return list(executor.map(self._fetch_order_line_items, order_ids))
 
-        for batch in order_batches:
-            order_ids = {order['id'] for order in batch}
-            line_items_results = self._fetch_line_items_batch(order_ids)
+    @staticmethod
+    def _expanded_line_items(order: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Line items from the expanded orders payload, or None when they have to be
+        fetched separately: expansion missing, possibly truncated, or with item
+        discounts referenced but not expanded.
+        """
+        line_items = order.get('lineItems')
+        if not isinstance(line_items, dict) or 'elements' not in line_items:
+            return None
+        elements = line_items['elements']
+        if len(elements) >= Config.EXPANDED_LINE_ITEMS_LIMIT:
+            return None
+        for item in elements:
+            discounts = item.get('discounts')
+            if isinstance(discounts, dict) and 'elements' not in discounts:
+                return None
+        return elements
+
+    def _attach_line_items(self, orders: List[Dict[str, Any]]) -> int:
+        """Set 'detailed_line_items' on each order. Returns how many orders were backfilled."""
+        backfill = set()
+        for order in orders:
+            items = self._expanded_line_items(order) if self.config.TRUST_EXPANDED_LINE_ITEMS else None
+            if items is None:
+                backfill.add(order['id'])
+            else:
+                order['detailed_line_items'] = items
 
+        if backfill:
             line_items_map = {result['order_id']: result['items']
-                              for result in line_items_results}
-
-            for order in batch:
-                order['detailed_line_items'] = line_items_map.get(order['id'], [])
+                              for result in self._fetch_line_items_batch(backfill)}
+            for order in orders:
+                if order['id'] in backfill:
+                    order['detailed_line_items'] = line_items_map.get(order['id'], [])
+        return len(backfill)
+
+    def iter_order_pages(self, since_ms: int, offset: int = 0) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Yield (offset, orders) one page at a time, starting at `offset`, with the
+        detailed line items attached. Only one page is held in memory.
+        """
+        while True:
+            orders = self._fetch_orders_page(since_ms, offset)
+            if not orders:
+                return
+            self._attach_line_items(orders)
+            yield offset, orders
+            offset += len(orders)
 
+    def fetch_all_orders(self, start_date: datetime) -> List[Dict[str, Any]]:
+        all_orders = []
+        for _, orders in self.iter_order_pages(int(start_date.timestamp() * 1000)):
+            all_orders.extend(orders)
         return all_orders
 
 
@@ -316,20 +367,45 @@ class CloverSalesImporter:
         self.api = CloverAPI()
 
     def run_update(self) -> None:
+        """
+        Sync orders page by page. Each page is saved as soon as it arrives and the
+        checkpoint (offset and high-water mark) is persisted after it, so a crashed
+        or interrupted run resumes at the next page instead of starting over.
+        """
         try:
-            start_date = self.db_ops.get_latest_order_date()
-            st.write(f"Fetching orders since: {start_date}")
-
-            raw_orders = self.api.fetch_all_orders(start_date)
-            if raw_orders:
-                processed_orders = [CloverOrder(order) for order in raw_orders]
-                self.db_ops.save_orders(processed_orders)
-                self._display_summary(start_date)
+            state = self.db_ops.get_sync_state()
+            if state.get('since_ms') is not None and state.get('offset'):
+                since_ms, offset = state['since_ms'], state['offset']
+                st.write(f"Resuming sync of orders since {self._from_ms(since_ms)} at order {offset}")
+            else:
+                since_ms = state.get('high_water_ms') or int(self.db_ops.get_latest_order_date().timestamp() * 1000)
+                offset = 0
+                st.write(f"Fetching orders since: {self._from_ms(since_ms)}")
+            high_water_ms = max(state.get('high_water_ms') or 0, since_ms)
+
+            saved = 0
+            status = st.empty()
+            for page_offset, raw_orders in self.api.iter_order_pages(since_ms, offset):
+                self.db_ops.save_orders([CloverOrder(order) for order in raw_orders], show_progress=False)
+                saved += len(raw_orders)
+                high_water_ms = max([high_water_ms] + [order.get('createdTime') or 0 for order in raw_orders])
+                self.db_ops.save_sync_state(since_ms=since_ms, offset=page_offset + len(raw_orders),
+                                            high_water_ms=high_water_ms)
+                status.write(f"Saved {saved} orders (up to {self._from_ms(high_water_ms)})")
+
+            # Run finished: the next one starts from the high-water mark
+            self.db_ops.save_sync_state(since_ms=None, offset=0, high_water_ms=high_water_ms)
+            if saved or offset:
+                self._display_summary(self._from_ms(since_ms))
             else:
                 st.info('No new orders to import.')
         except Exception as e:
             st.error(f"Update failed: {str(e)}")
 
+    @staticmethod
+    def _from_ms(timestamp_ms: int) -> datetime:
+        return datetime.fromtimestamp(timestamp_ms / 1000)
+
     def _display_summary(self, start_date: datetime) -> None:
         summary = self.db_ops.get_summary(start_date)
         st.success('Data upload completed successfully.')
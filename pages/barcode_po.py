@@ -1,17 +1,11 @@
 import streamlit as st
 from reportlab.lib.pagesizes import inch
-from reportlab.pdfgen import canvas
-from barcode import Code128
-from barcode.writer import ImageWriter
-import io
-from PIL import Image
 from datetime import datetime, date, timedelta
 import math
-from PyPDF2 import PdfReader, PdfWriter
 import base64
 from shared.api_manager import APIManager
+from shared.label_pdf import LABEL_PAGE_SIZE, LabelSheet, draw_code128
 from streamlit.components.v1 import html
-from reportlab.lib.utils import ImageReader
 import time
 
 # Get today's date
@@ -98,13 +92,6 @@ def get_lots_from_cache(item_code: str, po_id: int) -> list:
     return []
 
 
-class NoTextImageWriter(ImageWriter):
-    def _init(self, code):
-        options = super()._init(code)
-        self.text = ''  # Disable text
-        return options
-
-
 def get_lot_and_expiry(item_code: str, po_id: int, receiving_date: date) -> tuple:
     lot_number = None
     expiry_date = None
@@ -174,9 +161,8 @@ def parse_vendor_uom(vendor_uom):
     return False, 1, vendor_uom
 
 
-def generate_pdf(lot_number, sku, title, vendor_unit, quantity, vendor_quantity, uom, expiry_date):
-    buffer = io.BytesIO()
-
+def draw_label(c, lot_number, sku, title, vendor_unit, quantity, vendor_quantity, uom, expiry_date):
+    """Draw one 3x1 inch PO label onto canvas `c`"""
     # Parse vendor unit information
     is_case_of_containers, case_quantity, display_unit = parse_vendor_uom(vendor_unit)
 
@@ -186,107 +172,52 @@ def generate_pdf(lot_number, sku, title, vendor_unit, quantity, vendor_quantity,
     else:
         per_unit_quantity = quantity / vendor_quantity if vendor_quantity != 0 else quantity
 
-    try:
-        # Create canvas with specific size
-        c = canvas.Canvas(buffer, pagesize=(3 * inch, 1 * inch))
-
-        # Generate barcode image
-        barcode = Code128(lot_number, writer=NoTextImageWriter())
-
-        # Create a BytesIO buffer for the barcode image
-        barcode_buffer = io.BytesIO()
-        barcode.write(barcode_buffer)
-        barcode_buffer.seek(0)
-
-        # Convert to PIL Image
-        barcode_image = Image.open(barcode_buffer)
-
-        # Create ImageReader object directly from PIL Image
-        image_reader = ImageReader(barcode_image)
-
-        # Draw content on PDF
-        # Set default font sizes
-        default_large_size = 20
-        default_normal_size = 12
-        max_text_width = 1.75 * inch
-
-        # Draw lot number and expiry
-        c.setFont("Helvetica", default_large_size)
-        c.drawString(0.05 * inch, 0.5 * inch, f"{lot_number}")
-        # c.drawString(0.05 * inch, 0.01 * inch, f"Exp: {expiry_date}")
-
-        # Draw title with adjusted size
-        title_font_size = min(default_normal_size,
-                              default_normal_size * (
-                                          max_text_width / c.stringWidth(title, "Helvetica", default_normal_size)))
-        c.setFont("Helvetica", title_font_size)
-        c.drawString(1.25 * inch, 0.75 * inch, f"{title}")
-
-        # Draw vendor unit
-        display_text = display_unit if is_case_of_containers else vendor_unit
-        vendor_unit_font_size = min(default_normal_size,
-                                    default_normal_size * (max_text_width / c.stringWidth(display_text, "Helvetica",
-                                                                                          default_normal_size)))
-        c.setFont("Helvetica", vendor_unit_font_size)
-        c.drawString(1.25 * inch, 0.5 * inch, f"{display_text}")
-
-        # Draw quantity and SKU
-        c.setFont("Helvetica", default_normal_size)
-        c.drawString(1.25 * inch, 0.25 * inch, f"≈{per_unit_quantity:.2f} {uom}")
-        c.drawString(2.2 * inch, 0.05 * inch, f"{sku}")
-
-        # Draw barcode using ImageReader
-        c.drawImage(image_reader, 0 * inch, 0.70 * inch, width=1.27 * inch, height=0.30 * inch)
-
-        # Finish the page and save
-        c.showPage()
-        c.save()
-
-        # Clean up buffers
-        barcode_buffer.close()
-
-        # Reset main buffer position
-        buffer.seek(0)
-        return buffer
-
-    except Exception as e:
-        # Clean up in case of error
-        buffer.close()
-        raise e
-
-
-def combine_pdfs(buffers):
-    try:
-        combined_buffer = io.BytesIO()
-        pdf_writer = PdfWriter()
-
-        # Create a list to store individual PDFReader objects
-        readers = []
-
-        # First pass: create all PDF readers
-        for buffer in buffers:
-            buffer.seek(0)
-            reader = PdfReader(buffer)
-            readers.append(reader)
-
-        # Second pass: add pages from readers
-        for reader in readers:
-            for page in reader.pages:
-                pdf_writer.add_page(page)
-
-        # Write the combined PDF
-        pdf_writer.write(combined_buffer)
-        combined_buffer.seek(0)
-
-        return combined_buffer
-
-    except Exception as e:
-        combined_buffer.close()
-        raise e
-    finally:
-        # Clean up individual buffers
-        for buffer in buffers:
-            buffer.close()
+    # Set default font sizes
+    default_large_size = 20
+    default_normal_size = 12
+    max_text_width = 1.75 * inch
+
+    # Draw lot number and expiry
+    c.setFont("Helvetica", default_large_size)
+    c.drawString(0.05 * inch, 0.5 * inch, f"{lot_number}")
+    # c.drawString(0.05 * inch, 0.01 * inch, f"Exp: {expiry_date}")
+
+    # Draw title with adjusted size
+    title_font_size = min(default_normal_size,
+                          default_normal_size * (
+                                      max_text_width / c.stringWidth(title, "Helvetica", default_normal_size)))
+    c.setFont("Helvetica", title_font_size)
+    c.drawString(1.25 * inch, 0.75 * inch, f"{title}")
+
+    # Draw vendor unit
+    display_text = display_unit if is_case_of_containers else vendor_unit
+    vendor_unit_font_size = min(default_normal_size,
+                                default_normal_size * (max_text_width / c.stringWidth(display_text, "Helvetica",
+                                                                                      default_normal_size)))
+    c.setFont("Helvetica", vendor_unit_font_size)
+    c.drawString(1.25 * inch, 0.5 * inch, f"{display_text}")
+
+    # Draw quantity and SKU
+    c.setFont("Helvetica", default_normal_size)
+    c.drawString(1.25 * inch, 0.25 * inch, f"≈{per_unit_quantity:.2f} {uom}")
+    c.drawString(2.2 * inch, 0.05 * inch, f"{sku}")
+
+    # Draw barcode as vectors (cached per lot code)
+    draw_code128(c, lot_number, 0 * inch, 0.70 * inch, width=1.27 * inch, height=0.30 * inch)
+
+
+def add_labels(sheet, copies, **label):
+    """Add `copies` identical labels to a LabelSheet; the label is drawn once. Returns the pages added."""
+    key = tuple(sorted(label.items()))
+    return sheet.add(key, lambda c: draw_label(c, **label), copies)
+
+
+def generate_pdf(lot_number, sku, title, vendor_unit, quantity, vendor_quantity, uom, expiry_date, copies=1):
+    """PDF of `copies` identical labels, one per page"""
+    sheet = LabelSheet(LABEL_PAGE_SIZE)
+    add_labels(sheet, copies, lot_number=lot_number, sku=sku, title=title, vendor_unit=vendor_unit,
+               quantity=quantity, vendor_quantity=vendor_quantity, uom=uom, expiry_date=expiry_date)
+    return sheet.save()
 
 
 def display_pdf(pdf_bytes):
@@ -400,7 +331,8 @@ try:
                 # The fetch_stock_lots() and fetch_all_products() functions
                 # will be called on-demand by the helper functions when needed
 
-                pdf_buffers = []
+                # All labels go into one multi-page PDF
+                label_sheet = LabelSheet(LABEL_PAGE_SIZE)
                 processed_items = []  # Keep track of processed items for summary
 
                 try:
@@ -443,27 +375,25 @@ try:
                                 st.warning(
                                     f"Label count for {item.get('item_code')} reduced from {original_label_count} to {max_labels} (maximum limit).")
 
-                            # Generate labels for this item
+                            # Generate labels for this item (identical, so the label is drawn once)
                             successful_labels = 0
-                            for i in range(int(ceiling_quantity)):
-                                try:
-                                    pdf_buffer = generate_pdf(
-                                        lot_number=lot_number,
-                                        sku=item.get('item_code', ''),
-                                        title=item.get('item_title', ''),
-                                        vendor_unit=item.get('vendor_unit', ''),
-                                        quantity=float(item.get('quantity', 0)),
-                                        vendor_quantity=vendor_quantity,
-                                        uom=item.get('unit', ''),
-                                        expiry_date=expiry_date
-                                    )
-                                    pdf_buffers.append(pdf_buffer)
-                                    successful_labels += 1
-
-                                except Exception as label_error:
-                                    st.error(
-                                        f"Error generating label {i + 1} for {item.get('item_code')}: {str(label_error)}")
-                                    continue
+                            try:
+                                successful_labels = add_labels(
+                                    label_sheet,
+                                    int(ceiling_quantity),
+                                    lot_number=lot_number,
+                                    sku=item.get('item_code', ''),
+                                    title=item.get('item_title', ''),
+                                    vendor_unit=item.get('vendor_unit', ''),
+                                    quantity=float(item.get('quantity', 0)),
+                                    vendor_quantity=vendor_quantity,
+                                    uom=item.get('unit', ''),
+                                    expiry_date=expiry_date
+                                )
+
+                            except Exception as label_error:
+                                st.error(
+                                    f"Error generating labels for {item.get('item_code')}: {str(label_error)}")
 
                             # Record processed item information
                             processed_items.append({
@@ -481,12 +411,10 @@ try:
                             st.error(f"Error processing item {item.get('item_code')}: {str(item_error)}")
                             continue
 
-                    # After processing all items, combine PDFs if we have any
-                    if pdf_buffers:
+                    # After processing all items, finish the PDF if we have any labels
+                    if label_sheet.pages:
                         try:
-                            # Combine all generated PDFs
-                            pdf_buffer_combined = combine_pdfs(pdf_buffers)
-                            st.session_state.pdf_buffer = pdf_buffer_combined
+                            st.session_state.pdf_buffer = label_sheet.save()
                             st.session_state.pdf_generated = True
 
                             # Display success message and summary
@@ -503,7 +431,7 @@ try:
                             display_pdf(st.session_state.pdf_buffer)
 
                         except Exception as combine_error:
-                            st.error(f"Error combining PDFs: {str(combine_error)}")
+                            st.error(f"Error writing label PDF: {str(combine_error)}")
                     else:
                         st.error("No valid items found for label generation.")
 
@@ -513,14 +441,6 @@ try:
 
                     st.error(f"Traceback: {traceback.format_exc()}")
 
-                finally:
-                    # Clean up any remaining buffers
-                    for buffer in pdf_buffers:
-                        try:
-                            buffer.close()
-                        except:
-                            pass  # Ignore errors during cleanup
-
             else:
                 st.error("No items found for this PO.")
         else:
@@ -495,20 +495,18 @@ def _import_customer_orders_pdf(uploaded_file) -> tuple:
     Extrae cabecera + todos los productos (código, nombre, cantidad) para que aparezcan en Picking
     listos para escanear LOT e ingresar cantidades.
     """
-    try:
-        from PyPDF2 import PdfReader
-    except ImportError:
+    from shared.pdf_text import PdfReader, extract_pdf_texts
+    if PdfReader is None:
         return 0, 0, ["Falta instalar PyPDF2: pip install PyPDF2"]
 
     imported, skipped, errors = 0, 0, []
     try:
         pdf_bytes = uploaded_file.read()
-        reader = PdfReader(io.BytesIO(pdf_bytes))
-        text = ""
-        for page in reader.pages:
-            text += (page.extract_text() or "") + "\n"
+        _, text, error = next(extract_pdf_texts([(getattr(uploaded_file, "name", "co.pdf"), pdf_bytes)]))
     except Exception as e:
         return 0, 0, [f"Error leyendo PDF: {e}"]
+    if error:
+        return 0, 0, [f"Error leyendo PDF: {error}"]
 
     if not text.strip():
         return 0, 0, ["El PDF no contiene texto extraíble (puede ser solo imágenes)."]
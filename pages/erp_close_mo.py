@@ -143,24 +143,20 @@ def process_selected_orders(selected_orders, server_url=None, processing_mode="B
             results = []
             
             with st.spinner("Processing batch request..."):
-                for order in selected_orders:
+                progress_bar = st.progress(0)
+                # Lots run concurrently; results arrive as each one finishes
+                for done, outcome in enumerate(workflow.process_batch(selected_orders), 1):
+                    order = outcome['entry']
                     lot_code = order['lot_code']
-                    quantity = float(order['quantity'])
-                    uom = order.get('uom')
-                    
-                    # Process using ProductionWorkflow
-                    success, result_data, message = workflow.process_production_completion(
-                        lot_code=lot_code,
-                        produced_quantity=quantity,
-                        uom=uom,
-                        item_code=None  # Will be retrieved from MO lookup
-                    )
+                    success = outcome['success']
+                    message = outcome['message']
                     
                     results.append({
+                        'index': outcome['index'],
                         'lot_number': lot_code,
                         'success': success,
                         'message': message,
-                        'result_data': result_data
+                        'result_data': outcome['result_data']
                     })
                     
                     if success and order.get('id') is not None:
@@ -172,6 +168,10 @@ def process_selected_orders(selected_orders, server_url=None, processing_mode="B
                             'error': message
                         })
                         st.write(f"❌ {lot_code}: Failed - {message}")
+                    progress_bar.progress(done / len(selected_orders))
+                progress_bar.empty()
+            # Show the detailed results in selection order
+            results.sort(key=lambda r: r['index'])
 
             # Update database based on results
             st.write("### Processing Results:")
@@ -2,11 +2,13 @@
 import streamlit as st
 import logging
 import base64
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 # Import our separated components
-from organizer.print_mo.models import ManufacturingOrder, DataValidationError
+from organizer.print_mo.models import ManufacturingOrder, DataValidationError, prefetch_purchase_orders
 from organizer.print_mo.pdf_generator_bulk import PDFGenerator
 from organizer.print_mo.pdf_generator_bulk_simplified import PDFGenerator as SimplifiedPDFGenerator
 from shared.api_manager import APIManager
@@ -89,90 +91,133 @@ def display_cache_status():
         st.rerun()
 
 
-def fetch_mo_data(api: APIManager, mo_code: str) -> Optional[ManufacturingOrder]:
-    """Fetch manufacturing order data from API"""
+# Concurrent MO fetches; every request still goes through the shared MRPeasy rate limiter
+MAX_FETCH_WORKERS = 6
+
+
+@dataclass
+class MOFetchResult:
+    """Raw API payloads (or the failure reason) for one requested MO code"""
+    mo_code: str
+    basic_data: Optional[Dict[str, Any]] = None
+    detailed_data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+def fetch_mo_payloads(api: APIManager, mo_code: str) -> MOFetchResult:
+    """Resolve an MO code and fetch its details. Network only, safe to run in a worker thread."""
     try:
-        # Get basic MO info
         basic_mo_data = api.get_manufacturing_order_by_code(mo_code)
         if not basic_mo_data:
-            return None
-
-        # Store raw data in session state for debugging
-        if 'debug_data' not in st.session_state:
-            st.session_state.debug_data = []
-
-        # Get detailed information using the ID
-        man_ord_id = basic_mo_data.get('man_ord_id')
-        detailed_mo_data = api.get_manufacturing_order_details(man_ord_id)
+            return MOFetchResult(mo_code, error="not found")
+        detailed_mo_data = api.get_manufacturing_order_details(basic_mo_data.get('man_ord_id'))
+        return MOFetchResult(mo_code, basic_mo_data, detailed_mo_data)
+    except Exception as e:
+        logger.error(f"Error fetching MO data for {mo_code}: {str(e)}")
+        return MOFetchResult(mo_code, error=str(e))
 
-        # Store both basic and detailed data for debugging
-        debug_entry = {
-            'mo_code': mo_code,
-            'basic_data': basic_mo_data,
-            'detailed_data': detailed_mo_data
-        }
-        st.session_state.debug_data.append(debug_entry)
 
-        # Convert raw data to ManufacturingOrder object
-        mo = ManufacturingOrder.from_dict(basic_mo_data, detailed_mo_data, api)
+def record_debug_data(result: MOFetchResult, mo: Optional[ManufacturingOrder]) -> None:
+    """Store raw and processed data in session state for the debug panel"""
+    if 'debug_data' not in st.session_state:
+        st.session_state.debug_data = []
+    st.session_state.debug_data.append({
+        'mo_code': result.mo_code,
+        'basic_data': result.basic_data,
+        'detailed_data': result.detailed_data
+    })
+
+    if mo:
+        if 'debug_processed_data' not in st.session_state:
+            st.session_state.debug_processed_data = []
+        st.session_state.debug_processed_data.append({
+            'mo_code': result.mo_code,
+            'processed_data': {
+                'code': mo.code,
+                'item_code': mo.item_code,
+                'item_title': mo.item_title,
+                'quantity': mo.quantity,
+                'unit': mo.unit,
+                'target_lots': [{'lot_id': lot.lot_id, 'code': lot.code, 'location': lot.location}
+                              for lot in mo.target_lots],
+                'parts': [{
+                    'lots': [{
+                        'lot_id': lot.lot_id,
+                        'code': lot.code,
+                        'item_code': lot.item_code,
+                        'item_title': lot.item_title,
+                        'location': lot.location,
+                        'booked': lot.booked
+                    } for lot in part.lots]
+                } for part in mo.parts],
+                'notes': [{'note_id': note.note_id, 'author': note.author, 'text': note.text}
+                         for note in mo.notes]
+            }
+        })
 
-        # Store processed data for debugging
-        if mo:
-            if 'debug_processed_data' not in st.session_state:
-                st.session_state.debug_processed_data = []
-            st.session_state.debug_processed_data.append({
-                'mo_code': mo_code,
-                'processed_data': {
-                    'code': mo.code,
-                    'item_code': mo.item_code,
-                    'item_title': mo.item_title,
-                    'quantity': mo.quantity,
-                    'unit': mo.unit,
-                    'target_lots': [{'lot_id': lot.lot_id, 'code': lot.code, 'location': lot.location}
-                                  for lot in mo.target_lots],
-                    'parts': [{
-                        'lots': [{
-                            'lot_id': lot.lot_id,
-                            'code': lot.code,
-                            'item_code': lot.item_code,
-                            'item_title': lot.item_title,
-                            'location': lot.location,
-                            'booked': lot.booked
-                        } for lot in part.lots]
-                    } for part in mo.parts],
-                    'notes': [{'note_id': note.note_id, 'author': note.author, 'text': note.text}
-                             for note in mo.notes]
-                }
-            })
-
-        return mo
 
+def fetch_mo_data(api: APIManager, mo_code: str) -> Optional[ManufacturingOrder]:
+    """Fetch manufacturing order data from API"""
+    result = fetch_mo_payloads(api, mo_code)
+    if result.error:
+        return None
+    try:
+        mo = ManufacturingOrder.from_dict(result.basic_data, result.detailed_data, api)
     except Exception as e:
         logger.error(f"Error fetching MO data: {str(e)}")
-        return None
+        mo = None
+    record_debug_data(result, mo)
+    return mo
 
 
 def fetch_multiple_mos(api: APIManager, mo_codes: List[str]) -> List[ManufacturingOrder]:
-    """Fetch multiple manufacturing orders"""
+    """Fetch multiple manufacturing orders concurrently, returned in input order.
+
+    Codes and details are fetched on a bounded thread pool, then every purchase order
+    referenced by the batch is prefetched in one pass before the models are built.
+    MOs that fail are reported in the UI and left out of the result.
+    """
     valid_mos = []
 
     # Initialize cache first
     if not initialize_cache(api):
         return valid_mos
 
-    # Now process the manufacturing orders
-    progress_bar = st.progress(0)
-    total_mos = len([code for code in mo_codes if code.strip()])
+    codes = [code.strip() for code in mo_codes if code.strip()]  # Skip empty lines
+    if not codes:
+        return valid_mos
 
-    for i, mo_code in enumerate(mo_codes, 1):
-        mo_code = mo_code.strip()
-        if mo_code:  # Skip empty lines
-            mo = fetch_mo_data(api, mo_code)
-            if mo:
-                valid_mos.append(mo)
-            progress_bar.progress(i / total_mos)
+    progress_bar = st.progress(0)
+    results: List[Optional[MOFetchResult]] = [None] * len(codes)
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(codes))) as executor:
+        futures = {executor.submit(fetch_mo_payloads, api, code): i for i, code in enumerate(codes)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            # First half of the bar: network fetches
+            progress_bar.progress(done / len(codes) * 0.5)
+
+    prefetch_purchase_orders([r.detailed_data for r in results if r.detailed_data], api)
+
+    failures = []
+    for i, result in enumerate(results, 1):
+        mo = None
+        if result.error:
+            failures.append(f"{result.mo_code}: {result.error}")
+        else:
+            try:
+                mo = ManufacturingOrder.from_dict(result.basic_data, result.detailed_data, api)
+            except Exception as e:
+                logger.error(f"Error building MO {result.mo_code}: {str(e)}")
+                failures.append(f"{result.mo_code}: {str(e)}")
+        if result.basic_data:
+            record_debug_data(result, mo)
+        if mo:
+            valid_mos.append(mo)
+        progress_bar.progress(0.5 + i / len(results) * 0.5)
 
     progress_bar.empty()
+    if failures:
+        st.warning("Could not load some manufacturing orders:\n\n" + "\n".join(f"- {f}" for f in failures))
     return valid_mos
 
 
@@ -11,13 +11,16 @@ from io import BytesIO
 import re
 
 from shared.api_manager import APIManager
+from shared.reference_cache import get_reference_cache
+from shared.recipe_index import get_recipe_index
+from shared.bom_parts import find_bom_parts_csv, get_bom_parts_index
+from shared.pdf_styles import paragraph_style
 from shared.gdocs_manager import GDocsManager
 from config import secrets
 from googleapiclient.errors import HttpError
 from reportlab.lib import colors
 import os
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, Flowable
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
@@ -185,20 +188,18 @@ class BarCode128(Flowable):
         barcode.drawOn(self.canv, x, 0)
 
 
-@st.cache_data(ttl=3600*6, show_spinner=False)  # 6 hours cache
+@st.cache_data(ttl=60*15, show_spinner=False)  # 15 min in memory; persistent copy in data/cache
 def fetch_items_cache(api_key: str, api_secret: str) -> List[Dict]:
-    """Fetch and cache all items for 6 hours"""
-    api = APIManager()
-    items = api.fetch_all_products()
+    """Fetch all items from the shared persistent reference cache"""
+    items = get_reference_cache().get_all('items', APIManager())
     logger.info(f"Items cache initialized with {len(items) if items else 0} items")
     return items if items else []
 
 
-@st.cache_data(ttl=3600*6, show_spinner=False)  # 6 hours cache
+@st.cache_data(ttl=60*15, show_spinner=False)  # 15 min in memory; persistent copy in data/cache
 def fetch_units_cache(api_key: str, api_secret: str) -> List[Dict]:
-    """Fetch and cache all units for 6 hours"""
-    api = APIManager()
-    units = api.fetch_units()
+    """Fetch all units from the shared persistent reference cache"""
+    units = get_reference_cache().get_all('units', APIManager())
     logger.info(f"Units cache initialized with {len(units) if units else 0} units")
     return units if units else []
 
@@ -218,6 +219,8 @@ def clear_all_caches():
     """Clear all cached data"""
     fetch_items_cache.clear()
     fetch_units_cache.clear()
+    get_reference_cache().invalidate('items')
+    get_reference_cache().invalidate('units')
     st.session_state.cache_metadata = {
         'items_loaded': False,
         'units_loaded': False,
@@ -591,12 +594,12 @@ def display_cache_status(items: List[Dict], units: List[Dict]):
         st.sidebar.text(f"Last Updated: {last_updated}")
 
         # Calculate time remaining
-        expiry_time = cache_info['last_updated'] + timedelta(hours=6)
+        expiry_time = cache_info['last_updated'] + timedelta(minutes=15)
         time_remaining = expiry_time - datetime.now()
-        hours_remaining = time_remaining.total_seconds() / 3600
+        minutes_remaining = time_remaining.total_seconds() / 60
         
-        if hours_remaining > 0:
-            st.sidebar.success(f"Valid for: {hours_remaining:.1f} hours")
+        if minutes_remaining > 0:
+            st.sidebar.success(f"Valid for: {minutes_remaining:.0f} minutes")
         else:
             st.sidebar.warning("Cache expired")
 
@@ -612,37 +615,53 @@ def display_cache_status(items: List[Dict], units: List[Dict]):
         st.rerun()
 
 
+# Lookup indexes keyed by (id(list), len(list), field). The list itself is kept in the
+# entry so its id cannot be reused by another object while the index is cached.
+_LOOKUP_INDEXES: Dict[Tuple, Tuple[List[Dict], Dict]] = {}
+_MAX_LOOKUP_INDEXES = 16
+
+
+def _lookup_index(rows: List[Dict], field: str, normalize=None) -> Dict:
+    """Return a {value: row} index over `rows`, built once per list (first match wins)."""
+    key = (id(rows), len(rows), field)
+    cached = _LOOKUP_INDEXES.get(key)
+    if cached is not None and cached[0] is rows:
+        return cached[1]
+    index = {}
+    for row in rows:
+        value = row.get(field)
+        if normalize is not None:
+            value = normalize(value)
+        if value is not None and value not in index:
+            index[value] = row
+    if len(_LOOKUP_INDEXES) >= _MAX_LOOKUP_INDEXES:
+        _LOOKUP_INDEXES.pop(next(iter(_LOOKUP_INDEXES)))
+    _LOOKUP_INDEXES[key] = (rows, index)
+    return index
+
+
 def get_unit_by_id(unit_id: int, units: List[Dict]) -> str:
     """Get unit name by unit_id"""
     if not units or not unit_id:
         return 'unit'
     
-    for unit in units:
-        if unit.get('unit_id') == unit_id:
-            return unit.get('title', 'unit')
-    
-    return 'unit'
+    unit = _lookup_index(units, 'unit_id').get(unit_id)
+    return unit.get('title', 'unit') if unit else 'unit'
 
 
 def get_item_by_article_id(article_id: int, items: List[Dict]) -> Optional[Dict]:
     """Get item details by article_id"""
     if not items:
         return None
-    for item in items:
-        if item.get('article_id') == article_id:
-            return item
-    return None
+    return _lookup_index(items, 'article_id').get(article_id)
 
 
 def get_item_by_code(item_code: str, items: List[Dict]) -> Optional[Dict]:
     """Get item details by item code from cached items (avoids API call)"""
     if not items or not item_code:
         return None
-    item_code_upper = item_code.strip().upper()
-    for item in items:
-        if item.get('code', '').upper() == item_code_upper:
-            return item
-    return None
+    index = _lookup_index(items, 'code', lambda code: (code or '').upper())
+    return index.get(item_code.strip().upper())
 
 
 def get_display_team_name(team: Optional[str]) -> str:
@@ -890,12 +909,13 @@ def extract_item_info_from_pdf_text(text_content):
 
 
 def find_recipe_pdf_from_zip(item_code, item_title, zip_path=None):
-    """Find recipe PDF from ZIP file by item code or title"""
+    """
+    Find recipe PDF from ZIP file by item code or title.
+    Uses the persisted recipe index (shared/recipe_index.py): PDFs are only parsed
+    when the ZIP is new or changed.
+    """
     if PdfReader is None:
         return {'type': 'error', 'error': 'PyPDF2_not_installed'}
-    import zipfile
-    import re
-    from io import BytesIO
 
     # Default path to recipes ZIP
     if zip_path is None:
@@ -907,102 +927,20 @@ def find_recipe_pdf_from_zip(item_code, item_title, zip_path=None):
         return None
     
     try:
-        item_code_lower = item_code.lower().strip()
-        item_code_upper = item_code.upper().strip()
-        item_title_lower = item_title.lower().strip()
-        
-        # Create search variations - more comprehensive
-        title_variations = [
-            item_title_lower,
-            item_title_lower.replace(' - ', ' '),
-            item_title_lower.replace('-', ' '),
-            item_title_lower.split(' - ')[0],
-            item_title_lower.split('(')[0].strip(),
-            item_title_lower.replace('tray', '').strip(),
-            item_title_lower.replace('bag', '').strip(),
-            item_title_lower.replace(' - bag', '').strip(),
-            item_title_lower.replace(' - tray', '').strip(),
-        ]
-        # Remove duplicates and empty strings, keep only meaningful variations
-        title_variations = list(set([v for v in title_variations if v and len(v) > 2]))
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_file:
-            # Get all PDF files
-            pdf_files = [f for f in zip_file.namelist() if f.lower().endswith('.pdf')]
-            
-            # Search through each PDF
-            for pdf_name in pdf_files:
-                try:
-                    # Read PDF from ZIP
-                    pdf_data = zip_file.read(pdf_name)
-                    pdf_reader = PdfReader(BytesIO(pdf_data))
-                    
-                    # Extract text from all pages
-                    full_text = ""
-                    for page in pdf_reader.pages:
-                        full_text += page.extract_text() + "\n"
-                    
-                    full_text_lower = full_text.lower()
-                    
-                    # Extract item info from PDF
-                    pdf_item_name, pdf_item_code = extract_item_info_from_pdf_text(full_text)
-                    
-                    # Check if this PDF contains the item code - be more flexible
-                    # First check: direct code match in text (case insensitive)
-                    code_in_text = item_code_lower in full_text_lower or item_code_upper in full_text
-                    
-                    # Also check for code without spaces or with different formatting
-                    code_no_spaces = item_code_upper.replace(' ', '')
-                    code_in_text = code_in_text or code_no_spaces in full_text.replace(' ', '')
-                    
-                    # Second check: extracted code matches
-                    extracted_code_matches = pdf_item_code and pdf_item_code.upper() == item_code_upper
-                    
-                    # If code is found in text, it's a match (even if extraction failed)
-                    if code_in_text:
-                        # Found matching PDF by code - return it with extracted info
-                        # Use extracted code if available, otherwise use searched code
-                        final_code = pdf_item_code if pdf_item_code else item_code_upper
-                        return {
-                            'type': 'pdf',
-                            'pdf_data': pdf_data,
-                            'pdf_name': pdf_name,
-                            'text_content': full_text,
-                            'item_name': pdf_item_name,  # Name extracted from PDF
-                            'item_code': final_code   # Code from PDF or searched code
-                        }
-                    
-                    # Check if this PDF contains any title variation
-                    for title_var in title_variations:
-                        if title_var and len(title_var) > 2 and title_var in full_text_lower:
-                            # If we found a title match, check if code also matches
-                            if extracted_code_matches:
-                                # Perfect match: both title and code match
-                                return {
-                                    'type': 'pdf',
-                                    'pdf_data': pdf_data,
-                                    'pdf_name': pdf_name,
-                                    'text_content': full_text,
-                                    'item_name': pdf_item_name,
-                                    'item_code': pdf_item_code
-                                }
-                            elif not pdf_item_code:
-                                # Title matches but no code found in PDF - still return it
-                                # (might be a valid match if code extraction failed)
-                                return {
-                                    'type': 'pdf',
-                                    'pdf_data': pdf_data,
-                                    'pdf_name': pdf_name,
-                                    'text_content': full_text,
-                                    'item_name': pdf_item_name,
-                                    'item_code': item_code_upper  # Use searched code as fallback
-                                }
-                            
-                except Exception as e:
-                    logger.warning(f"Error reading PDF {pdf_name}: {e}")
-                    continue
-        
-        return None
+        index = get_recipe_index(zip_path)
+        entry = index.find(item_code, item_title)
+        if not entry:
+            return None
+        pdf_item_name, _ = extract_item_info_from_pdf_text(entry['text'])
+        return {
+            'type': 'pdf',
+            'pdf_data': index.read_pdf(entry['pdf_name']),
+            'pdf_name': entry['pdf_name'],
+            'text_content': entry['text'],
+            'item_name': pdf_item_name,  # Name extracted from PDF
+            # Code from PDF, or the searched code if extraction failed
+            'item_code': entry['item_code'] or (item_code or '').upper().strip()
+        }
         
     except Exception as e:
         logger.error(f"Error reading recipes ZIP: {e}")
@@ -1322,10 +1260,9 @@ def generate_recipe_pdf_from_gdocs(recipe_data, item_code, item_title):
     elements = []
     
     # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
+    title_style = paragraph_style(
         'RecipeTitle',
-        parent=styles['Heading1'],
+        parent='Heading1',
         fontSize=20,
         textColor=colors.HexColor('#1E3A8A'),
         spaceAfter=20,
@@ -1333,9 +1270,9 @@ def generate_recipe_pdf_from_gdocs(recipe_data, item_code, item_title):
         fontName='Helvetica-Bold'
     )
     
-    section_style = ParagraphStyle(
+    section_style = paragraph_style(
         'SectionStyle',
-        parent=styles['Heading2'],
+        parent='Heading2',
         fontSize=14,
         textColor=colors.HexColor('#4B5563'),
         spaceAfter=12,
@@ -1343,9 +1280,9 @@ def generate_recipe_pdf_from_gdocs(recipe_data, item_code, item_title):
         fontName='Helvetica-Bold'
     )
     
-    body_style = ParagraphStyle(
+    body_style = paragraph_style(
         'BodyStyle',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=11,
         leading=14,
         spaceAfter=8
@@ -1395,18 +1332,7 @@ def generate_recipe_pdf_from_gdocs(recipe_data, item_code, item_title):
 def _get_bom_parts_csv_path():
     """Return path to BOM parts CSV if present: data/bom_parts.csv or latest data/parts_*.csv."""
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(project_root, 'data')
-    fixed = os.path.join(data_dir, 'bom_parts.csv')
-    if os.path.isfile(fixed):
-        return fixed
-    try:
-        import glob
-        parts_files = glob.glob(os.path.join(data_dir, 'parts_*.csv'))
-        if parts_files:
-            return max(parts_files, key=os.path.getmtime)
-    except Exception:
-        pass
-    return None
+    return find_bom_parts_csv(os.path.join(project_root, 'data'))
 
 
 def _load_bom_for_product(product_code, csv_path=None):
@@ -1415,47 +1341,12 @@ def _load_bom_for_product(product_code, csv_path=None):
     Returns dict with bom_number, bom_name, rows; or None if not found.
     rows: list of (part_no, part_description, quantity_with_unit).
     product_code is matched against 'Product number' (e.g. A00558 or A00534-del...).
+    The CSV is parsed once per file version (shared/bom_parts.py).
     """
-    import csv
     path = csv_path or _get_bom_parts_csv_path()
     if not path or not os.path.isfile(path):
         return None
-    bom_number = None
-    bom_name = None
-    rows = []
-    try:
-        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
-            reader = csv.DictReader(f)
-            if not reader.fieldnames:
-                return None
-            code_upper = (product_code or '').strip().upper()
-            code_base = code_upper.split('-')[0] if code_upper else ''
-            for row in reader:
-                pn = (row.get('Product number') or '').strip()
-                if not pn:
-                    continue
-                pn_base = pn.upper().split('-')[0]
-                if pn_base != code_base and pn.upper() != code_upper:
-                    continue
-                if bom_number is None:
-                    bom_number = (row.get('BOM number') or '').strip()
-                    bom_name = (row.get('BOM name') or '').strip()
-                part_no = (row.get('Part No.') or '').strip()
-                part_desc = (row.get('Part description') or '').strip()
-                unit = (row.get('Unit of measurement') or '').strip()
-                qty_str = row.get('Quantity', '')
-                try:
-                    qty_val = float(qty_str)
-                    qty_display = f"{qty_val:.2f}".rstrip('0').rstrip('.') if qty_val != int(qty_val) else str(int(qty_val))
-                except (ValueError, TypeError):
-                    qty_display = str(qty_str).strip()
-                qty_with_unit = f"{qty_display} {unit}" if unit else qty_display
-                rows.append((part_no, part_desc, qty_with_unit))
-    except Exception as e:
-        logger.warning("Failed to load BOM CSV %s: %s", path, e)
-    if not rows:
-        return None
-    return {'bom_number': bom_number or '', 'bom_name': bom_name or '', 'rows': rows}
+    return get_bom_parts_index(path).get(product_code)
 
 
 def _parse_recipe_text_to_sections(full_text):
@@ -1528,45 +1419,44 @@ def generate_fava_recipe_pdf_from_zip_recipe(recipe_zip_dict, locale: str = 'en'
                             rightMargin=0.5*inch, leftMargin=0.5*inch,
                             topMargin=0.75*inch, bottomMargin=0.5*inch)
     elements = []
-    styles = getSampleStyleSheet()
 
-    title_style = ParagraphStyle(
+    title_style = paragraph_style(
         'FavaRecipeTitle',
-        parent=styles['Heading1'],
+        parent='Heading1',
         fontSize=18,
         textColor=colors.HexColor('#1E3A8A'),
         spaceAfter=6,
         alignment=TA_CENTER,
         fontName='Helvetica-Bold'
     )
-    subtitle_style = ParagraphStyle(
+    subtitle_style = paragraph_style(
         'FavaRecipeSubtitle',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=11,
         textColor=colors.HexColor('#4B5563'),
         spaceAfter=16,
         alignment=TA_CENTER,
         fontName='Helvetica'
     )
-    section_header_style = ParagraphStyle(
+    section_header_style = paragraph_style(
         'FavaSectionHeader',
-        parent=styles['Heading2'],
+        parent='Heading2',
         fontSize=12,
         fontName='Helvetica-Bold',
         spaceAfter=10,
         alignment=TA_LEFT
     )
-    header_style = ParagraphStyle(
+    header_style = paragraph_style(
         'FavaTableHeader',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=10,
         fontName='Helvetica-Bold',
         textColor=colors.white,
         alignment=TA_CENTER
     )
-    cell_style = ParagraphStyle(
+    cell_style = paragraph_style(
         'FavaCell',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=9,
         fontName='Helvetica',
         leading=12
@@ -1584,7 +1474,7 @@ def generate_fava_recipe_pdf_from_zip_recipe(recipe_zip_dict, locale: str = 'en'
         elements.append(Paragraph(bom_title, title_style))
         elements.append(Spacer(1, 0.08*inch))
         # Product, Number, Name (like the reference document)
-        info_style = ParagraphStyle(
+        info_style = paragraph_style(
             'BOMInfo', parent=subtitle_style, fontSize=10, alignment=TA_LEFT, spaceAfter=2
         )
         elements.append(Paragraph(f"<b>Product:</b> {item_code} {item_name}", info_style))
@@ -1715,10 +1605,9 @@ def generate_mo_recipe_pdf(mo_data, mo_full_data, items_cache, units_cache, loca
     elements = []
     
     # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
+    title_style = paragraph_style(
         'CustomTitle',
-        parent=styles['Heading1'],
+        parent='Heading1',
         fontSize=18,
         textColor=colors.HexColor('#1E3A8A'),
         spaceAfter=8,
@@ -1726,9 +1615,9 @@ def generate_mo_recipe_pdf(mo_data, mo_full_data, items_cache, units_cache, loca
         fontName='Helvetica-Bold'
     )
     
-    subtitle_style = ParagraphStyle(
+    subtitle_style = paragraph_style(
         'CustomSubtitle',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=12,
         textColor=colors.HexColor('#4B5563'),
         spaceAfter=20,
@@ -1736,27 +1625,27 @@ def generate_mo_recipe_pdf(mo_data, mo_full_data, items_cache, units_cache, loca
         fontName='Helvetica'
     )
     
-    section_header_style = ParagraphStyle(
+    section_header_style = paragraph_style(
         'SectionHeader',
-        parent=styles['Heading2'],
+        parent='Heading2',
         fontSize=12,
         fontName='Helvetica-Bold',
         spaceAfter=12,
         alignment=TA_LEFT
     )
     
-    header_style = ParagraphStyle(
+    header_style = paragraph_style(
         'CustomHeader',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=10,
         fontName='Helvetica-Bold',
         textColor=colors.white,
         alignment=TA_CENTER
     )
     
-    cell_style = ParagraphStyle(
+    cell_style = paragraph_style(
         'CustomCell',
-        parent=styles['Normal'],
+        parent='Normal',
         fontSize=9,
         fontName='Helvetica',
         leading=12
@@ -1778,7 +1667,7 @@ def generate_mo_recipe_pdf(mo_data, mo_full_data, items_cache, units_cache, loca
         except (ValueError, TypeError):
             pass
     if mo_code or date_str:
-        mo_date_style = ParagraphStyle(
+        mo_date_style = paragraph_style(
             'MODate', parent=subtitle_style, fontSize=11, textColor=colors.HexColor('#4B5563')
         )
         mo_line = f"<b>{mo_code}</b>    {date_str}" if (mo_code and date_str) else (mo_code or date_str)
@@ -18,7 +18,11 @@ import requests
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from shared.weightlabelprinter_helper import insert_production_quantity, get_label_printer_quantity
+from shared.weightlabelprinter_helper import (
+    insert_production_quantity,
+    get_label_printer_quantity,
+    get_label_printer_quantities,
+)
 from shared.production_workflow import ProductionWorkflow
 from shared.database_manager import DatabaseManager
 from shared.api_manager import APIManager
@@ -443,8 +447,9 @@ if lookup_clicked:
             q, u, canonical_lot = None, None, None
             source_used = None
             # Try printer (both forms)
+            printer_quantities = get_label_printer_quantities([lot_trim, alt_code])
             for code in (lot_trim, alt_code):
-                pq, pu = get_label_printer_quantity(code)
+                pq, pu = printer_quantities.get(code, (None, None))
                 if pq is not None and pq > 0:
                     q, u = pq, pu or ""
                     source_used = "impresora de etiquetas"
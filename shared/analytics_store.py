@@ -0,0 +1,207 @@
+"""
+SQLite analytics mirror of the JSON sales tables (Clover and Silverware).
+
+DatabaseManager's JSON fallback only understands a single table and one WHERE
+condition, so the sales analysis queries (JOINs, BETWEEN, GROUP BY DATE()/WEEKDAY())
+are answered from this mirror instead, stored in data/clover/analytics.db.
+
+- Each table is copied from its JSON table store (shared/table_store.py) into an
+  indexed SQLite table, and copied again only when the JSON files change.
+- The MySQL dialect used by the queries is translated: %s placeholders and
+  WEEKDAY() (Monday = 0). DATE(), COALESCE, JOIN and GROUP BY run as-is.
+- Date/time columns are stored as 'YYYY-MM-DD HH:MM:SS' text so BETWEEN compares
+  correctly, and come back as datetime/date objects like they do from MySQL.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from shared.table_store import get_table_store
+
+logger = logging.getLogger(__name__)
+
+# table: (columns the analysis queries rely on, indexed columns)
+ANALYTICS_TABLES = {
+    'clover_orders': (
+        ('order_id', 'created_time', 'total', 'delivery_method', 'delivery_platform',
+         'order_level_discount_amount'),
+        ('order_id', 'created_time'),
+    ),
+    'clover_orders_items': (
+        ('item_id', 'order_id', 'clover_name', 'final_price', 'item_level_discount_amount', 'item_sku'),
+        ('order_id', 'item_id', 'item_sku'),
+    ),
+    'clover_orders_items_modifications': (('item_id', 'modifier_name', 'price'), ('item_id',)),
+    'clover_orders_payments': (('order_id', 'tip_amount', 'tax_amount'), ('order_id',)),
+    'clover_items': (('item_sku', 'name', 'category_id'), ('item_sku',)),
+    'clover_category': (('category_id', 'category_name'), ('category_id',)),
+    'clover_daily_rollup': (
+        ('rollup_key', 'level', 'date', 'weekday', 'platform', 'item_sku', 'orders', 'quantity', 'total_sales',
+         'total_tips', 'total_mods', 'order_discounts', 'item_discounts'),
+        ('date',),
+    ),
+    'silverware_orders': (('check_number', 'start_date', 'total'), ('check_number', 'start_date')),
+    'silverware_orders_items': (('check_number', 'item_sku', 'price', 'discount_value'), ('check_number',)),
+    'silverware_orders_payments': (('check_number', 'tip_amount'), ('check_number',)),
+    'silverware_items': (('item_sku', 'name', 'category_id'), ('item_sku',)),
+    'silverware_category': (('category_id', 'category_name'), ('category_id',)),
+}
+
+DATETIME_COLUMNS = ('created_time', 'start_date', 'inserted_at', 'first_at', 'last_at')
+DATE_COLUMNS = ('date',)
+
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)', re.IGNORECASE)
+_WEEKDAY = re.compile(r'\bWEEKDAY\(\s*([\w.]+)\s*\)', re.IGNORECASE)
+
+
+def query_tables(query: str) -> List[str]:
+    """Table names referenced in FROM/JOIN clauses (lower case)."""
+    return [name.lower() for name in _TABLE_REF.findall(query)]
+
+
+def is_analytics_query(query: str) -> bool:
+    """True if every table the SELECT reads is mirrored here."""
+    tables = query_tables(query)
+    return bool(tables) and all(table in ANALYTICS_TABLES for table in tables)
+
+
+def to_sqlite(query: str) -> str:
+    """Translate the MySQL dialect of the sales queries to SQLite."""
+    query = query.replace('%s', '?')
+    return _WEEKDAY.sub(r"((CAST(strftime('%w', \1) AS INTEGER) + 6) % 7)", query)
+
+
+def _normalize_datetime(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and len(value) >= 19 and value[10] in ('T', ' '):
+        return f"{value[:10]} {value[11:19]}"
+    return value
+
+
+def _to_sql_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return _normalize_datetime(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _from_sql_value(column: str, value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    try:
+        if column in DATETIME_COLUMNS:
+            return datetime.fromisoformat(value)
+        if column in DATE_COLUMNS:
+            return date.fromisoformat(value)
+    except ValueError:
+        pass
+    return value
+
+
+class AnalyticsStore:
+    """Indexed SQLite copy of the JSON sales tables, refreshed when they change"""
+
+    def __init__(self, db_path: Path, table_file: Callable[[str], Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._table_file = table_file
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS analytics_sync (table_name TEXT PRIMARY KEY, signature TEXT)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        # Readers keep using the previous copy while a table is being reloaded
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def refresh(self, tables: Sequence[str]) -> None:
+        """Reload the mirrored tables whose JSON files changed since the last copy."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                synced = dict(conn.execute("SELECT table_name, signature FROM analytics_sync").fetchall())
+                for table in dict.fromkeys(tables):
+                    store = get_table_store(self._table_file(table))
+                    signature = json.dumps(store.signature())
+                    if synced.get(table) != signature:
+                        self._load_table(conn, table, store.rows(), signature)
+            finally:
+                conn.close()
+
+    def _load_table(self, conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]],
+                    signature: str) -> None:
+        declared, indexed = ANALYTICS_TABLES[table]
+        columns = list(declared)
+        for row in rows:
+            for column in row:
+                if column not in columns:
+                    columns.append(column)
+        column_sql = ', '.join(f'"{c}"' for c in columns)
+        # One transaction, so readers never see the table missing or half loaded
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'CREATE TABLE "{table}" ({column_sql})')
+            conn.executemany(
+                f'INSERT INTO "{table}" ({column_sql}) VALUES ({", ".join("?" * len(columns))})',
+                [
+                    tuple(_normalize_datetime(row.get(c)) if c in DATETIME_COLUMNS else _to_sql_value(row.get(c))
+                          for c in columns)
+                    for row in rows
+                ],
+            )
+            for column in indexed:
+                conn.execute(f'CREATE INDEX "idx_{table}_{column}" ON "{table}" ("{column}")')
+            conn.execute(
+                "INSERT OR REPLACE INTO analytics_sync (table_name, signature) VALUES (?, ?)",
+                (table, signature),
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        logger.info(f"Analytics mirror of {table} reloaded ({len(rows)} rows)")
+
+    def fetch_all(self, query: str, values: Optional[Tuple] = None,
+                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run a SELECT over the mirrored tables and return dict rows."""
+        self.refresh(query_tables(query))
+        conn = self._connect()
+        try:
+            cursor = conn.execute(to_sqlite(query), tuple(_to_sql_value(v) for v in (values or ())))
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchmany(limit) if limit else cursor.fetchall()
+        finally:
+            conn.close()
+        return [{name: _from_sql_value(name, value) for name, value in zip(names, row)} for row in rows]
+
+
+_stores: Dict[Path, AnalyticsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_analytics_store(db_path: Path, table_file: Callable[[str], Path]) -> AnalyticsStore:
+    """Return the process-wide analytics store for a database file"""
+    key = Path(db_path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = AnalyticsStore(db_path, table_file)
+        return store
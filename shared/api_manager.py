@@ -1,14 +1,224 @@
 # api_manager.py
+import re
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, Future
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from config import secrets
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Union, Iterator, Tuple
 
 # Configuration
 BASE_URL = 'https://api.mrpeasy.com/rest/v1'
 
+# Transport settings (keep-alive pool shared by every APIManager with the same credentials).
+# Override the pool size with MRPEASY_POOL_SIZE in secrets or .env.
+POOL_SIZE = 20
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0  # 1s, 2s, 4s... unless the server sends Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+# (connect, read) timeouts in seconds, keyed by the first path segment of the endpoint
+DEFAULT_TIMEOUT = (5, 30)
+ENDPOINT_TIMEOUTS = {
+    'items': (5, 60),
+    'lots': (5, 60),
+    'manufacturing-orders': (5, 45),
+    'customer-orders': (5, 45),
+    'purchase-orders': (5, 45),
+    'boms': (5, 45),
+    'routings': (5, 45),
+}
+
+# Pagination: MRPeasy list endpoints page with a "range: items=N-M" header and
+# report the total in "Content-Range: items N-M/TOTAL"
+PAGE_SIZE = 100
+MAX_PAGE_WORKERS = 4
+_CONTENT_RANGE_TOTAL = re.compile(r'/\s*(\d+)\s*$')
+
+# Client-side rate limit shared by every APIManager in the process (all Streamlit sessions).
+# Override with MRPEASY_REQUESTS_PER_MINUTE / MRPEASY_RATE_BURST in secrets or .env.
+DEFAULT_REQUESTS_PER_MINUTE = 100
+DEFAULT_RATE_BURST = 10
+
+# Purchase orders rarely change while an MO batch is printed; cache them briefly
+PURCHASE_ORDER_TTL_SECONDS = 300
+
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _get_session(auth: HTTPBasicAuth, pool_size: int) -> requests.Session:
+    """Return the keep-alive session for these credentials, creating it on first use."""
+    key = (auth.username, auth.password, pool_size)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            # Retries are handled in APIManager._request so Retry-After and POST safety are respected
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.auth = auth
+            session.headers.update({'content-type': 'application/json'})
+            _sessions[key] = session
+        return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` sustained, up to `burst` at once.
+
+    A 429 from the server drains the bucket and blocks every caller until the
+    Retry-After delay has passed, so concurrent sessions back off together
+    instead of each one retrying into the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.configure(rate_per_minute, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def configure(self, rate_per_minute: float, burst: Optional[int] = None) -> None:
+        """Change the quota; tokens already accumulated are capped to the new burst."""
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        with self._lock:
+            self.rate = rate_per_minute / 60.0
+            self.capacity = max(1, int(burst if burst is not None else DEFAULT_RATE_BURST))
+            if hasattr(self, '_tokens'):
+                self._tokens = min(self._tokens, float(self.capacity))
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket and hold all callers for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._blocked_until)
+
+
+def get_rate_limiter() -> TokenBucket:
+    """Return the process-wide MRPeasy limiter, configured from secrets on first use."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            try:
+                rate = float(secrets.get('MRPEASY_REQUESTS_PER_MINUTE') or DEFAULT_REQUESTS_PER_MINUTE)
+                burst = int(secrets.get('MRPEASY_RATE_BURST') or DEFAULT_RATE_BURST)
+            except (TypeError, ValueError):
+                rate, burst = DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_RATE_BURST
+            _rate_limiter = TokenBucket(rate, burst)
+        return _rate_limiter
+
+
+def configure_rate_limit(requests_per_minute: float, burst: Optional[int] = None) -> None:
+    """Adjust the shared MRPeasy quota at runtime (affects every APIManager)."""
+    get_rate_limiter().configure(requests_per_minute, burst)
+
+
+class PurchaseOrderCache:
+    """TTL-bounded purchase-order cache with in-flight de-duplication.
+
+    Concurrent callers asking for the same PO share one request: the first caller
+    fetches it and the others wait on the same future. Only successful lookups are
+    cached, so a transient failure is retried by the next caller.
+    """
+
+    def __init__(self, ttl_seconds: float = PURCHASE_ORDER_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Any, Tuple[float, Dict]] = {}
+        self._inflight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_manager: 'APIManager', pur_ord_id: Any) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(pur_ord_id)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                return entry[1]
+            future = self._inflight.get(pur_ord_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[pur_ord_id] = future
+
+        if not owner:
+            return future.result()
+
+        po_data = None
+        try:
+            po_data = api_manager.get_single_purchase_order(pur_ord_id)
+        finally:
+            with self._lock:
+                if po_data is not None:
+                    self._entries[pur_ord_id] = (time.monotonic(), po_data)
+                del self._inflight[pur_ord_id]
+            future.set_result(po_data)
+        return po_data
+
+    def prefetch(self, api_manager: 'APIManager', pur_ord_ids, max_workers: int = MAX_PAGE_WORKERS) -> None:
+        """Fetch every id not already cached, concurrently, under the shared rate limit."""
+        with self._lock:
+            now = time.monotonic()
+            missing = {
+                po_id for po_id in pur_ord_ids
+                if po_id and not (po_id in self._entries and now - self._entries[po_id][0] < self.ttl_seconds)
+            }
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            list(pool.map(lambda po_id: self.get(api_manager, po_id), missing))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_purchase_order_cache = PurchaseOrderCache()
+
+
+class MRPeasyAPIError(ValueError):
+    """Raised when a MRPeasy list request returns a non-success status."""
+
+    def __init__(self, response: requests.Response, path: str):
+        self.response = response
+        self.status_code = response.status_code
+        super().__init__(f"MRPeasy {path} returned {response.status_code}: {response.text[:200]}")
+
+
+def _parse_content_range_total(header: Optional[str]) -> Optional[int]:
+    """Extract TOTAL from a 'items 0-99/TOTAL' header; None when absent or '*'."""
+    if not header:
+        return None
+    match = _CONTENT_RANGE_TOTAL.search(header)
+    return int(match.group(1)) if match else None
+
+
 class APIManager:
-    def __init__(self):
+    def __init__(self, pool_size: Optional[int] = None):
         self.base_url = BASE_URL
         # Access secrets safely when initializing, not at module level
         try:
@@ -19,26 +229,145 @@ class APIManager:
             self.auth = HTTPBasicAuth(mrp_secret_key, mrp_secret_secret)
         except (KeyError, TypeError, ValueError) as e:
             raise ValueError(f"Failed to initialize APIManager: {str(e)}. Please check your secrets configuration.")
+        if pool_size is None:
+            try:
+                pool_size = int(secrets.get('MRPEASY_POOL_SIZE') or POOL_SIZE)
+            except (TypeError, ValueError):
+                pool_size = POOL_SIZE
+        self.session = _get_session(self.auth, pool_size)
+
+    def _timeout_for(self, path: str) -> tuple:
+        """Resolve the (connect, read) timeout for an endpoint path such as 'lots/123'."""
+        return ENDPOINT_TIMEOUTS.get(path.strip('/').split('/')[0], DEFAULT_TIMEOUT)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request through the pooled session with uniform timeout and retry handling.
+
+        Every attempt first takes a token from the shared rate limiter. 429 responses
+        are retried for every method (the request was not processed); 5xx responses and
+        connection errors are retried only for idempotent methods so a POST is never
+        sent twice. The last response is returned once retries run out; a final 429
+        still pauses the shared limiter so other sessions back off too.
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self._timeout_for(path))
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        retry_5xx = method in IDEMPOTENT_METHODS
+
+        limiter = get_rate_limiter()
+        for attempt in range(MAX_RETRIES + 1):
+            limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not retry_5xx or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+                continue
+
+            status = response.status_code
+            if status not in RETRY_STATUSES:
+                return response
+            if status != 429 and not retry_5xx:
+                return response
+
+            delay = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            if attempt == MAX_RETRIES:
+                if status == 429:
+                    limiter.penalize(delay)
+                return response
+            print(f"[MRPeasy API] {method} {path} returned {status}; retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{MAX_RETRIES})")
+            if status == 429:
+                # Hold every caller, not just this one; the next acquire() waits it out
+                limiter.penalize(delay)
+            else:
+                time.sleep(delay)
+        return response
+
+    def _fetch_page(self, path: str, start: int, params: Optional[Dict] = None) -> Tuple[List[Dict], Optional[int]]:
+        """Fetch one page starting at offset `start`. Returns (rows, total or None)."""
+        response = self._request(
+            'GET', path,
+            params=params,
+            headers={'range': f'items={start}-{start + PAGE_SIZE - 1}'}
+        )
+        if response.status_code not in (200, 206):  # OK or Partial Content
+            raise MRPeasyAPIError(response, path)
+        try:
+            rows = response.json()
+        except ValueError:
+            raise ValueError(
+                f"Failed to parse JSON response from {path}. Status: {response.status_code}, "
+                f"Response text: {response.text[:200]}"
+            )
+        return rows or [], _parse_content_range_total(response.headers.get('Content-Range'))
+
+    def iter_pages(self, path: str, params: Optional[Dict] = None,
+                   max_workers: int = MAX_PAGE_WORKERS) -> Iterator[List[Dict]]:
+        """Stream every page of a MRPeasy list endpoint, in order.
+
+        The first page is yielded as soon as it arrives. When the response carries a
+        Content-Range total, the remaining pages are requested concurrently (bounded
+        by `max_workers`) while the caller processes earlier pages; every request
+        still takes a token from the shared rate limiter, so the fan-out stays within
+        the MRPeasy quota. Without a total, pages are fetched one after another until
+        an empty page, or a page shorter than the server's observed page size.
+
+        Raises:
+            MRPeasyAPIError: If any page returns a non-success status
+        """
+        first, total = self._fetch_page(path, 0, params)
+        if not first:
+            return
+        yield first
+
+        # The server may cap pages below PAGE_SIZE; step by what it actually returned
+        stride = len(first)
+        if total is None:
+            start, page = stride, first
+            while len(page) >= stride:
+                page, _ = self._fetch_page(path, start, params)
+                if not page:
+                    return
+                yield page
+                start += len(page)
+            return
+
+        starts = range(stride, total, stride)
+        if not starts:
+            return
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(starts))))
+        try:
+            futures = [pool.submit(self._fetch_page, path, start, params) for start in starts]
+            for future in futures:
+                page, _ = future.result()
+                if page:
+                    yield page
+        finally:
+            # Stop queued pages if the caller abandons the generator or a page fails
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_all(self, path: str, params: Optional[Dict] = None,
+                  max_workers: int = MAX_PAGE_WORKERS) -> List[Dict]:
+        """Fetch every row of a MRPeasy list endpoint (see iter_pages)."""
+        rows = []
+        for page in self.iter_pages(path, params, max_workers):
+            rows.extend(page)
+        return rows
 
     def fetch_routings(self):
         """Fetch all routings from MRPeasy"""
-        routings = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/routings",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                current_routings = response.json()
-                if not current_routings:
-                    break
-                routings.extend(current_routings)
-                start += 100
-            else:
-                return None
-        return routings
+        try:
+            return self.fetch_all('routings')
+        except MRPeasyAPIError:
+            return None
 
     def fetch_routing_by_code(self, routing_code: str) -> Optional[Dict]:
         """Fetch a specific routing by code from MRPeasy
@@ -50,11 +379,9 @@ class APIManager:
             Optional[Dict]: The routing data if found, None otherwise
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/routings",
-                auth=self.auth,
+            response = self._request(
+                'GET', 'routings',
                 params={'code': routing_code},
-                headers={'content-type': 'application/json'}
             )
             
             if response.status_code == 200:
@@ -67,32 +394,17 @@ class APIManager:
 
     def fetch_boms(self):
         """Fetch all bills of materials from MRPeasy"""
-        boms = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/boms",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                current_boms = response.json()
-                if not current_boms:
-                    break
-                boms.extend(current_boms)
-                start += 100
-            else:
-                return None
-        return boms
+        try:
+            return self.fetch_all('boms')
+        except MRPeasyAPIError:
+            return None
 
     def fetch_bom_by_product_id(self, product_id: int) -> Optional[List[Dict]]:
         """Fetch bills of materials for a specific product ID"""
         try:
-            response = requests.get(
-                f"{self.base_url}/boms",
-                auth=self.auth,
+            response = self._request(
+                'GET', 'boms',
                 params={'product_id': product_id},
-                headers={'content-type': 'application/json'}
             )
             if response.status_code == 200:
                 return response.json()
@@ -106,76 +418,32 @@ class APIManager:
     def fetch_units(self) -> Optional[List[Dict]]:
         """Fetch all units of measurement from MRPeasy"""
         try:
-            units = []
-            start = 0
-            while True:
-                response = requests.get(
-                    f"{self.base_url}/units",
-                    auth=self.auth,
-                    headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-                )
-                if response.status_code in [200, 206]:
-                    current_units = response.json()
-                    if not current_units:
-                        break
-                    units.extend(current_units)
-                    if len(current_units) < 100:
-                        break
-                    start += 100
-                else:
-                    print(f"Error fetching units: {response.status_code}")
-                    return None
-            return units
+            return self.fetch_all('units')
+        except MRPeasyAPIError as e:
+            print(f"Error fetching units: {e.status_code}")
+            return None
         except Exception as e:
             print(f"Exception fetching units: {e}")
             return None
 
     def fetch_vendors(self):
-        vendors = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/vendors",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                current_vendors = response.json()
-                if not current_vendors:
-                    break
-                vendors.extend(current_vendors)
-                start += 100
-            else:
-                return None
-        return vendors
+        try:
+            return self.fetch_all('vendors')
+        except MRPeasyAPIError:
+            return None
 
     def fetch_all_products(self):
-        all_products = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/items",  # Adjust endpoint as necessary,
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start+99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                products = response.json()
-                if not products:
-                    break
-                all_products.extend(products)
-                start += 100
-            else:
-                return None
-        return all_products
+        try:
+            return self.fetch_all('items')
+        except MRPeasyAPIError:
+            return None
 
     def get_manufacturing_order_by_code(self, mo_code: str) -> Optional[Dict]:
         try:
             print(f"Attempting to fetch MO with code: {mo_code}")
-            response = requests.get(
-                f"{self.base_url}/manufacturing-orders",
-                auth=self.auth,
+            response = self._request(
+                'GET', 'manufacturing-orders',
                 params={'code': mo_code},
-                headers={'content-type': 'application/json'}
             )
             print(f"API Response status: {response.status_code}")
             print(f"API Response content: {response.text}")
@@ -191,11 +459,7 @@ class APIManager:
 
     def get_manufacturing_order_details(self, mo_id: int):
         """Fetch complete details for a specific manufacturing order - by MO_ID"""
-        response = requests.get(
-            f"{self.base_url}/manufacturing-orders/{mo_id}",
-            auth=self.auth,
-            headers={'content-type': 'application/json'}
-        )
+        response = self._request('GET', f"manufacturing-orders/{mo_id}")
 
         if response.status_code == 200:
             return response.json()
@@ -229,90 +493,12 @@ class APIManager:
         Returns:
             List[Dict]: List of manufacturing orders matching the specified filters
         """
-        manufacturing_orders = []
-        start = 0
-
         try:
-            import time
-            while True:
-                response = requests.get(
-                    f"{self.base_url}/manufacturing-orders",
-                    auth=self.auth,
-                    params=filters,
-                    headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'},
-                    timeout=30  # Add timeout
-                )
-                
-                # Handle rate limiting with retry (MRPeasy limita solicitudes por minuto)
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    print(
-                        f"[MRPeasy API] Límite de solicitudes alcanzado (429). "
-                        f"Esperando {retry_after}s y reintentando automáticamente..."
-                    )
-                    time.sleep(retry_after)
-                    continue  # Retry the same request
-
-                if response.status_code in [200, 206]:
-                    try:
-                        orders = response.json()
-                    except ValueError as e:
-                        error_msg = f"Failed to parse JSON response. Status: {response.status_code}, Response text: {response.text[:200]}"
-                        print(f"Error: {error_msg}")
-                        raise ValueError(error_msg)
-                    
-                    if not orders:
-                        break
-                    manufacturing_orders.extend(orders)
-
-                    # If we received fewer than 100 records, we've reached the end
-                    if len(orders) < 100:
-                        break
-
-                    start += 100
-                    
-                    # Add a small delay between requests to avoid hitting rate limits
-                    # Only delay if we're fetching multiple pages
-                    if start > 0:
-                        time.sleep(0.5)  # 500ms delay between pages
-                elif response.status_code == 401:
-                    # Unauthorized - credentials issue
-                    error_msg = f"Authentication failed (401 Unauthorized). Please check your MRPEASY_API_KEY and MRPEASY_API_SECRET. Response: {response.text[:200]}"
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-                elif response.status_code == 403:
-                    # Forbidden - permission issue
-                    error_msg = f"Access forbidden (403). Your API credentials may not have permission to access manufacturing orders. Response: {response.text[:200]}"
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-                elif response.status_code == 404:
-                    # Not found - endpoint issue
-                    error_msg = f"Endpoint not found (404). The manufacturing-orders endpoint may not be available. Response: {response.text[:200]}"
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-                elif response.status_code == 429:
-                    # Rate limit exceeded
-                    retry_after = response.headers.get('Retry-After', '60')
-                    error_msg = (
-                        f"Rate limit exceeded (429 Too Many Requests). "
-                        f"MRPeasy está limitando las solicitudes. "
-                        f"Espera {retry_after} segundos antes de intentar nuevamente. "
-                        f"Si estás obteniendo todos los MOs, esto puede tardar varios minutos."
-                    )
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-                elif response.status_code >= 500:
-                    # Server error
-                    error_msg = f"MRPeasy server error ({response.status_code}). The service may be temporarily unavailable. Response: {response.text[:200]}"
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-                else:
-                    # Other error
-                    error_msg = f"Unexpected response from MRPeasy API. Status: {response.status_code}, Response: {response.text[:200]}"
-                    print(f"Error: {error_msg}")
-                    raise ValueError(error_msg)
-
-            return manufacturing_orders
+            return self.fetch_all('manufacturing-orders', params=filters)
+        except MRPeasyAPIError as e:
+            error_msg = self._describe_manufacturing_orders_error(e.response)
+            print(f"Error: {error_msg}")
+            raise ValueError(error_msg)
         except requests.exceptions.Timeout:
             error_msg = "Request to MRPeasy API timed out. Check your network connection."
             print(f"Error: {error_msg}")
@@ -329,33 +515,43 @@ class APIManager:
             print(f"Error: {error_msg}")
             raise ValueError(error_msg)
 
-    def fetch_customer_orders(self):
-        customer_orders = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/customer-orders",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
+    @staticmethod
+    def _describe_manufacturing_orders_error(response: requests.Response) -> str:
+        """Build a user-facing message for a failed manufacturing-orders list request."""
+        status = response.status_code
+        if status == 401:
+            # Unauthorized - credentials issue
+            return f"Authentication failed (401 Unauthorized). Please check your MRPEASY_API_KEY and MRPEASY_API_SECRET. Response: {response.text[:200]}"
+        if status == 403:
+            # Forbidden - permission issue
+            return f"Access forbidden (403). Your API credentials may not have permission to access manufacturing orders. Response: {response.text[:200]}"
+        if status == 404:
+            # Not found - endpoint issue
+            return f"Endpoint not found (404). The manufacturing-orders endpoint may not be available. Response: {response.text[:200]}"
+        if status == 429:
+            # Rate limit exceeded (after the transport's own retries)
+            retry_after = response.headers.get('Retry-After', '60')
+            return (
+                f"Rate limit exceeded (429 Too Many Requests). "
+                f"MRPeasy está limitando las solicitudes. "
+                f"Espera {retry_after} segundos antes de intentar nuevamente. "
+                f"Si estás obteniendo todos los MOs, esto puede tardar varios minutos."
             )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                orders = response.json()
-                if not orders:
-                    break
-                customer_orders.extend(orders)
-                start += 100
-            else:
-                return None
-        return customer_orders
+        if status >= 500:
+            # Server error
+            return f"MRPeasy server error ({status}). The service may be temporarily unavailable. Response: {response.text[:200]}"
+        return f"Unexpected response from MRPeasy API. Status: {status}, Response: {response.text[:200]}"
+
+    def fetch_customer_orders(self):
+        try:
+            return self.fetch_all('customer-orders')
+        except MRPeasyAPIError:
+            return None
 
     def get_customer_order_details(self, order_id: int) -> Optional[Dict]:
         """Obtiene el detalle de una CO por ID (incluye productos/líneas si la API los devuelve)."""
         try:
-            response = requests.get(
-                f"{self.base_url}/customer-orders/{order_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'},
-            )
+            response = self._request('GET', f"customer-orders/{order_id}")
             if response.status_code == 200:
                 return response.json()
         except Exception:
@@ -363,44 +559,18 @@ class APIManager:
         return None
 
     def fetch_purchase_orders(self):
-        purchase_orders = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/purchase-orders",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                orders = response.json()
-                if not orders:
-                    break
-                # Filter out orders with specified statuses
-                orders = [order for order in orders if order['status'] not in [30, 40, 110, 120]]
-                purchase_orders.extend(orders)
-                start += 100
-            else:
-                return None
-        return purchase_orders
+        try:
+            orders = self.fetch_all('purchase-orders')
+        except MRPeasyAPIError:
+            return None
+        # Filter out orders with specified statuses
+        return [order for order in orders if order['status'] not in [30, 40, 110, 120]]
 
     def fetch_stock_lots(self):
-        stock_lots = []
-        start = 0
-        while True:
-            response = requests.get(
-                f"{self.base_url}/lots",
-                auth=self.auth,
-                headers={'content-type': 'application/json', 'range': f'items={start}-{start + 99}'}
-            )
-            if response.status_code in [200, 206]:  # OK or Partial Content
-                lots = response.json()
-                if not lots:
-                    break
-                stock_lots.extend(lots)
-                start += 100
-            else:
-                return None
-        return stock_lots
+        try:
+            return self.fetch_all('lots')
+        except MRPeasyAPIError:
+            return None
 
     def get_item_details(self, item_code: str):
         """Fetch details for a specific item including purchase terms"""
@@ -409,11 +579,9 @@ class APIManager:
             
         item_code = item_code.strip()
         
-        response = requests.get(
-            f"{self.base_url}/items",
-            auth=self.auth,
+        response = self._request(
+            'GET', 'items',
             params={'code': item_code},
-            headers={'content-type': 'application/json'}
         )
 
         if response.status_code == 200:
@@ -443,10 +611,8 @@ class APIManager:
     def update_item_shelf_life(self, article_id: int, shelf_life_days: int) -> bool:
         """Update item's shelf life (expiry = production/receipt date + shelf_life days)"""
         try:
-            response = requests.put(
-                f"{self.base_url}/items/{article_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'},
+            response = self._request(
+                'PUT', f"items/{article_id}",
                 json={'shelf_life': shelf_life_days}
             )
             return response.status_code in [200, 202, 204]
@@ -535,10 +701,8 @@ class APIManager:
         if custom_40604:
             order_details["custom_40604"] = custom_40604
 
-        response = requests.post(
-            f"{self.base_url}/manufacturing-orders",
-            auth=self.auth,
-            headers={'content-type': 'application/json'},
+        response = self._request(
+            'POST', 'manufacturing-orders',
             json=order_details
         )
 
@@ -577,10 +741,8 @@ class APIManager:
         # No enviar status: la API lo rechaza y anula todo el update
         
         # Use PUT method to update (standard REST pattern)
-        response = requests.put(
-            f"{self.base_url}/manufacturing-orders/{mo_id}",
-            auth=self.auth,
-            headers={'content-type': 'application/json'},
+        response = self._request(
+            'PUT', f"manufacturing-orders/{mo_id}",
             json=update_payload
         )
         
@@ -598,10 +760,8 @@ class APIManager:
         Returns (success, message).
         """
         try:
-            response = requests.put(
-                f"{self.base_url}/manufacturing-orders/{mo_id}",
-                auth=self.auth,
-                headers={"content-type": "application/json"},
+            response = self._request(
+                'PUT', f"manufacturing-orders/{mo_id}",
                 json={"status": status},
             )
             if response.status_code in (200, 202, 204):
@@ -702,11 +862,9 @@ class APIManager:
             Optional[Dict]: The lot details if found, None otherwise
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/lots",
-                auth=self.auth,
+            response = self._request(
+                'GET', 'lots',
                 params={'code': lot_code},
-                headers={'content-type': 'application/json'}
             )
 
             if response.status_code in (200, 206):
@@ -725,11 +883,7 @@ class APIManager:
         MRPEasy accepts a minimal payload with the same quantity field name returned by GET.
         """
         try:
-            get_resp = requests.get(
-                f"{self.base_url}/lots/{lot_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'}
-            )
+            get_resp = self._request('GET', f"lots/{lot_id}")
             if get_resp.status_code != 200:
                 return get_resp  # caller can check status_code
             current_lot = get_resp.json()
@@ -744,10 +898,8 @@ class APIManager:
                 qty_key = 'quantity'
             update_payload = {qty_key: quantity}
 
-            put_resp = requests.put(
-                f"{self.base_url}/lots/{lot_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'},
+            put_resp = self._request(
+                'PUT', f"lots/{lot_id}",
                 json=update_payload
             )
             return put_resp
@@ -764,11 +916,7 @@ class APIManager:
             Optional[Dict]: The purchase order details if found, None otherwise
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/purchase-orders/{pur_ord_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'}
-            )
+            response = self._request('GET', f"purchase-orders/{pur_ord_id}")
 
             if response.status_code == 200:
                 return response.json()
@@ -776,6 +924,15 @@ class APIManager:
         except Exception:
             return None
 
+    def get_purchase_order_cached(self, pur_ord_id: int) -> Optional[Dict]:
+        """Like get_single_purchase_order, but memoized for PURCHASE_ORDER_TTL_SECONDS and
+        shared between concurrent callers, so each PO is fetched once per batch."""
+        return _purchase_order_cache.get(self, pur_ord_id)
+
+    def prefetch_purchase_orders(self, pur_ord_ids) -> None:
+        """Warm the purchase-order cache for a set of PO ids in one concurrent pass."""
+        _purchase_order_cache.prefetch(self, pur_ord_ids)
+
     def fetch_single_purchase_order(self, po_code: str) -> Optional[Dict]:
         """Get details for a specific purchase order by code.
 
@@ -786,11 +943,9 @@ class APIManager:
             Optional[Dict]: The purchase order details if found, None otherwise
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/purchase-orders",
-                auth=self.auth,
+            response = self._request(
+                'GET', 'purchase-orders',
                 params={'code': po_code},
-                headers={'content-type': 'application/json'}
             )
 
             if response.status_code == 200:
@@ -811,11 +966,7 @@ class APIManager:
             Optional[Dict]: The purchase order details if found, None otherwise
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/purchase-orders/{pur_ord_id}",
-                auth=self.auth,
-                headers={'content-type': 'application/json'}
-            )
+            response = self._request('GET', f"purchase-orders/{pur_ord_id}")
 
             if response.status_code == 200:
                 return response.json()
@@ -838,10 +989,8 @@ class APIManager:
         Returns:
             requests.Response: API response
         """
-        response = requests.post(
-            f"{self.base_url}/customer-orders",
-            auth=self.auth,
-            headers={'content-type': 'application/json'},
+        response = self._request(
+            'POST', 'customer-orders',
             json=order_data
         )
 
@@ -874,7 +1023,7 @@ class APIManager:
         # If purchase order exists, get vendor unit directly from the PO
         pur_ord_id = lot_data.get('pur_ord_id')
         if pur_ord_id:
-            po_data = self.get_single_purchase_order(pur_ord_id)
+            po_data = self.get_purchase_order_cached(pur_ord_id)
             if po_data:
                 for product in po_data.get('products', []):
                     if product.get('article_id') == lot_data.get('article_id'):
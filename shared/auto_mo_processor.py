@@ -78,23 +78,15 @@ class AutoMOProcessor:
         Returns:
             Tuple of (success, message)
         """
+        error_msg = self._validate_entry(entry)
+        if error_msg:
+            return False, error_msg
+        
         entry_id = entry.get('id')
         lot_code = entry.get('lot_code', '').strip()
         quantity = entry.get('quantity', 0)
         uom = entry.get('uom')
         
-        if not lot_code:
-            error_msg = f"Entry {entry_id} has no lot_code"
-            logger.error(error_msg)
-            self._mark_as_failed(entry_id, error_msg)
-            return False, error_msg
-        
-        if not quantity or quantity <= 0:
-            error_msg = f"Entry {entry_id} has invalid quantity: {quantity}"
-            logger.error(error_msg)
-            self._mark_as_failed(entry_id, error_msg)
-            return False, error_msg
-        
         try:
             logger.info(
                 f"Processing production entry {entry_id}: "
@@ -108,23 +100,7 @@ class AutoMOProcessor:
                 uom=uom,
                 item_code=None
             )
-            
-            if success:
-                # Mark entry as processed
-                self._mark_as_processed(entry_id)
-                success_msg = (
-                    f"Successfully processed entry {entry_id} for LOT {lot_code}. "
-                    f"Lot updated with quantity {quantity}. "
-                    f"(Si el MO sigue «Not booked», marca como Done/Received manualmente en MRPeasy.)"
-                )
-                logger.info(success_msg)
-                return True, success_msg
-            else:
-                # Mark as failed with error message
-                self._mark_as_failed(entry_id, message)
-                error_msg = f"Failed to process entry {entry_id}: {message}"
-                logger.error(error_msg)
-                return False, error_msg
+            return self._finish_entry(entry, success, message)
                 
         except Exception as e:
             error_msg = f"Error processing entry {entry_id}: {str(e)}"
@@ -132,6 +108,55 @@ class AutoMOProcessor:
             self._mark_as_failed(entry_id, error_msg)
             return False, error_msg
     
+    def _validate_entry(self, entry: Dict[str, Any]) -> Optional[str]:
+        """Return an error message (and mark the entry failed) if it can't be processed"""
+        entry_id = entry.get('id')
+        lot_code = (entry.get('lot_code') or '').strip()
+        quantity = entry.get('quantity', 0)
+        
+        if not lot_code:
+            error_msg = f"Entry {entry_id} has no lot_code"
+        elif not quantity or quantity <= 0:
+            error_msg = f"Entry {entry_id} has invalid quantity: {quantity}"
+        else:
+            return None
+        logger.error(error_msg)
+        self._mark_as_failed(entry_id, error_msg)
+        return error_msg
+    
+    def _finish_entry(self, entry: Dict[str, Any], success: bool, message: str) -> Tuple[bool, str]:
+        """Mark the entry processed or failed after the workflow ran"""
+        entry_id = entry.get('id')
+        lot_code = (entry.get('lot_code') or '').strip()
+        if success:
+            # Mark entry as processed
+            self._mark_as_processed(entry_id)
+            success_msg = (
+                f"Successfully processed entry {entry_id} for LOT {lot_code}. "
+                f"Lot updated with quantity {entry.get('quantity', 0)}. "
+                f"(Si el MO sigue «Not booked», marca como Done/Received manualmente en MRPeasy.)"
+            )
+            logger.info(success_msg)
+            return True, success_msg
+        # Mark as failed with error message
+        self._mark_as_failed(entry_id, message)
+        error_msg = f"Failed to process entry {entry_id}: {message}"
+        logger.error(error_msg)
+        return False, error_msg
+    
+    def _record_result(self, results: Dict[str, Any], entry: Dict[str, Any], success: bool, message: str):
+        if success:
+            results['processed'] += 1
+        else:
+            results['failed'] += 1
+        results['results'].append({
+            'id': entry.get('id'),
+            'lot_code': entry.get('lot_code', 'N/A'),
+            'success': success,
+            'message': message
+        })
+        self.processed_ids.add(entry.get('id'))
+    
     def _mark_as_processed(self, entry_id: int):
         """Mark an entry as processed by setting processed_at timestamp"""
         try:
@@ -190,30 +215,25 @@ class AutoMOProcessor:
         
         logger.info(f"Processing {len(entries)} pending production entries")
         
+        # Skip entries already processed in this session; the rest are validated
+        # here and the valid ones run concurrently through the workflow
+        to_process = []
         for entry in entries:
             entry_id = entry.get('id')
-            lot_code = entry.get('lot_code', 'N/A')
-            
-            # Skip if already processed in this session
             if entry_id in self.processed_ids:
                 logger.debug(f"Skipping entry {entry_id} (already processed)")
                 continue
-            
-            success, message = self.process_production_entry(entry)
-            
-            if success:
-                results['processed'] += 1
+            error_msg = self._validate_entry(entry)
+            if error_msg:
+                self._record_result(results, entry, False, error_msg)
             else:
-                results['failed'] += 1
-            
-            results['results'].append({
-                'id': entry_id,
-                'lot_code': lot_code,
-                'success': success,
-                'message': message
-            })
-            
-            self.processed_ids.add(entry_id)
+                to_process.append(entry)
+        
+        for outcome in self.workflow.process_batch(to_process):
+            success, message = self._finish_entry(
+                outcome['entry'], outcome['success'], outcome['message']
+            )
+            self._record_result(results, outcome['entry'], success, message)
         
         logger.info(
             f"Processing complete: {results['processed']} processed, "
@@ -0,0 +1,132 @@
+"""
+BOM parts index over the MRPeasy parts export (data/bom_parts.csv or the newest data/parts_*.csv).
+
+The export is parsed once into BOM rows grouped by base product number (the part
+before the first '-', so A00534 and A00534-del share a BOM) and kept until the
+file's mtime/size change. Printing the recipes of a batch of MOs then costs one
+CSV parse instead of one full scan per product.
+"""
+
+import csv
+import glob
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def product_base(code: Optional[str]) -> str:
+    return (code or '').strip().upper().split('-')[0]
+
+
+def _quantity_with_unit(quantity: Any, unit: str) -> str:
+    try:
+        value = float(quantity)
+        display = f"{value:.2f}".rstrip('0').rstrip('.') if value != int(value) else str(int(value))
+    except (ValueError, TypeError):
+        display = str(quantity).strip()
+    return f"{display} {unit}" if unit else display
+
+
+class BomPartsIndex:
+    """BOMs of one parts CSV keyed by base product number, reloaded when the file changes"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._boms: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _ensure_loaded(self) -> None:
+        st = self.path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        boms: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8-sig', newline='') as f:
+                for row in csv.DictReader(f):
+                    pn = (row.get('Product number') or '').strip()
+                    if not pn:
+                        continue
+                    bom = boms.get(product_base(pn))
+                    if bom is None:
+                        bom = boms[product_base(pn)] = {
+                            'bom_number': (row.get('BOM number') or '').strip(),
+                            'bom_name': (row.get('BOM name') or '').strip(),
+                            'rows': [],
+                        }
+                    bom['rows'].append((
+                        (row.get('Part No.') or '').strip(),
+                        (row.get('Part description') or '').strip(),
+                        _quantity_with_unit(row.get('Quantity', ''), (row.get('Unit of measurement') or '').strip()),
+                    ))
+        except Exception as e:
+            logger.warning("Failed to load BOM CSV %s: %s", self.path, e)
+        self._boms, self._signature = boms, signature
+        logger.info(f"BOM parts index of {self.path.name}: {len(boms)} products")
+
+    def get(self, product_code: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        BOM of a product as {'bom_number', 'bom_name', 'rows': [(part_no, description, quantity with unit)]},
+        or None. Matches on the base product number.
+        """
+        with self._lock:
+            try:
+                self._ensure_loaded()
+            except FileNotFoundError:
+                return None
+            bom = self._boms.get(product_base(product_code))
+        if not bom or not bom['rows']:
+            return None
+        return {**bom, 'rows': list(bom['rows'])}
+
+    def products(self) -> List[str]:
+        """Base product numbers that have a BOM"""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._boms)
+
+
+_indexes: Dict[Path, BomPartsIndex] = {}
+_csv_paths: Dict[Path, Tuple[int, Optional[str]]] = {}
+_lock = threading.Lock()
+
+
+def get_bom_parts_index(path) -> BomPartsIndex:
+    """Return the process-wide index of a parts CSV"""
+    key = Path(os.path.abspath(path))
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = BomPartsIndex(key)
+        return index
+
+
+def find_bom_parts_csv(data_dir: Optional[Path] = None) -> Optional[str]:
+    """
+    Path of the parts export: data/bom_parts.csv, else the newest data/parts_*.csv, else None.
+    The directory is only globbed again when its mtime changes (a file was added or removed).
+    """
+    data_dir = Path(data_dir or DEFAULT_DATA_DIR)
+    fixed = data_dir / 'bom_parts.csv'
+    if fixed.is_file():
+        return str(fixed)
+    try:
+        dir_mtime = data_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        cached = _csv_paths.get(data_dir)
+        if cached and cached[0] == dir_mtime:
+            return cached[1]
+    parts_files = glob.glob(str(data_dir / 'parts_*.csv'))
+    newest = max(parts_files, key=os.path.getmtime) if parts_files else None
+    with _lock:
+        _csv_paths[data_dir] = (dir_mtime, newest)
+    return newest
@@ -2,7 +2,8 @@
 Database Manager - Hybrid JSON / MySQL
 
 - For erp_mo_to_import: uses MySQL when configured (config/secrets), else JSON.
-- Other tables: JSON files in data/ (Clover, etc.).
+- Other tables: JSON files in data/ (Clover, etc.). SELECTs on the sales tables
+  run on an SQLite mirror of those files (shared/analytics_store.py).
 
 Since MRPeasy is the system of record, this storage is only for:
 - Local analytics (Clover orders)
@@ -12,13 +13,20 @@ Since MRPeasy is the system of record, this storage is only for:
 
 import json
 import re
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+from shared.analytics_store import get_analytics_store, is_analytics_query
+from shared.table_store import get_table_store
+
 logger = logging.getLogger(__name__)
 
+# Rows per write in execute_batch_insert
+BATCH_CHUNK_SIZE = 1000
+
 # Lazy import to avoid requiring PyMySQL when using JSON only
 _mysql_backend = None
 
@@ -29,6 +37,7 @@ def _get_mysql_backend():
             from shared.mysql_backend import (
                 is_mysql_available,
                 execute_mysql,
+                execute_many_mysql,
                 fetch_all_mysql,
                 migrate_json_to_mysql,
                 ERP_MO_TABLE,
@@ -36,6 +45,7 @@ def _get_mysql_backend():
             _mysql_backend = {
                 "available": is_mysql_available(),
                 "execute_mysql": execute_mysql,
+                "execute_many_mysql": execute_many_mysql,
                 "fetch_all_mysql": fetch_all_mysql,
                 "migrate_json_to_mysql": migrate_json_to_mysql,
                 "table": ERP_MO_TABLE,
@@ -79,6 +89,8 @@ class DatabaseManager:
         be = _get_mysql_backend()
         if not be.get("available") or "migrate_json_to_mysql" not in be:
             return
+        # The migration reads the JSON file directly, so fold pending log entries in first
+        get_table_store(self._erp_mo_to_import_file).compact()
         n = be["migrate_json_to_mysql"](self._erp_mo_to_import_file)
         if n >= 0:
             try:
@@ -205,79 +217,47 @@ class DatabaseManager:
         """Execute an INSERT query"""
         try:
             parsed = self._parse_sql_insert(query, values)
-            table_name = parsed['table']
-            columns = parsed['columns']
-            values_tuple = parsed['values']
-            
-            # Handle auto-increment ID (for tables like erp_mo_to_import)
-            # If first column is 'id' and value is None or 0, auto-generate
-            filepath = self._get_table_file(table_name)
-            records = self._read_json(filepath, [])
-            
-            # Find the next ID if needed
-            if columns and columns[0].lower() == 'id':
-                if not values_tuple or values_tuple[0] is None or values_tuple[0] == 0:
-                    # Auto-generate ID
-                    max_id = 0
-                    for rec in records:
-                        rec_id = rec.get('id')
-                        if rec_id and isinstance(rec_id, int):
-                            max_id = max(max_id, rec_id)
-                    next_id = max_id + 1
-                    # Replace None/0 with next_id
-                    values_list = list(values_tuple)
-                    values_list[0] = next_id
-                    values_tuple = tuple(values_list)
-            
-            # Create record dictionary
-            record = dict(zip(columns, values_tuple))
-            
-            # Auto-assign id for tables that need it (e.g. erp_mo_to_import) when INSERT omits id
-            if table_name == 'erp_mo_to_import' and 'id' not in record:
-                max_id = 0
-                for rec in records:
-                    rec_id = rec.get('id')
-                    if rec_id is not None and isinstance(rec_id, (int, float)):
-                        max_id = max(max_id, int(rec_id))
-                record['id'] = max_id + 1
-            
-            # Add inserted_at timestamp if not present and column exists
-            if 'inserted_at' not in record:
-                record['inserted_at'] = datetime.now().isoformat()
-            
-            # Handle ON DUPLICATE KEY UPDATE (upsert)
-            # Check for duplicate (assuming first column is primary key, or 'id' column)
-            primary_key = 'id' if 'id' in record else (columns[0] if columns else None)
-            primary_value = record.get(primary_key) if primary_key else None
-            
-            # Find existing record
-            existing_idx = None
-            if primary_key and primary_value:
-                for i, rec in enumerate(records):
-                    if rec.get(primary_key) == primary_value:
-                        existing_idx = i
-                        break
-            
-            if existing_idx is not None:
-                # Update existing record
-                if 'ON DUPLICATE KEY UPDATE' in query.upper():
-                    # Merge with existing record
-                    records[existing_idx].update(record)
-                else:
-                    # Replace existing record
-                    records[existing_idx] = record
-            else:
-                # Add new record
-                records.append(record)
-            
-            # Save to file
-            self._write_json(filepath, records)
+            # Rows live in an append-only store with a primary-key index, so an
+            # insert no longer reads and rewrites the whole JSON file
+            store = get_table_store(self._get_table_file(parsed['table']))
+            record, primary_key = self._build_insert_record(
+                parsed['table'], parsed['columns'], parsed['values'], store.next_id
+            )
+            store.upsert(record, primary_key, merge='ON DUPLICATE KEY UPDATE' in query.upper())
             
             return 1  # One row affected
         except Exception as e:
             logger.error(f"Error executing insert: {e}")
             raise
 
+    def _build_insert_record(self, table_name: str, columns: List[str], values_tuple: Tuple,
+                             next_id: Callable[[], int]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Turn INSERT columns/values into a stored record. Returns (record, primary key column)."""
+        # Handle auto-increment ID (for tables like erp_mo_to_import)
+        # If first column is 'id' and value is None or 0, auto-generate
+        if columns and columns[0].lower() == 'id':
+            if not values_tuple or values_tuple[0] is None or values_tuple[0] == 0:
+                # Replace None/0 with next_id
+                values_list = list(values_tuple)
+                values_list[0] = next_id()
+                values_tuple = tuple(values_list)
+        
+        # Create record dictionary
+        record = dict(zip(columns, values_tuple))
+        
+        # Auto-assign id for tables that need it (e.g. erp_mo_to_import) when INSERT omits id
+        if table_name == 'erp_mo_to_import' and 'id' not in record:
+            record['id'] = next_id()
+        
+        # Add inserted_at timestamp if not present and column exists
+        if 'inserted_at' not in record:
+            record['inserted_at'] = datetime.now().isoformat()
+        
+        # ON DUPLICATE KEY UPDATE merges into the existing row, otherwise it is replaced.
+        # Primary key is 'id' when present, else the first column
+        primary_key = 'id' if 'id' in record else (columns[0] if columns else None)
+        return record, primary_key
+
     def _execute_update(self, query: str, values: Tuple = None) -> int:
         """Execute an UPDATE query"""
         try:
@@ -288,8 +268,8 @@ class DatabaseManager:
                 raise ValueError(f"Cannot parse table name from UPDATE query: {query}")
             
             table_name = table_match.group(1)
-            filepath = self._get_table_file(table_name)
-            records = self._read_json(filepath, [])
+            store = get_table_store(self._get_table_file(table_name))
+            records = store.rows()
             
             # Parse SET clause
             set_match = re.search(r'SET\s+(\w+)\s*=\s*%s', query, re.IGNORECASE)
@@ -365,22 +345,64 @@ class DatabaseManager:
             
             # Save updated records
             if affected_count > 0:
-                self._write_json(filepath, records)
+                store.replace_all(records)
             
             return affected_count
         except Exception as e:
             logger.error(f"Error executing update: {e}")
             raise
     
-    def execute_batch_insert(self, query: str, values: List[Tuple]):
+    def execute_batch_insert(self, query: str, values: List[Tuple],
+                             chunk_size: int = BATCH_CHUNK_SIZE) -> List[Dict[str, Any]]:
         """
-        Execute batch insert. Processes multiple records at once.
+        Execute batch insert in chunks of `chunk_size` rows.
+        
+        JSON tables: the query is parsed once and each chunk is merged into the table
+        store with a single write. erp_mo_to_import on MySQL: executemany per chunk
+        inside one transaction.
+        
+        Returns one stats dict per chunk: {'chunk', 'rows', 'affected', 'seconds'}.
         """
+        if not values:
+            return []
         try:
-            affected = 0
-            for value_tuple in values:
-                affected += self._execute_insert(query, value_tuple)
-            return affected
+            if self._use_mysql_for_erp_mo() and 'erp_mo_to_import' in query.upper():
+                self._migrate_erp_mo_json_to_mysql_once()
+                try:
+                    be = _get_mysql_backend()
+                    return be["execute_many_mysql"](query, values, chunk_size)
+                except Exception as e:
+                    logger.warning(f"MySQL batch INSERT failed, falling back to JSON: {e}")
+            
+            parsed = self._parse_sql_insert(query)
+            store = get_table_store(self._get_table_file(parsed['table']))
+            merge = 'ON DUPLICATE KEY UPDATE' in query.upper()
+            last_id = store.next_id() - 1
+            
+            def next_id() -> int:
+                nonlocal last_id
+                last_id += 1
+                return last_id
+            
+            stats = []
+            for start in range(0, len(values), chunk_size):
+                started = time.perf_counter()
+                chunk = values[start:start + chunk_size]
+                by_key: Dict[Optional[str], List[Dict[str, Any]]] = {}
+                for value_tuple in chunk:
+                    record, primary_key = self._build_insert_record(
+                        parsed['table'], parsed['columns'], value_tuple, next_id
+                    )
+                    by_key.setdefault(primary_key, []).append(record)
+                affected = sum(store.upsert_many(records, primary_key, merge)
+                               for primary_key, records in by_key.items())
+                stats.append({
+                    'chunk': start // chunk_size + 1,
+                    'rows': len(chunk),
+                    'affected': affected,
+                    'seconds': time.perf_counter() - started,
+                })
+            return stats
         except Exception as e:
             logger.error(f"Error executing batch insert: {e}")
             raise
@@ -427,8 +449,13 @@ class DatabaseManager:
             except Exception as e:
                 logger.warning(f"MySQL fetch failed, falling back to JSON: {e}")
         
-        filepath = self._get_table_file(table_name)
-        records = self._read_json(filepath, [])
+        # Sales tables: JOIN / BETWEEN / GROUP BY queries run on the SQLite analytics mirror
+        if is_analytics_query(query):
+            analytics = get_analytics_store(self.clover_dir / "analytics.db", self._get_table_file)
+            return analytics.fetch_all(query, values, limit)
+        
+        store = get_table_store(self._get_table_file(table_name))
+        records = store.rows()
         
         if table_name == 'erp_mo_to_import' and records:
             max_id = 0
@@ -443,7 +470,7 @@ class DatabaseManager:
                     rec['id'] = max_id
                     need_save = True
             if need_save:
-                self._write_json(filepath, records)
+                store.replace_all([dict(rec) for rec in records])
         
         # Simple WHERE clause parsing (very basic)
         if 'WHERE' in query_upper:
@@ -4,6 +4,11 @@ import streamlit as st
 import logging
 from shared.database_manager import DatabaseManager
 from shared.database_schema import SCHEMAS
+from shared.table_store import get_table_store
+from shared.sales_rollup import DailyRollup, order_contributions
+
+# Checkpoint of the Clover order sync (one row per sync name)
+SYNC_STATE_TABLE = 'clover_sync_state'
 
 class DatabaseOperations:
     def __init__(self):
@@ -95,25 +100,44 @@ class DatabaseOperations:
             logger.error(f"Error getting latest order date: {e}")
             return datetime.now() - timedelta(days=1)
 
-    def save_orders(self, orders: List[Any]):
+    def get_sync_state(self, name: str = 'orders') -> Dict[str, Any]:
+        """
+        Return the saved checkpoint of a Clover sync ({} if none):
+        'since_ms' and 'offset' of an unfinished run, and 'high_water_ms',
+        the newest createdTime saved so far.
+        """
+        for row in get_table_store(self.db._get_table_file(SYNC_STATE_TABLE)).rows():
+            if row.get('name') == name:
+                return row
+        return {}
+
+    def save_sync_state(self, name: str = 'orders', **state) -> None:
+        """Persist the checkpoint of a Clover sync (one log line per call)."""
+        row = {'name': name, **state, 'updated_at': datetime.now().isoformat()}
+        get_table_store(self.db._get_table_file(SYNC_STATE_TABLE)).upsert(row, 'name')
+
+    def save_orders(self, orders: List[Any], show_progress: bool = True):
         """
         Save all order data to the database.
         Expects orders to be a list of CloverOrder objects.
+        With show_progress=False (page-by-page sync) the per-batch output is skipped.
+        The daily sales rollup is updated with the saved orders.
         """
         try:
-            order_batch, item_batch, mod_batch, payment_batch = self._prepare_batches(orders)
+            order_batch, item_batch, mod_batch, payment_batch = self._prepare_batches(orders, show_progress)
 
             with st.spinner('Saving data to database...'):
                 self._save_order_batch(order_batch)
-                self._save_item_batches(item_batch)
+                self._save_item_batches(item_batch, show_progress)
                 self._save_modification_batch(mod_batch)
                 self._save_payment_batch(payment_batch)
+                self._update_daily_rollup(order_batch, item_batch, mod_batch, payment_batch)
 
         except Exception as e:
             st.error(f"Database save error: {str(e)}")
             raise
 
-    def _prepare_batches(self, orders: List[Any]) -> Tuple[List, List, List, List]:
+    def _prepare_batches(self, orders: List[Any], show_progress: bool = True) -> Tuple[List, List, List, List]:
         """
         Prepare data batches for database insertion.
         Expects orders to be a list of CloverOrder objects.
@@ -124,7 +148,7 @@ class DatabaseOperations:
         payment_batch = []
 
         total_orders = len(orders)
-        progress_bar = st.progress(0)
+        progress_bar = st.progress(0) if show_progress else None
 
         for i, order in enumerate(orders):
             order_batch.append(order.get_order_details())
@@ -132,12 +156,13 @@ class DatabaseOperations:
             mod_batch.extend(order.get_modifications())
             payment_batch.extend(order.get_payments())
 
-            progress = (i + 1) / total_orders
-            progress_bar.progress(progress)
+            if progress_bar:
+                progress_bar.progress((i + 1) / total_orders)
 
-        progress_bar.empty()
-        st.write(f"Prepared batches - Orders: {len(order_batch)}, Items: {len(item_batch)}, "
-                 f"Mods: {len(mod_batch)}, Payments: {len(payment_batch)}")
+        if progress_bar:
+            progress_bar.empty()
+            st.write(f"Prepared batches - Orders: {len(order_batch)}, Items: {len(item_batch)}, "
+                     f"Mods: {len(mod_batch)}, Payments: {len(payment_batch)}")
 
         return order_batch, item_batch, mod_batch, payment_batch
 
@@ -146,14 +171,12 @@ class DatabaseOperations:
         if batch:
             self.db.execute_batch_insert(self.order_query, batch)
 
-    def _save_item_batches(self, items: List[tuple]):
+    def _save_item_batches(self, items: List[tuple], show_progress: bool = True):
         """Save items to database in chunks."""
         if items:
-            chunk_size = 1000
-            for i in range(0, len(items), chunk_size):
-                chunk = items[i:i + chunk_size]
-                self.db.execute_batch_insert(self.item_query, chunk)
-                st.write(f"Saved items chunk {i//chunk_size + 1}")
+            for chunk in self.db.execute_batch_insert(self.item_query, items, chunk_size=1000):
+                if show_progress:
+                    st.write(f"Saved items chunk {chunk['chunk']} ({chunk['rows']} rows, {chunk['seconds']:.2f}s)")
 
     def _save_modification_batch(self, batch: List[tuple]):
         """Save modifications batch to database."""
@@ -165,6 +188,25 @@ class DatabaseOperations:
         if batch:
             self.db.execute_batch_insert(self.payment_query, batch)
 
+    def _update_daily_rollup(self, orders: List[tuple], items: List[tuple],
+                             modifications: List[tuple], payments: List[tuple]):
+        """Replace the rollup contribution of the saved orders (built from all orders the first time)."""
+        if not orders:
+            return
+        rollup = DailyRollup(self.db._get_table_file)
+        if rollup.ensure_built():
+            return
+        rows = [
+            [dict(zip(self.db._parse_sql_insert(query)['columns'], values)) for values in batch]
+            for query, batch in ((self.order_query, orders), (self.item_query, items),
+                                 (self.mod_query, modifications), (self.payment_query, payments))
+        ]
+        rollup.apply(order_contributions(*rows))
+
+    def rebuild_daily_rollup(self) -> int:
+        """Recompute the daily sales rollup from all saved orders. Returns the number of rollup rows."""
+        return DailyRollup(self.db._get_table_file).rebuild()
+
     def get_summary(self, start_date: datetime) -> List[Dict]:
         """Get summary of imported orders."""
         try:
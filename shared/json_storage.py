@@ -16,6 +16,7 @@ Storage Structure:
 
 import json
 import os
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
@@ -23,6 +24,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Serializes read-append-write of the production files (batch closes run in threads)
+_append_lock = threading.Lock()
+
 
 class JSONStorage:
     """JSON-based file storage manager"""
@@ -112,13 +116,14 @@ class JSONStorage:
         }
         
         filepath = self._get_file_path("production", "records.json")
-        records = self._read_json(filepath, [])
-        
-        # Add record
-        records.append(record)
-        
-        # Save
-        self._write_json(filepath, records)
+        with _append_lock:
+            records = self._read_json(filepath, [])
+            
+            # Add record
+            records.append(record)
+            
+            # Save
+            self._write_json(filepath, records)
         
         logger.info(f"Saved production record: lot={lot}, mo={mo}, actual_qty={actual_qty}")
         return record
@@ -198,10 +203,11 @@ class JSONStorage:
         }
         
         filepath = self._get_file_path("production", "logs.json")
-        logs = self._read_json(filepath, [])
-        
-        logs.append(log_entry)
-        self._write_json(filepath, logs)
+        with _append_lock:
+            logs = self._read_json(filepath, [])
+            
+            logs.append(log_entry)
+            self._write_json(filepath, logs)
         
         return log_entry
     
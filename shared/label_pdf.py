@@ -0,0 +1,76 @@
+"""
+Label PDFs with vector Code128 barcodes.
+
+The PO labels used to render every barcode as a PNG (python-barcode + PIL),
+decode it again for each label, write each label to its own one-page PDF and
+re-parse all of them with PyPDF2 to merge them. Here barcodes are ReportLab
+vector drawings, memoized per value and size, and every label goes straight
+into one multi-page canvas. A label printed N times is drawn once as a PDF
+form XObject and each page only references it, so the output stays small too.
+"""
+
+import io
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Tuple
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode import createBarcodeDrawing
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.pagesizes import inch
+from reportlab.pdfgen import canvas
+
+LABEL_PAGE_SIZE = (3 * inch, 1 * inch)
+
+
+@lru_cache(maxsize=1024)
+def code128_drawing(value: str, width: float, height: float) -> Drawing:
+    """Code128 barcode of `value` stretched to width x height points, without human-readable text"""
+    return createBarcodeDrawing('Code128', value=value, width=width, height=height, humanReadable=False)
+
+
+def draw_code128(c: canvas.Canvas, value: str, x: float, y: float, width: float, height: float) -> None:
+    """Draw the (cached) Code128 barcode of `value` with its lower left corner at x, y"""
+    renderPDF.draw(code128_drawing(str(value), width, height), c, x, y)
+
+
+class LabelSheet:
+    """
+    A multi-page PDF with one label per page. Labels are added by key; the first
+    add() of a key draws the label into a form, later pages of that key reuse it.
+    """
+
+    def __init__(self, pagesize: Tuple[float, float] = LABEL_PAGE_SIZE):
+        self._buffer = io.BytesIO()
+        self.canvas = canvas.Canvas(self._buffer, pagesize=pagesize)
+        self._forms: Dict[Hashable, str] = {}
+        self._drawn = 0
+        self.pages = 0
+
+    def add(self, key: Hashable, draw: Callable[[canvas.Canvas], None], copies: int = 1) -> int:
+        """
+        Add `copies` pages of the label `key`. draw(canvas) is only called the first
+        time a key is added; if it raises, no page is added. Returns the pages added.
+        """
+        name = self._forms.get(key)
+        if name is None:
+            # Named by attempt, so a label whose drawing failed never shares a form name
+            self._drawn += 1
+            name = f"label{self._drawn}"
+            self.canvas.beginForm(name)
+            try:
+                draw(self.canvas)
+            finally:
+                self.canvas.endForm()
+            self._forms[key] = name
+        copies = max(int(copies), 0)
+        for _ in range(copies):
+            self.canvas.doForm(name)
+            self.canvas.showPage()
+        self.pages += copies
+        return copies
+
+    def save(self) -> io.BytesIO:
+        """Finish the PDF and return it, positioned at the start"""
+        self.canvas.save()
+        self._buffer.seek(0)
+        return self._buffer
@@ -14,6 +14,7 @@ Requirements:
 import logging
 from typing import Optional, Dict, Any, Tuple
 from shared.api_manager import APIManager
+from shared.mo_lot_index import MOLotIndex, get_mo_lot_index
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +27,9 @@ class MOLookupError(Exception):
 class MOLookup:
     """Lookup Manufacturing Orders by Lot Code"""
     
-    def __init__(self, api_manager: Optional[APIManager] = None):
+    def __init__(self, api_manager: Optional[APIManager] = None, lot_index: Optional[MOLotIndex] = None):
         self.api = api_manager or APIManager()
+        self.lot_index = lot_index or get_mo_lot_index()
     
     def find_mo_by_lot_code(self, lot_code: str) -> Tuple[bool, Optional[Dict[str, Any]], str]:
         """
@@ -99,9 +101,9 @@ class MOLookup:
                     break  # lot had mo_id but get_manufacturing_order_details failed; fall back to slow path
                 break  # only try first code that returns a lot without mo_id
 
-            # Slow path: fetch all manufacturing orders and filter by target_lots
+            # Slow path: lot code -> MO index over the cached MOs (no full MO download per lot)
             try:
-                all_mos = self.api.fetch_manufacturing_orders()
+                matches = self.lot_index.find(lot_code, self.api)
             except ValueError as ve:
                 # Check if it's a rate limit error
                 if "429" in str(ve) or "Rate limit" in str(ve) or "Too Many Requests" in str(ve):
@@ -118,25 +120,7 @@ class MOLookup:
                 logger.error(error_msg, exc_info=True)
                 return False, None, error_msg
             
-            if all_mos is None:
-                error_msg = "Failed to fetch manufacturing orders from MRPeasy. The API returned None. Check your API credentials and network connection."
-                logger.error(error_msg)
-                return False, None, error_msg
-            
-            if not isinstance(all_mos, list):
-                error_msg = f"Unexpected response type from MRPeasy API. Expected list, got {type(all_mos)}"
-                logger.error(error_msg)
-                return False, None, error_msg
-            
-            # Filter MOs that have the lot code in their target_lots (with L prefix normalization)
-            matching_mos = []
-            for mo in all_mos:
-                target_lots = mo.get('target_lots', [])
-                for lot in target_lots:
-                    lot_code_in_mo = (lot.get('code') or '').strip()
-                    if lot_code_in_mo.upper() in possible_codes:
-                        matching_mos.append(mo)
-                        break  # Found match, no need to check other lots in this MO
+            matching_mos = [match['mo'] for match in matches]
             
             # Error handling: 0 matches
             if len(matching_mos) == 0:
@@ -155,15 +139,11 @@ class MOLookup:
                 logger.error(error_msg)
                 return False, None, error_msg
             
-            # Success: Exactly one match
-            mo = matching_mos[0]
+            # Success: Exactly one match. The cached row may be minutes old, so
+            # read the current MO (status is used as the "before" state)
+            mo = self.api.get_manufacturing_order_details(matching_mos[0].get('man_ord_id')) or matching_mos[0]
             # Use the lot code as stored in MRPeasy (e.g. L33126) for consistency
-            matched_lot_code = lot_code
-            for lot in mo.get('target_lots', []):
-                lc = (lot.get('code') or '').strip()
-                if lc.upper() in possible_codes:
-                    matched_lot_code = lc
-                    break
+            matched_lot_code = matches[0]['lot_code']
             # Extract required information
             mo_data = {
                 'mo_number': mo.get('code', 'N/A'),
@@ -0,0 +1,100 @@
+"""
+Lot code → Manufacturing Order index.
+
+Built from the MRPeasy manufacturing orders kept in the persistent reference
+cache (shared/reference_cache.py), so looking up an unknown lot is a dictionary
+hit instead of downloading every MO ever created.
+
+- Codes are normalized (upper case, without the "L" prefix): "L33126" and
+  "33126" find the same MO.
+- The cached MOs are refreshed incrementally (only MOs created since the last
+  refresh) when the TTL passes, and once more on a miss if the last refresh is
+  older than MISS_REFRESH_SECONDS, so a lot from a brand-new MO is still found.
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, List, Any, Optional
+
+from shared.api_manager import APIManager
+from shared.reference_cache import ReferenceCache, get_reference_cache
+
+logger = logging.getLogger(__name__)
+
+MO_ENTITY = 'manufacturing_orders'
+MISS_REFRESH_SECONDS = 60
+
+
+def normalize_lot_code(code: Optional[str]) -> str:
+    code = (code or '').strip().upper()
+    return code[1:] if code.startswith('L') and len(code) > 1 else code
+
+
+class MOLotIndex:
+    """In-memory index over the cached MOs, rebuilt whenever the cache is refreshed"""
+
+    def __init__(self, cache: Optional[ReferenceCache] = None):
+        self._cache = cache or get_reference_cache()
+        self._lock = threading.Lock()
+        # normalized lot code -> {man_ord_id: lot code as stored in MRPeasy}
+        self._index: Dict[str, Dict[Any, str]] = {}
+        self._mos: Dict[Any, Dict[str, Any]] = {}
+        self._built_from: Optional[float] = None
+
+    def _rebuild_if_needed(self) -> None:
+        refreshed_at = self._cache.last_refreshed(MO_ENTITY)
+        if refreshed_at == self._built_from:
+            return
+        index: Dict[str, Dict[Any, str]] = {}
+        mos = {}
+        for mo in self._cache.load(MO_ENTITY):
+            mo_id = mo.get('man_ord_id')
+            mos[mo_id] = mo
+            for lot in mo.get('target_lots') or []:
+                code = (lot.get('code') or '').strip()
+                if code:
+                    index.setdefault(normalize_lot_code(code), {})[mo_id] = code
+        self._index, self._mos, self._built_from = index, mos, refreshed_at
+        logger.info(f"MO lot index rebuilt: {len(index)} lot codes, {len(mos)} MOs")
+
+    def _ensure_loaded(self, api_manager: APIManager) -> None:
+        if self._cache.last_refreshed(MO_ENTITY) is None:
+            self._cache.refresh(MO_ENTITY, api_manager)
+        elif self._cache.is_stale(MO_ENTITY):
+            self._cache.refresh_in_background(MO_ENTITY, api_manager)
+        self._rebuild_if_needed()
+
+    def find(self, lot_code: str, api_manager: APIManager) -> List[Dict[str, Any]]:
+        """
+        Return the cached MOs whose target lots include `lot_code`, as dicts with
+        'mo' (the cached MO row) and 'lot_code' (the code as stored in MRPeasy).
+
+        Raises:
+            MRPeasyAPIError: If the MO list has to be downloaded and the request fails
+        """
+        key = normalize_lot_code(lot_code)
+        with self._lock:
+            self._ensure_loaded(api_manager)
+            matches = self._index.get(key)
+            last = self._cache.last_refreshed(MO_ENTITY) or 0
+            if not matches and time.time() - last > MISS_REFRESH_SECONDS:
+                # The lot may belong to an MO created since the last refresh
+                self._cache.refresh(MO_ENTITY, api_manager)
+                self._rebuild_if_needed()
+                matches = self._index.get(key)
+            return [{'mo': self._mos[mo_id], 'lot_code': code}
+                    for mo_id, code in (matches or {}).items()]
+
+
+_mo_lot_index: Optional[MOLotIndex] = None
+_mo_lot_index_lock = threading.Lock()
+
+
+def get_mo_lot_index() -> MOLotIndex:
+    """Return the process-wide lot → MO index."""
+    global _mo_lot_index
+    with _mo_lot_index_lock:
+        if _mo_lot_index is None:
+            _mo_lot_index = MOLotIndex()
+        return _mo_lot_index
@@ -1,9 +1,13 @@
 """
 MySQL backend for DatabaseManager (erp_mo_to_import).
 Uses MySQL when configured; otherwise DatabaseManager falls back to JSON.
+Connections come from a process-wide pool and the table is created once per process.
 """
 
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,11 @@ CREATE TABLE IF NOT EXISTS {ERP_MO_TABLE} (
 );
 """
 
+# Pool settings (overridable with secrets mysql_pool_size / mysql_pool_idle_seconds)
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_IDLE_SECONDS = 300
+POOL_ACQUIRE_TIMEOUT = 30
+
 
 def get_mysql_config() -> Optional[Dict[str, Any]]:
     """Load MySQL config from secrets. Returns None if not configured."""
@@ -41,10 +50,165 @@ def get_mysql_config() -> Optional[Dict[str, Any]]:
     return None
 
 
+def _connect(cfg: Dict[str, Any]):
+    import pymysql
+    return pymysql.connect(
+        host=cfg["host"],
+        port=cfg["port"],
+        user=cfg["user"],
+        password=cfg["password"],
+        database=cfg["database"],
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of PyMySQL connections.
+
+    - At most `max_size` connections are open; callers wait up to POOL_ACQUIRE_TIMEOUT.
+    - Idle connections older than `idle_seconds` are closed and replaced.
+    - Reused connections are pinged first and discarded if unhealthy.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], max_size: int = DEFAULT_POOL_SIZE,
+                 idle_seconds: float = DEFAULT_POOL_IDLE_SECONDS):
+        self.cfg = cfg
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[Any, float]] = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return a healthy connection. Call release() when done."""
+        if not self._slots.acquire(timeout=POOL_ACQUIRE_TIMEOUT):
+            raise RuntimeError(f"No MySQL connection free after {POOL_ACQUIRE_TIMEOUT}s")
+        try:
+            while True:
+                with self._lock:
+                    conn, last_used = self._idle.pop() if self._idle else (None, 0.0)
+                if conn is None:
+                    return _connect(self.cfg)
+                if time.monotonic() - last_used > self.idle_seconds:
+                    self._close(conn)
+                    continue
+                try:
+                    conn.ping(reconnect=True)
+                    return conn
+                except Exception as e:
+                    logger.debug(f"Discarding unhealthy MySQL connection: {e}")
+                    self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken: bool = False) -> None:
+        """Return a connection to the pool (closed instead if broken)."""
+        try:
+            if broken:
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is rolled back if the block raises."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, broken=not self._rollback(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _rollback(conn) -> bool:
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def get_pool(cfg: Optional[Dict[str, Any]] = None) -> Optional[ConnectionPool]:
+    """Return the process-wide pool for `cfg` (default: get_mysql_config()), or None."""
+    try:
+        import pymysql  # noqa: F401
+    except ImportError:
+        logger.debug("PyMySQL not installed; using JSON backend.")
+        return None
+    cfg = cfg or get_mysql_config()
+    if not cfg:
+        return None
+    key = (cfg["host"], cfg["port"], cfg["user"], cfg["database"])
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            try:
+                from config import secrets
+                size = int(secrets.get("mysql_pool_size") or DEFAULT_POOL_SIZE)
+                idle = float(secrets.get("mysql_pool_idle_seconds") or DEFAULT_POOL_IDLE_SECONDS)
+            except Exception:
+                size, idle = DEFAULT_POOL_SIZE, DEFAULT_POOL_IDLE_SECONDS
+            pool = _pools[key] = ConnectionPool(cfg, size, idle)
+        return pool
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pooled connection with the erp_mo_to_import table bootstrapped.
+    Yields None if MySQL is not configured or unreachable.
+    """
+    pool = get_pool()
+    if not pool:
+        yield None
+        return
+    try:
+        conn = pool.acquire()
+    except Exception as e:
+        logger.warning(f"MySQL connection failed: {e}")
+        yield None
+        return
+    try:
+        ensure_schema(conn)
+        yield conn
+    except Exception:
+        pool.release(conn, broken=not ConnectionPool._rollback(conn))
+        raise
+    else:
+        pool.release(conn)
+
+
 def get_connection():
-    """Return a MySQL connection or None if not available."""
+    """Return a new, unpooled MySQL connection or None if not available."""
     try:
-        import pymysql
+        import pymysql  # noqa: F401
     except ImportError:
         logger.debug("PyMySQL not installed; using JSON backend.")
         return None
@@ -52,16 +216,7 @@ def get_connection():
     if not cfg:
         return None
     try:
-        conn = pymysql.connect(
-            host=cfg["host"],
-            port=cfg["port"],
-            user=cfg["user"],
-            password=cfg["password"],
-            database=cfg["database"],
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor,
-        )
-        return conn
+        return _connect(cfg)
     except Exception as e:
         logger.warning(f"MySQL connection failed: {e}")
         return None
@@ -79,59 +234,83 @@ def ensure_table(conn) -> bool:
         return False
 
 
+def ensure_schema(conn) -> bool:
+    """Run ensure_table once per process."""
+    global _schema_ready
+    if _schema_ready:
+        return True
+    with _schema_lock:
+        if not _schema_ready:
+            _schema_ready = ensure_table(conn)
+    return _schema_ready
+
+
 def execute_mysql(query: str, values: Tuple = None) -> int:
     """
     Run INSERT or UPDATE on MySQL for erp_mo_to_import.
     Returns number of affected rows. Raises on error.
     """
-    conn = get_connection()
-    if not conn:
-        raise RuntimeError("MySQL not available")
-    try:
-        ensure_table(conn)
+    with pooled_connection() as conn:
+        if not conn:
+            raise RuntimeError("MySQL not available")
         with conn.cursor() as cur:
             cur.execute(query, values or ())
             conn.commit()
             return cur.rowcount
-    finally:
-        conn.close()
+
+
+def execute_many_mysql(query: str, values: List[Tuple], chunk_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Run a batch INSERT with executemany, `chunk_size` rows per call, in one transaction.
+    Returns one stats dict per chunk ({'chunk', 'rows', 'affected', 'seconds'}).
+    Rolls back and raises on error.
+    """
+    with pooled_connection() as conn:
+        if not conn:
+            raise RuntimeError("MySQL not available")
+        stats = []
+        with conn.cursor() as cur:
+            for start in range(0, len(values), chunk_size):
+                started = time.perf_counter()
+                chunk = values[start:start + chunk_size]
+                cur.executemany(query, chunk)
+                stats.append({
+                    "chunk": start // chunk_size + 1,
+                    "rows": len(chunk),
+                    "affected": cur.rowcount,
+                    "seconds": time.perf_counter() - started,
+                })
+        conn.commit()
+        return stats
 
 
 def fetch_all_mysql(query: str, values: Tuple = None) -> List[Dict[str, Any]]:
     """Run SELECT and return list of dicts. Returns [] if MySQL not available."""
-    conn = get_connection()
-    if not conn:
-        return []
     try:
-        with conn.cursor() as cur:
-            cur.execute(query, values or ())
-            rows = cur.fetchall()
-        if not rows:
-            return []
-        # Normalize: ensure datetime columns are serializable (keep as is for display)
-        out = []
-        for r in rows:
-            out.append(dict(r))
-        return out
+        with pooled_connection() as conn:
+            if not conn:
+                return []
+            with conn.cursor() as cur:
+                cur.execute(query, values or ())
+                rows = cur.fetchall()
+            # Don't keep a read snapshot open on the pooled connection
+            conn.commit()
     except Exception as e:
         logger.warning(f"MySQL fetch failed: {e}")
         return []
-    finally:
-        conn.close()
+    if not rows:
+        return []
+    # Normalize: ensure datetime columns are serializable (keep as is for display)
+    return [dict(r) for r in rows]
 
 
 def is_mysql_available() -> bool:
     """Return True if MySQL is configured and reachable."""
-    conn = get_connection()
-    if not conn:
-        return False
     try:
-        ensure_table(conn)
-        return True
+        with pooled_connection() as conn:
+            return conn is not None
     except Exception:
         return False
-    finally:
-        conn.close()
 
 
 def migrate_json_to_mysql(json_path) -> int:
@@ -151,37 +330,33 @@ def migrate_json_to_mysql(json_path) -> int:
         return 0
     if not rows or not isinstance(rows, list):
         return 0
-    conn = get_connection()
-    if not conn:
-        return 0
     try:
-        ensure_table(conn)
-        with conn.cursor() as cur:
-            migrated = 0
-            for r in rows:
-                lot_code = r.get("lot_code")
-                if not lot_code:
-                    continue
-                cur.execute(
-                    """INSERT INTO erp_mo_to_import
-                       (lot_code, quantity, uom, user_operations, inserted_at, processed_at, failed_code)
-                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                    (
-                        lot_code,
-                        r.get("quantity", 0),
-                        r.get("uom"),
-                        r.get("user_operations"),
-                        r.get("inserted_at"),
-                        r.get("processed_at"),
-                        r.get("failed_code"),
-                    ),
+        with pooled_connection() as conn:
+            if not conn:
+                return 0
+            migrated_rows = [
+                (
+                    r.get("lot_code"),
+                    r.get("quantity", 0),
+                    r.get("uom"),
+                    r.get("user_operations"),
+                    r.get("inserted_at"),
+                    r.get("processed_at"),
+                    r.get("failed_code"),
                 )
-                migrated += 1
-        conn.commit()
-        logger.info(f"Migrated {migrated} rows from JSON to MySQL.")
-        return migrated
+                for r in rows if r.get("lot_code")
+            ]
+            with conn.cursor() as cur:
+                if migrated_rows:
+                    cur.executemany(
+                        """INSERT INTO erp_mo_to_import
+                           (lot_code, quantity, uom, user_operations, inserted_at, processed_at, failed_code)
+                           VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                        migrated_rows,
+                    )
+            conn.commit()
+        logger.info(f"Migrated {len(migrated_rows)} rows from JSON to MySQL.")
+        return len(migrated_rows)
     except Exception as e:
         logger.error(f"Migration failed: {e}")
         return 0
-    finally:
-        conn.close()
@@ -0,0 +1,37 @@
+"""
+Shared ReportLab style cache for the MO and recipe PDFs.
+
+getSampleStyleSheet() and the ParagraphStyles derived from it were rebuilt for
+every generator instance and every recipe PDF. They are now built once per
+process and shared. Cached styles must be treated as read-only: derive a new
+style with paragraph_style(..., parent=style) instead of changing one.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Union
+
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+
+_styles: Dict[Tuple, ParagraphStyle] = {}
+_styles_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def sample_styles() -> StyleSheet1:
+    """The ReportLab sample style sheet, built once"""
+    return getSampleStyleSheet()
+
+
+def paragraph_style(name: str, parent: Union[str, ParagraphStyle] = 'Normal', **attrs: Any) -> ParagraphStyle:
+    """
+    Return the cached ParagraphStyle `name` derived from `parent` (a sample style
+    name such as 'Heading1', or another style) with the given attributes.
+    """
+    key = (name, parent, tuple(sorted(attrs.items())))
+    with _styles_lock:
+        style = _styles.get(key)
+        if style is None:
+            base = sample_styles()[parent] if isinstance(parent, str) else parent
+            style = _styles[key] = ParagraphStyle(name, parent=base, **attrs)
+        return style
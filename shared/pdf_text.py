@@ -0,0 +1,72 @@
+"""
+PDF text extraction, fanned out over a process pool.
+
+PyPDF2 is pure Python and CPU-bound, so extracting hundreds of PDFs in the
+Streamlit request thread is slow and uses one core. extract_pdf_texts() sends
+the PDFs to worker processes (all cores by default) and yields each result as
+soon as it is ready, so callers such as the recipe index can store them while
+the rest are still being parsed.
+
+The workers only import this module, so the pool also works from the app
+(Streamlit) and on Windows, where worker processes are spawned.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from typing import Iterable, Iterator, Optional, Tuple
+import logging
+
+try:
+    from PyPDF2 import PdfReader
+except ImportError:
+    PdfReader = None  # install with: pip install PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# Below this many PDFs the pool start-up costs more than it saves
+MIN_PARALLEL_PDFS = 4
+
+
+def content_hash(pdf_data: bytes) -> str:
+    """SHA-256 of a PDF's bytes, used to reuse extracted text"""
+    return hashlib.sha256(pdf_data).hexdigest()
+
+
+def extract_pdf_text(pdf_data: bytes) -> str:
+    """Text of all pages of a PDF, each page followed by a newline"""
+    reader = PdfReader(BytesIO(pdf_data))
+    return ''.join((page.extract_text() or '') + '\n' for page in reader.pages)
+
+
+def _extract(name: str, pdf_data: bytes) -> Tuple[str, Optional[str], Optional[str]]:
+    try:
+        return name, extract_pdf_text(pdf_data), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def extract_pdf_texts(pdfs: Iterable[Tuple[str, bytes]],
+                      max_workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Extract the text of (name, pdf_data) pairs. Yields (name, text, error) in
+    completion order; text is None and error set when a PDF cannot be read.
+    Runs in a process pool of max_workers (default: all cores), or in this
+    process for a handful of PDFs or when the pool cannot be started.
+    """
+    pdfs = list(pdfs)
+    workers = min(max_workers or os.cpu_count() or 1, len(pdfs))
+    if workers > 1 and len(pdfs) >= MIN_PARALLEL_PDFS:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable, extracting PDFs in-process: {e}")
+        else:
+            with executor:
+                futures = [executor.submit(_extract, name, data) for name, data in pdfs]
+                for future in as_completed(futures):
+                    yield future.result()
+            return
+    for name, data in pdfs:
+        yield _extract(name, data)
@@ -12,8 +12,11 @@ This provides a complete workflow for processing production completions.
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, List, Iterator
 from shared.production_capture import ProductionCapture
 from shared.mo_lookup import MOLookup
 from shared.mo_update import MOUpdate
@@ -23,6 +26,9 @@ from shared.json_storage import JSONStorage
 
 logger = logging.getLogger(__name__)
 
+# Lots processed at the same time by process_batch
+BATCH_MAX_WORKERS = 4
+
 
 class ProductionWorkflow:
     """Complete production workflow integration"""
@@ -65,6 +71,18 @@ class ProductionWorkflow:
             - result_data: Dict with complete workflow results including summary PDF
             - message: Success or error message
         """
+        return self._run_workflow(lot_code, produced_quantity, uom, item_code, self.lookup, None)
+    
+    def _run_workflow(
+        self,
+        lot_code: str,
+        produced_quantity: float,
+        uom: Optional[str],
+        item_code: Optional[str],
+        lookup: MOLookup,
+        mo_locks: Optional['_KeyedLocks']
+    ) -> Tuple[bool, Optional[Dict[str, Any]], str]:
+        """Steps 1-2 (capture, lookup), then the MO update under the MO's lock if given."""
         workflow_start = datetime.now()
         
         try:
@@ -81,7 +99,7 @@ class ProductionWorkflow:
             # Step 2: Lookup MO by lot code (with retry)
             logger.info(f"Step 2: Looking up MO for lot {lot_code}")
             lookup_success, mo_data, lookup_message = self.retry_handler.execute_with_retry(
-                self.lookup.find_mo_by_lot_code,
+                lookup.find_mo_by_lot_code,
                 lot_code
             )
             
@@ -97,126 +115,11 @@ class ProductionWorkflow:
                 )
                 return False, None, error_msg
             
-            mo_id = mo_data['mo_id']
-            mo_number = mo_data['mo_number']
-            status_before = mo_data.get('status')
-            
-            # Step 3: Update MO with actual quantity and status (with retry)
-            logger.info(f"Step 3: Updating MO {mo_number} with production data")
-            update_success, updated_mo_data, update_message = self.retry_handler.execute_with_retry(
-                self.update.update_mo_with_production,
-                mo_id=mo_id,
-                actual_quantity=produced_quantity,
-                lot_code=lot_code
-            )
-            
-            if not update_success:
-                error_msg = f"MO update failed: {update_message}"
-                self.logger.log_production_update(
-                    lot_code=lot_code,
-                    mo_number=mo_number,
-                    mo_id=mo_id,
-                    quantity=produced_quantity,
-                    status_before=status_before,
-                    success=False,
-                    error_message=error_msg
+            # Lots of the same MO are updated one at a time (batch mode runs lots concurrently)
+            with (mo_locks.lock_for(mo_data['mo_id']) if mo_locks else nullcontext()):
+                return self._complete_for_mo(
+                    lot_code, produced_quantity, uom, captured_data, mo_data, workflow_start
                 )
-                return False, None, error_msg
-            
-            status_after = updated_mo_data.get('status')
-            
-            # Check if status actually changed (by API response or by our try_set_mo_status_done)
-            status_before_int = int(status_before) if status_before else None
-            status_after_int = int(status_after) if status_after else None
-            status_changed = (
-                updated_mo_data.get('status_set_done') is True
-                or (status_before_int != status_after_int and status_after_int == 40)
-            )  # 40 = Done
-            
-            status_note = ""
-            if not status_changed:
-                status_before_name = {
-                    10: "New", 15: "Not Scheduled", 20: "Scheduled", 35: "Paused",
-                    30: "In Progress", 40: "Done", 50: "Shipped", 60: "Closed", 70: "Cancelled",
-                }.get(status_before_int, f"Status {status_before_int}")
-                # Si está Cancelled (70), avisar que intentamos poner Done (40) y que revise en MRPEasy
-                if status_before_int == 70:
-                    status_note = (
-                        f"\n\nℹ️ El MO estaba en **{status_before_name}** (70). Se intentó cambiar a **Done** (40). "
-                        f"Si en MRPEasy sigue como Cancelled, márcalo como **Done** manualmente. La cantidad ya está guardada en el lote."
-                    )
-                else:
-                    status_note = (
-                        f"\n\n⚠️ El estado del MO sigue en **{status_before_name}** (código {status_before_int}). "
-                        f"Marca el MO **{mo_number}** como **Done** manualmente en MRPEasy si lo necesitas."
-                    )
-            
-            # Step 4: Save production record
-            logger.info(f"Step 4: Saving production record for MO {mo_number}")
-            estimated_qty = updated_mo_data.get('expected_output', 0)
-            self.storage.save_production_record(
-                lot=lot_code,
-                mo=mo_number,
-                estimated_qty=estimated_qty,
-                actual_qty=produced_quantity,
-                status=updated_mo_data.get('status_name', 'Done')
-            )
-            
-            # Step 4b: Log successful update
-            logger.info(f"Step 4b: Logging production update for MO {mo_number}")
-            self.logger.log_production_update(
-                lot_code=lot_code,
-                mo_number=mo_number,
-                mo_id=mo_id,
-                quantity=produced_quantity,
-                status_before=status_before,
-                status_after=status_after,
-                success=True
-            )
-            
-            # Step 5: Generate summary
-            logger.info(f"Step 5: Generating production summary for MO {mo_number}")
-            summary_data = self.summary.generate_summary_data(
-                mo_number=mo_number,
-                item_code=updated_mo_data.get('item_code', 'N/A'),
-                item_title=updated_mo_data.get('item_title', 'N/A'),
-                lot_code=lot_code,
-                produced_quantity=produced_quantity,
-                produced_unit=uom or updated_mo_data.get('expected_output_unit', ''),
-                expected_output=updated_mo_data.get('expected_output'),
-                expected_unit=updated_mo_data.get('expected_output_unit'),
-                timestamp=workflow_start
-            )
-            
-            # Generate PDF summary
-            summary_pdf = self.summary.create_summary_pdf(summary_data)
-            
-            # Prepare result data
-            result_data = {
-                'captured_data': captured_data,
-                'mo_lookup': mo_data,
-                'mo_update': updated_mo_data,
-                'summary_data': summary_data,
-                'summary_pdf': summary_pdf,
-                'workflow_timestamp': workflow_start.isoformat()
-            }
-            
-            # Build status message based on whether status changed
-            if status_changed:
-                status_part = f"Estado cambiado a Done (40)."
-            else:
-                status_part = f"Estado sigue en {status_before_name} ({status_before_int})."
-            
-            success_msg = (
-                f"✅ Procesamiento completado exitosamente.\n\n"
-                f"**Lot {lot_code}** actualizado con cantidad **{produced_quantity} {uom or ''}** "
-                f"para **MO {mo_number}**.\n\n"
-                f"**Estado del MO:** {status_part}"
-                f"{status_note}"
-            )
-            
-            logger.info(f"Workflow completed successfully: {success_msg}")
-            return True, result_data, success_msg
             
         except Exception as e:
             error_msg = f"Workflow error: {str(e)}"
@@ -230,4 +133,236 @@ class ProductionWorkflow:
                 error_message=error_msg
             )
             return False, None, error_msg
+    
+    def _complete_for_mo(
+        self,
+        lot_code: str,
+        produced_quantity: float,
+        uom: Optional[str],
+        captured_data: Dict[str, Any],
+        mo_data: Dict[str, Any],
+        workflow_start: datetime
+    ) -> Tuple[bool, Optional[Dict[str, Any]], str]:
+        """Steps 3-5: update the MO, save and log the record, build the summary."""
+        mo_id = mo_data['mo_id']
+        mo_number = mo_data['mo_number']
+        status_before = mo_data.get('status')
+        
+        # Step 3: Update MO with actual quantity and status (with retry)
+        logger.info(f"Step 3: Updating MO {mo_number} with production data")
+        update_success, updated_mo_data, update_message = self.retry_handler.execute_with_retry(
+            self.update.update_mo_with_production,
+            mo_id=mo_id,
+            actual_quantity=produced_quantity,
+            lot_code=lot_code
+        )
+        
+        if not update_success:
+            error_msg = f"MO update failed: {update_message}"
+            self.logger.log_production_update(
+                lot_code=lot_code,
+                mo_number=mo_number,
+                mo_id=mo_id,
+                quantity=produced_quantity,
+                status_before=status_before,
+                success=False,
+                error_message=error_msg
+            )
+            return False, None, error_msg
+        
+        status_after = updated_mo_data.get('status')
+        
+        # Check if status actually changed (by API response or by our try_set_mo_status_done)
+        status_before_int = int(status_before) if status_before else None
+        status_after_int = int(status_after) if status_after else None
+        status_changed = (
+            updated_mo_data.get('status_set_done') is True
+            or (status_before_int != status_after_int and status_after_int == 40)
+        )  # 40 = Done
+        
+        status_note = ""
+        if not status_changed:
+            status_before_name = {
+                10: "New", 15: "Not Scheduled", 20: "Scheduled", 35: "Paused",
+                30: "In Progress", 40: "Done", 50: "Shipped", 60: "Closed", 70: "Cancelled",
+            }.get(status_before_int, f"Status {status_before_int}")
+            # Si está Cancelled (70), avisar que intentamos poner Done (40) y que revise en MRPEasy
+            if status_before_int == 70:
+                status_note = (
+                    f"\n\nℹ️ El MO estaba en **{status_before_name}** (70). Se intentó cambiar a **Done** (40). "
+                    f"Si en MRPEasy sigue como Cancelled, márcalo como **Done** manualmente. La cantidad ya está guardada en el lote."
+                )
+            else:
+                status_note = (
+                    f"\n\n⚠️ El estado del MO sigue en **{status_before_name}** (código {status_before_int}). "
+                    f"Marca el MO **{mo_number}** como **Done** manualmente en MRPEasy si lo necesitas."
+                )
+        
+        # Step 4: Save production record
+        logger.info(f"Step 4: Saving production record for MO {mo_number}")
+        estimated_qty = updated_mo_data.get('expected_output', 0)
+        self.storage.save_production_record(
+            lot=lot_code,
+            mo=mo_number,
+            estimated_qty=estimated_qty,
+            actual_qty=produced_quantity,
+            status=updated_mo_data.get('status_name', 'Done')
+        )
+        
+        # Step 4b: Log successful update
+        logger.info(f"Step 4b: Logging production update for MO {mo_number}")
+        self.logger.log_production_update(
+            lot_code=lot_code,
+            mo_number=mo_number,
+            mo_id=mo_id,
+            quantity=produced_quantity,
+            status_before=status_before,
+            status_after=status_after,
+            success=True
+        )
+        
+        # Step 5: Generate summary
+        logger.info(f"Step 5: Generating production summary for MO {mo_number}")
+        summary_data = self.summary.generate_summary_data(
+            mo_number=mo_number,
+            item_code=updated_mo_data.get('item_code', 'N/A'),
+            item_title=updated_mo_data.get('item_title', 'N/A'),
+            lot_code=lot_code,
+            produced_quantity=produced_quantity,
+            produced_unit=uom or updated_mo_data.get('expected_output_unit', ''),
+            expected_output=updated_mo_data.get('expected_output'),
+            expected_unit=updated_mo_data.get('expected_output_unit'),
+            timestamp=workflow_start
+        )
+        
+        # Generate PDF summary
+        summary_pdf = self.summary.create_summary_pdf(summary_data)
+        
+        # Prepare result data
+        result_data = {
+            'captured_data': captured_data,
+            'mo_lookup': mo_data,
+            'mo_update': updated_mo_data,
+            'summary_data': summary_data,
+            'summary_pdf': summary_pdf,
+            'workflow_timestamp': workflow_start.isoformat()
+        }
+        
+        # Build status message based on whether status changed
+        if status_changed:
+            status_part = f"Estado cambiado a Done (40)."
+        else:
+            status_part = f"Estado sigue en {status_before_name} ({status_before_int})."
+        
+        success_msg = (
+            f"✅ Procesamiento completado exitosamente.\n\n"
+            f"**Lot {lot_code}** actualizado con cantidad **{produced_quantity} {uom or ''}** "
+            f"para **MO {mo_number}**.\n\n"
+            f"**Estado del MO:** {status_part}"
+            f"{status_note}"
+        )
+        
+        logger.info(f"Workflow completed successfully: {success_msg}")
+        return True, result_data, success_msg
+    
+    def process_batch(
+        self,
+        entries: List[Dict[str, Any]],
+        max_workers: int = BATCH_MAX_WORKERS
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run the workflow for many lots concurrently, yielding each result as it finishes.
+        
+        Lots are independent except when they belong to the same MO: those are updated
+        one after another. Lot and MO lookups are shared across the batch, so an MO
+        with several lots is fetched once (unknown lots use the shared lot → MO index). All MRPeasy calls go through the shared
+        rate limiter.
+        
+        Args:
+            entries: Dicts with 'lot_code', 'quantity' and optionally 'uom' (e.g. erp_mo_to_import rows)
+            max_workers: Maximum lots processed at the same time
+        
+        Yields:
+            Dict with index (position in entries), entry, lot_code, success, result_data, message
+        """
+        if not entries:
+            return
+        lookup = MOLookup(_BatchLookupAPI(self.lookup.api))
+        mo_locks = _KeyedLocks()
+        
+        def run(index: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+            lot_code = (entry.get('lot_code') or '').strip()
+            try:
+                success, result_data, message = self._run_workflow(
+                    lot_code, float(entry.get('quantity') or 0), entry.get('uom'),
+                    entry.get('item_code'), lookup, mo_locks
+                )
+            except Exception as e:
+                success, result_data, message = False, None, f"Workflow error: {str(e)}"
+            return {
+                'index': index,
+                'entry': entry,
+                'lot_code': lot_code,
+                'success': success,
+                'result_data': result_data,
+                'message': message
+            }
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(entries)))
+        try:
+            futures = [executor.submit(run, i, entry) for i, entry in enumerate(entries)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # If the caller stops early, don't start lots that haven't begun
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _KeyedLocks:
+    """One lock per key (MO id), created on demand"""
+    
+    def __init__(self):
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._guard = threading.Lock()
+    
+    def lock_for(self, key: Any) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
 
+
+class _BatchLookupAPI:
+    """
+    APIManager wrapper used for MO lookups during a batch: lot and MO detail
+    requests are made once per batch and shared by concurrent callers.
+    Everything else is delegated to the real APIManager.
+    """
+    
+    def __init__(self, api):
+        self._api = api
+        self._results: Dict[Tuple, Future] = {}
+        self._guard = threading.Lock()
+    
+    def __getattr__(self, name):
+        return getattr(self._api, name)
+    
+    def _shared(self, key: Tuple, fetch, *args):
+        with self._guard:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            try:
+                future.set_result(fetch(*args))
+            except Exception as e:
+                future.set_exception(e)
+                with self._guard:
+                    # Failed requests may be retried by the workflow's RetryHandler
+                    self._results.pop(key, None)
+        return future.result()
+    
+    def get_single_lot(self, code):
+        return self._shared(('lot', code), self._api.get_single_lot, code)
+    
+    def get_manufacturing_order_details(self, mo_id):
+        return self._shared(('mo', mo_id), self._api.get_manufacturing_order_details, mo_id)
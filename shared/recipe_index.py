@@ -0,0 +1,306 @@
+"""
+Full-text index of the recipes ZIP (recipes_split/recipespdf.zip).
+
+Looking up a recipe used to decompress and parse every PDF in the archive until
+one matched. The index extracts the text of each PDF once and keeps it in a
+sidecar file next to the ZIP (recipespdf.index.json), so a lookup is:
+
+- a dictionary hit on the item code (A####) found in the PDF text,
+- else an exact hit on a normalized title variant (from the PDF title line and file name),
+- else a substring search of the cached texts, then a fuzzy title match.
+
+The index is checked against the ZIP's mtime/size on every lookup. When they
+change, the ZIP's SHA-256 decides whether the content really changed. PDFs whose
+CRC/size or content hash are already indexed keep their text; the others are
+extracted on a process pool (shared/pdf_text.py) and indexed as they finish.
+
+Rebuild from the command line (e.g. after a new ZIP drop):
+    python -m shared.recipe_index [recipes_split/recipespdf.zip] [--workers N]
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from shared.pdf_text import content_hash, extract_pdf_texts
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+FUZZY_TITLE_CUTOFF = 0.85
+# While rebuilding, extracted entries are saved every N PDFs so an interrupted build keeps them
+CHECKPOINT_EVERY = 50
+DEFAULT_ZIP_PATH = Path(__file__).resolve().parent.parent / 'recipes_split' / 'recipespdf.zip'
+
+_ITEM_CODE = re.compile(r'\b(A\d{4})\b', re.IGNORECASE)
+_SKIP_TITLE_WORDS = ('page', 'recipe', 'ingredients', 'instructions', 'method', 'preparation')
+
+
+def normalize_code(code: Optional[str]) -> str:
+    return (code or '').upper().replace(' ', '')
+
+
+def title_variants(title: Optional[str]) -> List[str]:
+    """Lower-case variations of an item title used to match recipes (without sizes/packaging)"""
+    title = (title or '').lower().strip()
+    variants = [
+        title,
+        title.replace(' - ', ' '),
+        title.replace('-', ' '),
+        title.split(' - ')[0],
+        title.split('(')[0].strip(),
+        title.replace('tray', '').strip(),
+        title.replace('bag', '').strip(),
+        title.replace(' - bag', '').strip(),
+        title.replace(' - tray', '').strip(),
+    ]
+    return list(dict.fromkeys(v for v in variants if v and len(v) > 2))
+
+
+def _document_titles(pdf_name: str, text: str) -> List[str]:
+    """Title variants of a recipe PDF: its file name and its first title-like line"""
+    stem = Path(pdf_name).stem
+    stem = re.sub(r'\s*\(\d+\)$', '', stem)  # "recipe_A1567_Cheese_Borek_-_tray (2)"
+    stem = re.sub(r'^recipe_', '', stem, flags=re.IGNORECASE)
+    stem = _ITEM_CODE.sub('', stem).replace('_', ' ').strip(' -')
+    titles = title_variants(stem)
+    for line in text.split('\n')[:20]:
+        line = _ITEM_CODE.sub('', line).strip(' -:()[]{}')
+        if len(line) > 3 and re.search(r'[A-Za-z]{3,}', line) and \
+                not any(word in line.lower() for word in _SKIP_TITLE_WORDS):
+            titles.extend(title_variants(line))
+            break
+    return list(dict.fromkeys(titles))
+
+
+def index_entry(pdf_name: str, text: str, crc: int, size: int, sha256: str) -> Dict[str, Any]:
+    codes = list(dict.fromkeys(code.upper() for code in _ITEM_CODE.findall(text)))
+    return {
+        'pdf_name': pdf_name,
+        'crc': crc,
+        'size': size,
+        'sha256': sha256,
+        'text': text,
+        'codes': codes,
+        'item_code': codes[0] if codes else None,
+        'titles': _document_titles(pdf_name, text),
+    }
+
+
+class RecipeIndex:
+    """Text, item codes and titles of every PDF in a recipes ZIP, persisted next to it"""
+
+    def __init__(self, zip_path: Path):
+        self.zip_path = Path(zip_path)
+        self.index_path = self.zip_path.with_suffix('.index.json')
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_code: Dict[str, List[str]] = {}
+        self._by_title: Dict[str, List[str]] = {}
+        self._zip_signature: Optional[List[int]] = None
+        self._zip_sha256: Optional[str] = None
+
+    # ------------------------------------------------------------------ building
+
+    def _signature(self) -> List[int]:
+        st = self.zip_path.stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    def _sha256(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.zip_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_persisted(self) -> None:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable recipe index {self.index_path}: {e}")
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        self._zip_signature = data.get('zip_signature')
+        self._zip_sha256 = data.get('zip_sha256')
+        self._set_entries(data.get('entries', []))
+
+    def _set_entries(self, entries: Iterable[Dict[str, Any]]) -> None:
+        self._entries, self._by_code, self._by_title = {}, {}, {}
+        for entry in entries:
+            self._add_entry(entry)
+
+    def _add_entry(self, entry: Dict[str, Any]) -> None:
+        name = entry['pdf_name']
+        self._entries[name] = entry
+        for code in entry['codes']:
+            self._by_code.setdefault(code, []).append(name)
+        for title in entry['titles']:
+            self._by_title.setdefault(title, []).append(name)
+
+    def _save(self, complete: bool = True) -> None:
+        """Persist the entries; a partial save has no ZIP signature, so it is rebuilt (reusing them) on load"""
+        data = {
+            'version': INDEX_VERSION,
+            'zip_signature': self._zip_signature if complete else None,
+            'zip_sha256': self._zip_sha256 if complete else None,
+            'entries': list(self._entries.values()),
+        }
+        temp_file = self.index_path.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        temp_file.replace(self.index_path)
+
+    def _ensure_current(self, max_workers: Optional[int] = None) -> Dict[str, int]:
+        if self._zip_signature is None:
+            self._load_persisted()
+        stats = {'pdfs': len(self._entries), 'extracted': 0, 'reused': 0, 'failed': 0}
+        signature = self._signature()
+        if signature == self._zip_signature:
+            return stats
+        sha256 = self._sha256()
+        if sha256 != self._zip_sha256:
+            stats = self._rebuild(max_workers)
+        self._zip_signature, self._zip_sha256 = signature, sha256
+        self._save()
+        return stats
+
+    def _rebuild(self, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Index the PDFs of the ZIP. Entries whose CRC/size or content hash is unchanged
+        are reused; the others are extracted on a process pool and indexed as they finish.
+        """
+        started = time.perf_counter()
+        previous = self._entries
+        by_hash = {entry.get('sha256'): entry for entry in previous.values() if entry.get('sha256')}
+        entries: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, Tuple[zipfile.ZipInfo, str]] = {}
+        to_extract = []
+        zip_order: List[str] = []
+        stats = {'pdfs': 0, 'extracted': 0, 'reused': 0, 'failed': 0}
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_file:
+            for info in zip_file.infolist():
+                if not info.filename.lower().endswith('.pdf'):
+                    continue
+                zip_order.append(info.filename)
+                entry = previous.get(info.filename)
+                if entry is None or (entry['crc'], entry['size']) != (info.CRC, info.file_size):
+                    data = zip_file.read(info.filename)
+                    sha256 = content_hash(data)
+                    reused = by_hash.get(sha256)
+                    if reused is None:
+                        pending[info.filename] = (info, sha256)
+                        to_extract.append((info.filename, data))
+                        continue
+                    entry = index_entry(info.filename, reused['text'], info.CRC, info.file_size, sha256)
+                entries[info.filename] = entry
+                stats['reused'] += 1
+
+        self._set_entries(entries.values())
+        for name, text, error in extract_pdf_texts(to_extract, max_workers):
+            if error is not None:
+                logger.warning(f"Error reading PDF {name}: {error}")
+                stats['failed'] += 1
+                continue
+            info, sha256 = pending[name]
+            entries[name] = index_entry(name, text, info.CRC, info.file_size, sha256)
+            self._add_entry(entries[name])
+            stats['extracted'] += 1
+            if stats['extracted'] % CHECKPOINT_EVERY == 0:
+                self._save(complete=False)
+
+        # Keep the ZIP order, which decides between recipes sharing a code or title
+        self._set_entries(entries[name] for name in zip_order if name in entries)
+        stats['pdfs'] = len(entries)
+        logger.info(f"Recipe index of {self.zip_path.name}: {stats['pdfs']} PDFs, {stats['extracted']} extracted, "
+                    f"{stats['reused']} reused, {stats['failed']} failed ({time.perf_counter() - started:.1f}s)")
+        return stats
+
+    def refresh(self, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Bring the index up to date with the ZIP now (instead of on the next lookup).
+        Returns counts: 'pdfs', 'extracted', 'reused', 'failed'.
+        """
+        with self._lock:
+            return self._ensure_current(max_workers)
+
+    # ------------------------------------------------------------------ lookups
+
+    def find(self, item_code: Optional[str], item_title: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Return the index entry of the recipe for an item ('pdf_name', 'text', 'item_code', ...)
+        or None. The code wins over the title; a title match is only accepted when the
+        recipe has no item code or the same one.
+        """
+        with self._lock:
+            self._ensure_current()
+            code = normalize_code(item_code)
+            names = self._by_code.get(code) if code else None
+            if not names and code:
+                # Codes that are not A#### are still matched anywhere in the text
+                names = [name for name, entry in self._entries.items()
+                         if code in entry['text'].upper().replace(' ', '')]
+            if names:
+                return dict(self._entries[names[0]])
+
+            variants = title_variants(item_title)
+            accepted = lambda name: self._entries[name]['item_code'] in (None, code)
+            for variant in variants:
+                for name in self._by_title.get(variant, []):
+                    if accepted(name):
+                        return dict(self._entries[name])
+            for name, entry in self._entries.items():
+                text = entry['text'].lower()
+                if accepted(name) and any(variant in text for variant in variants):
+                    return dict(entry)
+            for variant in variants:
+                for title in difflib.get_close_matches(variant, self._by_title, n=3, cutoff=FUZZY_TITLE_CUTOFF):
+                    for name in self._by_title[title]:
+                        if accepted(name):
+                            return dict(self._entries[name])
+            return None
+
+    def read_pdf(self, pdf_name: str) -> bytes:
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_file:
+            return zip_file.read(pdf_name)
+
+
+_indexes: Dict[Path, RecipeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_recipe_index(zip_path) -> RecipeIndex:
+    """Return the process-wide index of a recipes ZIP"""
+    key = Path(os.path.abspath(zip_path))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RecipeIndex(key)
+        return index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or update the recipes ZIP index using all cores.")
+    parser.add_argument('zip_path', nargs='?', default=str(DEFAULT_ZIP_PATH), help="recipes ZIP")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    stats = get_recipe_index(args.zip_path).refresh(args.workers)
+    print(f"{stats['pdfs']} PDFs indexed: {stats['extracted']} extracted, {stats['reused']} reused, "
+          f"{stats['failed']} failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Persistent reference-data cache for MRPeasy (items, units, lots, BOMs, MOs).
+
+Rows are stored in SQLite under data/cache/ so a restart of the Streamlit app
+reads them from disk instead of re-downloading thousands of items and lots.
+
+- Each entity has its own TTL (ENTITY_SETTINGS).
+- Reads are stale-while-revalidate: once the TTL has passed the cached rows are
+  still returned immediately and a background thread refreshes them.
+- Refreshes are incremental where MRPeasy exposes a modification timestamp: only
+  rows changed since the last high-water mark are requested and upserted. A full
+  reload still runs every FULL_REFRESH_HOURS so deleted rows disappear.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from shared.api_manager import APIManager, MRPeasyAPIError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path("data") / "cache" / "reference_cache.db"
+
+# path: MRPeasy list endpoint; key: unique id field of a row;
+# delta_param/modified_field: filter and row field used for incremental refresh.
+# If MRPeasy ignores the filter it returns every row, which is still a correct upsert.
+ENTITY_SETTINGS = {
+    'items': {'path': 'items', 'key': 'article_id', 'ttl_minutes': 360,
+              'delta_param': 'updated_min', 'modified_field': 'updated'},
+    'units': {'path': 'units', 'key': 'unit_id', 'ttl_minutes': 1440,
+              'delta_param': None, 'modified_field': None},
+    'lots': {'path': 'lots', 'key': 'lot_id', 'ttl_minutes': 15,
+             'delta_param': 'updated_min', 'modified_field': 'updated'},
+    'boms': {'path': 'boms', 'key': 'bom_id', 'ttl_minutes': 360,
+             'delta_param': 'updated_min', 'modified_field': 'updated'},
+    # Target lots are set when an MO is created, so new MOs are enough between full reloads
+    'manufacturing_orders': {'path': 'manufacturing-orders', 'key': 'man_ord_id', 'ttl_minutes': 15,
+                             'delta_param': 'created_min', 'modified_field': 'created'},
+}
+FULL_REFRESH_HOURS = 24
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS reference_rows (
+    entity TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (entity, row_key)
+);
+CREATE TABLE IF NOT EXISTS reference_meta (
+    entity TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL,
+    full_refreshed_at REAL NOT NULL,
+    high_water REAL
+);
+"""
+
+
+class ReferenceCache:
+    """SQLite-backed cache of MRPeasy reference data with per-entity TTLs"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._refresh_locks = {entity: threading.Lock() for entity in ENTITY_SETTINGS}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        # WAL lets readers keep using the old rows while a refresh transaction runs
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _settings(entity: str) -> Dict[str, Any]:
+        if entity not in ENTITY_SETTINGS:
+            raise ValueError(f"Unknown reference entity: {entity}")
+        return ENTITY_SETTINGS[entity]
+
+    def _get_meta(self, entity: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT refreshed_at, full_refreshed_at, high_water FROM reference_meta WHERE entity = ?",
+                (entity,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'refreshed_at': row[0], 'full_refreshed_at': row[1], 'high_water': row[2]}
+
+    def load(self, entity: str) -> List[Dict]:
+        """Return the cached rows for an entity without touching the API."""
+        self._settings(entity)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM reference_rows WHERE entity = ?", (entity,)
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def last_refreshed(self, entity: str) -> Optional[float]:
+        """Unix time of the last successful refresh, or None if never loaded."""
+        meta = self._get_meta(entity)
+        return meta['refreshed_at'] if meta else None
+
+    def is_stale(self, entity: str) -> bool:
+        meta = self._get_meta(entity)
+        if not meta:
+            return True
+        return time.time() - meta['refreshed_at'] >= self._settings(entity)['ttl_minutes'] * 60
+
+    def get_all(self, entity: str, api_manager: APIManager, force: bool = False) -> List[Dict]:
+        """
+        Return all rows for an entity.
+
+        - Nothing cached (or force=True): refresh synchronously, then return.
+        - Cached but past its TTL: return the cached rows now and refresh in the background.
+        - Fresh: return the cached rows.
+        """
+        meta = self._get_meta(entity)
+        if force or meta is None:
+            self.refresh(entity, api_manager)
+            return self.load(entity)
+
+        rows = self.load(entity)
+        if self.is_stale(entity):
+            self.refresh_in_background(entity, api_manager)
+        return rows
+
+    def refresh_in_background(self, entity: str, api_manager: APIManager) -> bool:
+        """Start a refresh thread unless one is already running. Returns True if started."""
+        if self._refresh_locks[entity].locked():
+            return False
+        thread = threading.Thread(
+            target=self._refresh_quietly, args=(entity, api_manager),
+            name=f"reference-cache-{entity}", daemon=True
+        )
+        thread.start()
+        return True
+
+    def _refresh_quietly(self, entity: str, api_manager: APIManager) -> None:
+        try:
+            self.refresh(entity, api_manager, wait=False)
+        except Exception as e:
+            logger.warning(f"Background refresh of {entity} failed: {e}")
+
+    def refresh(self, entity: str, api_manager: APIManager, full: bool = False, wait: bool = True) -> int:
+        """
+        Download rows from MRPeasy and store them. Returns the number of rows written.
+
+        Incremental when the entity supports it, a high-water mark exists and the last
+        full reload is recent; otherwise the entity is reloaded in full. Pages are
+        written as they arrive inside one transaction, so readers see either the old
+        or the new rows, never a half-written set.
+        """
+        settings = self._settings(entity)
+        lock = self._refresh_locks[entity]
+        if not lock.acquire(blocking=wait):
+            return 0
+        try:
+            meta = self._get_meta(entity)
+            now = time.time()
+            delta = (
+                not full and meta is not None
+                and settings['delta_param'] and meta['high_water'] is not None
+                and now - meta['full_refreshed_at'] < FULL_REFRESH_HOURS * 3600
+            )
+            params = {settings['delta_param']: int(meta['high_water'])} if delta else None
+            high_water = meta['high_water'] if delta else None
+            key_field, modified_field = settings['key'], settings['modified_field']
+
+            written = 0
+            conn = self._connect()
+            try:
+                with conn:
+                    if not delta:
+                        conn.execute("DELETE FROM reference_rows WHERE entity = ?", (entity,))
+                    for page in api_manager.iter_pages(settings['path'], params):
+                        batch = []
+                        for row in page:
+                            key = row.get(key_field, row.get('code'))
+                            if key is None:
+                                continue
+                            batch.append((entity, str(key), json.dumps(row, default=str)))
+                            if modified_field:
+                                try:
+                                    modified = float(row.get(modified_field))
+                                    high_water = modified if high_water is None else max(high_water, modified)
+                                except (TypeError, ValueError):
+                                    pass
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO reference_rows (entity, row_key, payload) VALUES (?, ?, ?)",
+                            batch
+                        )
+                        written += len(batch)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO reference_meta (entity, refreshed_at, full_refreshed_at, high_water) "
+                        "VALUES (?, ?, ?, ?)",
+                        (entity, now, meta['full_refreshed_at'] if delta else now, high_water)
+                    )
+            finally:
+                conn.close()
+            logger.info(f"Reference cache {'delta' if delta else 'full'} refresh of {entity}: {written} rows")
+            return written
+        except MRPeasyAPIError as e:
+            logger.error(f"Error refreshing {entity} reference cache: {e}")
+            raise
+        finally:
+            lock.release()
+
+    def invalidate(self, entity: Optional[str] = None) -> None:
+        """Forget refresh times so the next read reloads (all entities if none given)."""
+        with self._connect() as conn:
+            if entity:
+                conn.execute("DELETE FROM reference_meta WHERE entity = ?", (entity,))
+            else:
+                conn.execute("DELETE FROM reference_meta")
+
+
+_reference_cache: Optional[ReferenceCache] = None
+_reference_cache_lock = threading.Lock()
+
+
+def get_reference_cache() -> ReferenceCache:
+    """Return the process-wide reference cache shared by all pages."""
+    global _reference_cache
+    with _reference_cache_lock:
+        if _reference_cache is None:
+            _reference_cache = ReferenceCache()
+        return _reference_cache
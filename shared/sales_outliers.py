@@ -0,0 +1,75 @@
+"""
+Vectorized z-score outlier detection shared by the sales analyzers
+(clover_sales_analysis daily and weekly, silverware_sales_analysis).
+
+Every detector is one grouped pass: the rows are aggregated once per group and
+period, the baseline mean/std of each group comes from groupby().transform over
+the baseline rows, and the z-score of every current row is computed at once.
+"""
+
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def period_totals(df: pd.DataFrame, keys: Sequence[str], period_cols: Sequence[str], value_col: str,
+                  first_cols: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    One row per (keys, period) with 'total_sales' (sum of value_col), 'quantity'
+    (row count) and the first value of each of first_cols. Rows with a missing key are dropped.
+    """
+    aggregations = {'total_sales': (value_col, 'sum'), 'quantity': (value_col, 'count')}
+    aggregations.update({col: (col, 'first') for col in first_cols})
+    values = df.assign(**{value_col: pd.to_numeric(df[value_col], errors='coerce')})
+    return values.groupby(list(keys) + list(period_cols), dropna=True).agg(**aggregations).reset_index()
+
+
+def same_weekday_masks(dates: pd.Series, weekdays: pd.Series, analysis_day: date) -> Tuple[pd.Series, pd.Series]:
+    """(current, baseline): rows of analysis_day, and earlier rows on the same weekday"""
+    current = dates == analysis_day
+    baseline = (dates < analysis_day) & (weekdays == analysis_day.weekday())
+    return current, baseline
+
+
+def zscore_outliers(frame: pd.DataFrame, value_col: str, current: pd.Series, baseline: pd.Series,
+                    threshold: float, keys: Sequence[str] = (), min_baseline: int = 2) -> pd.DataFrame:
+    """
+    Current rows whose value is more than `threshold` standard deviations from the
+    mean of the baseline rows of the same group (`keys`; all rows when empty).
+    Groups with fewer than min_baseline baseline rows or zero deviation are skipped.
+
+    Adds historical_mean, historical_std, z_score and deviation_percentage columns.
+    """
+    if frame.empty:
+        return frame.assign(historical_mean=[], historical_std=[], z_score=[], deviation_percentage=[])
+    values = pd.to_numeric(frame[value_col], errors='coerce').astype(float)
+    base = values.where(baseline)
+    by = [frame[k] for k in keys] if keys else np.zeros(len(frame), dtype=int)
+    grouped = base.groupby(by, dropna=False)
+    mean = grouped.transform('mean')
+    std = grouped.transform('std')
+    count = grouped.transform('count')
+
+    z_score = (values - mean) / std
+    mask = current & (count >= min_baseline) & (std > 0) & (z_score.abs() > threshold)
+    return frame.assign(
+        **{value_col: values},
+        historical_mean=mean,
+        historical_std=std,
+        z_score=z_score,
+        deviation_percentage=(values - mean) / mean * 100,
+    )[mask]
+
+
+def tip_percentage(tips: pd.Series, totals: pd.Series) -> pd.Series:
+    """Tip as a percentage of the order total (0 when the total is not positive)"""
+    tips = pd.to_numeric(tips, errors='coerce').astype(float)
+    totals = pd.to_numeric(totals, errors='coerce').astype(float)
+    return pd.Series(np.where(totals > 0, tips / totals.where(totals > 0) * 100, 0.0), index=tips.index)
+
+
+def to_records(frame: pd.DataFrame, columns: Dict[str, str]) -> List[Dict]:
+    """Outlier rows as dicts, renaming frame columns ({frame column: output key})"""
+    return frame[list(columns)].rename(columns=columns).to_dict('records')
@@ -0,0 +1,179 @@
+"""
+Daily Clover sales rollup, maintained when orders are saved.
+
+One row per (date, platform) with the day's sales, tips, mods, order discounts
+and item discounts, plus one row per (date, platform, SKU) with item sales,
+quantity, mods and item discounts. The sales analyzers read their weekday
+baselines from this small table instead of aggregating raw orders, items and
+modifications on every analysis.
+
+Updates are incremental: the contribution of every order is kept in a side
+table, so re-saving an order (Clover upserts) replaces its old contribution
+instead of counting it twice.
+"""
+
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import logging
+
+from shared.table_store import get_table_store
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'clover_daily_rollup'
+CONTRIBUTIONS_TABLE = 'clover_daily_rollup_orders'
+
+PLATFORM_METRICS = ('orders', 'quantity', 'total_sales', 'total_tips', 'total_mods',
+                    'order_discounts', 'item_discounts')
+SKU_METRICS = ('quantity', 'total_sales', 'total_mods', 'item_discounts')
+# Daily totals the sales analyzers compare against their weekday baselines
+SUMMARY_METRICS = ('total_sales', 'total_tips', 'total_mods', 'order_discounts', 'item_discounts')
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _day(created_time: Any) -> Tuple[str, int]:
+    if isinstance(created_time, datetime):
+        day = created_time.date()
+    else:
+        day = datetime.fromisoformat(str(created_time).replace('T', ' ')[:19]).date()
+    return day.isoformat(), day.weekday()
+
+
+def rollup_days(start: datetime, end: datetime) -> Tuple[date, date]:
+    """
+    First and last rollup date covered by `created_time BETWEEN start AND end`.
+    A range ending at midnight only reaches the first instant of that day, so the day is left out.
+    """
+    last = end.date()
+    if end.time() == time.min:
+        last -= timedelta(days=1)
+    return start.date(), last
+
+
+def order_contributions(orders: Iterable[Dict[str, Any]], items: Iterable[Dict[str, Any]],
+                        modifications: Iterable[Dict[str, Any]],
+                        payments: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Rollup lines of each order: {order_id: {rollup_key: row}}.
+    Rows are column dicts of clover_orders, clover_orders_items,
+    clover_orders_items_modifications and clover_orders_payments.
+    """
+    items_by_order: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        items_by_order.setdefault(item.get('order_id'), []).append(item)
+    # Like the JSON tables, the last modification per item and payment per order wins
+    mods_by_item = {mod.get('item_id'): _number(mod.get('price')) for mod in modifications}
+    tips_by_order = {payment.get('order_id'): _number(payment.get('tip_amount')) for payment in payments}
+
+    contributions = {}
+    for order in orders:
+        order_id = order.get('order_id')
+        if not order_id or not order.get('created_time'):
+            continue
+        day, weekday = _day(order['created_time'])
+        platform = order.get('delivery_platform') or ''
+        lines: Dict[str, Dict[str, Any]] = {}
+
+        def line(level: str, sku: str, metrics: Tuple[str, ...]) -> Dict[str, Any]:
+            key = f"{level}|{day}|{platform}|{sku}"
+            if key not in lines:
+                lines[key] = {'rollup_key': key, 'level': level, 'date': day, 'weekday': weekday,
+                              'platform': platform, 'item_sku': sku, **{m: 0.0 for m in metrics}}
+            return lines[key]
+
+        totals = line('platform', '', PLATFORM_METRICS)
+        totals['orders'] = 1
+        totals['total_sales'] = _number(order.get('total'))
+        totals['total_tips'] = tips_by_order.get(order_id, 0.0)
+        totals['order_discounts'] = _number(order.get('order_level_discount_amount'))
+        for item in items_by_order.get(order_id, []):
+            mods = mods_by_item.get(item.get('item_id'), 0.0)
+            item_discount = _number(item.get('item_level_discount_amount'))
+            totals['quantity'] += 1
+            totals['total_mods'] += mods
+            totals['item_discounts'] += item_discount
+
+            sku = line('sku', item.get('item_sku') or '', SKU_METRICS)
+            sku['quantity'] += 1
+            sku['total_sales'] += _number(item.get('final_price'))
+            sku['total_mods'] += mods
+            sku['item_discounts'] += item_discount
+        contributions[order_id] = lines
+    return contributions
+
+
+class DailyRollup:
+    """Rollup rows and per-order contributions, both kept in JSON table stores"""
+
+    def __init__(self, table_file: Callable[[str], Path]):
+        self._table_file = table_file
+        self.rollup = get_table_store(table_file(ROLLUP_TABLE))
+        self.contributions = get_table_store(table_file(CONTRIBUTIONS_TABLE))
+
+    def is_built(self) -> bool:
+        """False until the first update or rebuild has written the contributions table"""
+        return any(part is not None for part in self.contributions.signature())
+
+    def ensure_built(self) -> bool:
+        """Build the rollup from the saved orders if it has never been built. Returns True if it was."""
+        if self.is_built() or not get_table_store(self._table_file('clover_orders')).rows():
+            return False
+        self.rebuild()
+        return True
+
+    def apply(self, contributions: Dict[str, Dict[str, Dict[str, Any]]]) -> int:
+        """Replace the contributions of these orders and update the affected rollup rows."""
+        if not contributions:
+            return 0
+        previous = self.contributions.get_many('order_id', contributions)
+        deltas: Dict[str, Dict[str, Any]] = {}
+        for order_id, lines in contributions.items():
+            for sign, order_lines in ((-1, previous.get(order_id, {}).get('lines', {})), (1, lines)):
+                for key, row in order_lines.items():
+                    delta = deltas.setdefault(key, {**row, **{m: 0.0 for m in self._metrics(row)}})
+                    for metric in self._metrics(row):
+                        delta[metric] += sign * row[metric]
+
+        current = self.rollup.get_many('rollup_key', deltas)
+        updated = []
+        for key, delta in deltas.items():
+            row = current.get(key) or {**delta, **{m: 0.0 for m in self._metrics(delta)}}
+            for metric in self._metrics(delta):
+                row[metric] = round(row.get(metric, 0.0) + delta[metric], 6)
+            updated.append(row)
+        self.rollup.upsert_many(updated, 'rollup_key')
+        self.contributions.upsert_many(
+            [{'order_id': order_id, 'lines': lines} for order_id, lines in contributions.items()], 'order_id'
+        )
+        return len(updated)
+
+    def rebuild(self) -> int:
+        """Recompute the whole rollup from the raw Clover tables."""
+        contributions = order_contributions(*(
+            get_table_store(self._table_file(table)).rows()
+            for table in ('clover_orders', 'clover_orders_items', 'clover_orders_items_modifications',
+                          'clover_orders_payments')
+        ))
+        rows: Dict[str, Dict[str, Any]] = {}
+        for lines in contributions.values():
+            for key, line in lines.items():
+                row = rows.setdefault(key, {**line, **{m: 0.0 for m in self._metrics(line)}})
+                for metric in self._metrics(line):
+                    row[metric] = round(row[metric] + line[metric], 6)
+        self.rollup.replace_all(list(rows.values()))
+        self.contributions.replace_all(
+            [{'order_id': order_id, 'lines': lines} for order_id, lines in contributions.items()]
+        )
+        logger.info(f"Daily rollup rebuilt from {len(contributions)} orders ({len(rows)} rows)")
+        return len(rows)
+
+    @staticmethod
+    def _metrics(row: Dict[str, Any]) -> Tuple[str, ...]:
+        return PLATFORM_METRICS if row['level'] == 'platform' else SKU_METRICS
@@ -0,0 +1,209 @@
+"""
+Append-only JSON table store used by DatabaseManager.
+
+Each table keeps its usual snapshot file (e.g. data/clover/orders.json, a JSON
+list of rows) plus a sidecar log (orders.log.jsonl) with one line per written row.
+
+- Inserts/upserts update the in-memory rows and a primary-key index, then append
+  one line to the log: O(1) I/O per row instead of rewriting the whole file.
+- Loading reads the snapshot and replays the log (last write per key wins).
+- Once the log grows past the table size (min COMPACT_MIN_ENTRIES) it is folded
+  into the snapshot and truncated, so a bulk import stays linear overall.
+- Stores are shared per file path across DatabaseManager instances, and reloaded
+  if another process rewrites the files.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+COMPACT_MIN_ENTRIES = 1000
+
+
+class JsonTableStore:
+    """Rows of one JSON table with primary-key indexes and an append-only log"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix('.log.jsonl')
+        self._lock = threading.RLock()
+        self._rows: List[Dict[str, Any]] = []
+        self._indexes: Dict[str, Dict[Any, int]] = {}
+        self._max_id = 0
+        self._log_entries = 0
+        self._signature: Optional[Tuple] = None
+
+    # ------------------------------------------------------------------ loading
+
+    def _file_signature(self) -> Tuple:
+        sig = []
+        for p in (self.path, self.log_path):
+            try:
+                st = p.stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _ensure_loaded(self) -> None:
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        rows = []
+        try:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    rows = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading {self.path}: {e}")
+            rows = []
+        self._set_rows(rows)
+
+        self._log_entries = 0
+        if self.log_path.exists():
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Partial last line from an interrupted write
+                        logger.warning(f"Skipping unreadable line in {self.log_path}")
+                        continue
+                    self._apply(entry.get('pk'), entry['row'])
+                    self._log_entries += 1
+        self._signature = self._file_signature()
+
+    def _set_rows(self, rows: List[Dict[str, Any]]) -> None:
+        self._rows = rows
+        self._indexes = {}
+        self._max_id = 0
+        for row in rows:
+            self._track_id(row)
+
+    def _track_id(self, row: Dict[str, Any]) -> None:
+        row_id = row.get('id')
+        if isinstance(row_id, (int, float)) and not isinstance(row_id, bool):
+            self._max_id = max(self._max_id, int(row_id))
+
+    def _index(self, column: str) -> Dict[Any, int]:
+        index = self._indexes.get(column)
+        if index is None:
+            index = {}
+            for i, row in enumerate(self._rows):
+                value = row.get(column)
+                if value:
+                    index.setdefault(value, i)
+            self._indexes[column] = index
+        return index
+
+    def _apply(self, pk: Optional[str], row: Dict[str, Any]) -> None:
+        """Replace the row with the same key (or append) and keep the indexes in sync"""
+        value = row.get(pk) if pk else None
+        position = self._index(pk).get(value) if value else None
+        if position is None:
+            position = len(self._rows)
+            self._rows.append(row)
+        else:
+            self._rows[position] = row
+        for column, index in self._indexes.items():
+            key = row.get(column)
+            if key:
+                index.setdefault(key, position)
+        self._track_id(row)
+
+    # ------------------------------------------------------------------ reads
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Copies of all rows, in insertion order"""
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(row) for row in self._rows]
+
+    def get_many(self, column: str, values: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Copies of the rows whose `column` equals one of `values`, keyed by value (index lookups)"""
+        with self._lock:
+            self._ensure_loaded()
+            index = self._index(column)
+            return {value: dict(self._rows[index[value]]) for value in values if value in index}
+
+    def signature(self) -> Tuple:
+        """(mtime_ns, size) of the snapshot and the log; changes whenever the table is written"""
+        return self._file_signature()
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._max_id + 1
+
+    # ------------------------------------------------------------------ writes
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]], pk: Optional[str], merge: bool = False) -> int:
+        """
+        Insert rows, replacing (or with merge=True updating) rows whose `pk` value
+        already exists. All rows are appended to the log in a single write.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            lines = []
+            for row in rows:
+                value = row.get(pk) if pk else None
+                position = self._index(pk).get(value) if value else None
+                if position is not None and merge:
+                    row = {**self._rows[position], **row}
+                self._apply(pk, row)
+                lines.append(json.dumps({'pk': pk, 'row': row}, ensure_ascii=False, default=str))
+            if not lines:
+                return 0
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self._log_entries += len(lines)
+            self._signature = self._file_signature()
+            if self._log_entries >= max(COMPACT_MIN_ENTRIES, len(self._rows)):
+                self.compact()
+            return len(lines)
+
+    def upsert(self, row: Dict[str, Any], pk: Optional[str], merge: bool = False) -> int:
+        return self.upsert_many([row], pk, merge)
+
+    def replace_all(self, rows: List[Dict[str, Any]]) -> None:
+        """Overwrite the table with `rows` (used by UPDATE and id backfills)"""
+        with self._lock:
+            self._set_rows(rows)
+            self._write_snapshot()
+
+    def compact(self) -> None:
+        """Fold the log into the snapshot file and truncate the log"""
+        with self._lock:
+            self._ensure_loaded()
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._rows, f, indent=2, ensure_ascii=False, default=str)
+        temp_file.replace(self.path)
+        if self.log_path.exists():
+            os.remove(self.log_path)
+        self._log_entries = 0
+        self._signature = self._file_signature()
+
+
+_stores: Dict[Path, JsonTableStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_table_store(path: Path) -> JsonTableStore:
+    """Return the process-wide store for a table file"""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = JsonTableStore(path)
+        return store
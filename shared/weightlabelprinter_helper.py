@@ -15,9 +15,12 @@ import json
 import logging
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from shared.database_manager import DatabaseManager
 
@@ -138,6 +141,81 @@ def _aggregate_print_history(entries: list) -> Tuple[Optional[float], Optional[s
     return None, None
 
 
+# Expresión SQL del lote normalizado (igual que _normalize_lot_key: mayúsculas, siempre con L).
+# Solo funciones deterministas, para poder usarla en un índice de expresión.
+def _normalized_lot_sql(lot_col: str) -> str:
+    s = f'UPPER(TRIM(CAST("{lot_col}" AS TEXT)))'
+    return f"(CASE WHEN substr({s}, 1, 1) = 'L' AND length({s}) > 1 THEN {s} ELSE 'L' || {s} END)"
+
+
+@lru_cache(maxsize=8)
+def _probe_label_printer_tables(db_path: str) -> Tuple[Dict[str, Optional[str]], ...]:
+    """
+    Inspecciona una sola vez (por proceso) las tablas del .db de WeightLabelPrinter.
+    Devuelve, en orden, las tablas con columna de lote y de cantidad y qué columna usar
+    para cada dato: lot, weight, uom, container, void, time (None si no existe).
+    """
+    def _pick(cols: List[str], candidates: List[str]) -> Optional[str]:
+        cols_lower = [c.lower() for c in cols]
+        for c in candidates:
+            if c in cols_lower:
+                return cols[cols_lower.index(c)]
+        return None
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+        tables = [r[0] for r in cur.fetchall()]
+        schemas = []
+        for table in tables:
+            try:
+                cur.execute(f'PRAGMA table_info("{table}")')
+                cols = [r[1] for r in cur.fetchall()]
+            except (sqlite3.OperationalError, sqlite3.ProgrammingError):
+                continue
+            lot_col = _pick(cols, ["lot_code", "lot", "lot_number", "lotnumber"])
+            weight_col = _pick(cols, ["weight", "quantity", "number_of_bags", "qty", "count"])
+            if not lot_col or not weight_col:
+                continue
+            schemas.append({
+                "table": table,
+                "lot": lot_col,
+                "weight": weight_col,
+                "uom": _pick(cols, ["uom", "unit"]),
+                "container": _pick(cols, ["container_type", "container"]),
+                "void": _pick(cols, ["voided_at", "is_voided", "deleted_at", "voided"]),
+                "time": _pick(cols, ["inserted_at", "created_at", "printed_at", "timestamp"]),
+            })
+        return tuple(schemas)
+    finally:
+        conn.close()
+
+
+def create_label_printer_lot_index(db_path: Optional[str] = None) -> int:
+    """
+    Crea (si no existe) un índice de expresión sobre el lote normalizado en cada tabla
+    de historial del .db, para que las búsquedas por lote no recorran toda la tabla.
+    Es opcional: escribe en la base de WeightLabelPrinter. Devuelve cuántas tablas se indexaron.
+    """
+    db_path = db_path or _get_label_printer_db_path()
+    if not db_path or not os.path.isfile(db_path):
+        return 0
+    created = 0
+    conn = sqlite3.connect(db_path)
+    try:
+        for schema in _probe_label_printer_tables(db_path):
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{schema["table"]}_lot_norm" '
+                f'ON "{schema["table"]}" ({_normalized_lot_sql(schema["lot"])})'
+            )
+            created += 1
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
 def _fetch_print_history_from_sqlite(db_path: str, lot_code: str) -> List[Dict[str, Any]]:
     """
     Lee el historial de impresión para un lote desde la base SQLite de WeightLabelPrinter / fava-touchscreen.
@@ -146,59 +224,20 @@ def _fetch_print_history_from_sqlite(db_path: str, lot_code: str) -> List[Dict[s
     if not os.path.isfile(db_path):
         return []
     try:
+        schemas = _probe_label_printer_tables(db_path)
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [r[0] for r in cur.fetchall()]
-        lot_trim = lot_code.strip()
-        lot_alt = ("L" + lot_trim) if not lot_trim.upper().startswith("L") else (lot_trim[1:] if len(lot_trim) > 1 else lot_trim)
-        for table in tables:
+        lot_key = _normalize_lot_key(lot_code)
+        for schema in schemas:
+            lot_col, weight_col = schema["lot"], schema["weight"]
+            uom_col, ct_col, void_col = schema["uom"], schema["container"], schema["void"]
             try:
-                cur.execute(f"PRAGMA table_info({table})")
-                info = cur.fetchall()
-                cols = [r[1] for r in info]
-                cols_lower = [c.lower() for c in cols]
-                lot_col = None
-                for c in ["lot_code", "lot", "lot_number", "lotnumber"]:
-                    if c in cols_lower:
-                        lot_col = cols[cols_lower.index(c)]
-                        break
-                if not lot_col:
-                    continue
-                weight_col = None
-                for c in ["weight", "quantity", "number_of_bags", "qty", "count"]:
-                    if c in cols_lower:
-                        weight_col = cols[cols_lower.index(c)]
-                        break
-                if not weight_col:
-                    continue
-                uom_col = None
-                if "uom" in cols_lower:
-                    uom_col = cols[cols_lower.index("uom")]
-                elif "unit" in cols_lower:
-                    uom_col = cols[cols_lower.index("unit")]
-                void_col = None
-                for c in ["voided_at", "is_voided", "deleted_at", "voided"]:
-                    if c in cols_lower:
-                        void_col = cols[cols_lower.index(c)]
-                        break
-                ct_col = None
-                if "container_type" in cols_lower:
-                    ct_col = cols[cols_lower.index("container_type")]
-                elif "container" in cols_lower:
-                    ct_col = cols[cols_lower.index("container")]
-                select_list = [lot_col, weight_col]
-                if uom_col:
-                    select_list.append(uom_col)
-                if ct_col:
-                    select_list.append(ct_col)
-                if void_col:
-                    select_list.append(void_col)
-                placeholders = " OR TRIM(CAST({} AS TEXT)) = ?".format(lot_col) if lot_alt != lot_trim else ""
+                select_list = [lot_col, weight_col] + [c for c in (uom_col, ct_col, void_col) if c]
                 cur.execute(
-                    f'SELECT {", ".join(select_list)} FROM "{table}" WHERE TRIM(CAST({lot_col} AS TEXT)) = ?' + placeholders,
-                    (lot_trim, lot_alt) if lot_alt != lot_trim else (lot_trim,),
+                    f'SELECT {", ".join(select_list)} FROM "{schema["table"]}" '
+                    f'WHERE {_normalized_lot_sql(lot_col)} = ?',
+                    (lot_key,),
                 )
                 rows = cur.fetchall()
                 entries = []
@@ -277,56 +316,100 @@ def _get_label_printer_mysql_config() -> Optional[Dict[str, Any]]:
     return None
 
 
-def _fetch_print_history_from_mysql(lot_code: str) -> List[Dict[str, Any]]:
+# Consulta fija por lote: el texto no cambia entre escaneos, sólo los parámetros
+_LOT_HISTORY_SQL = """
+    SELECT lot_code, weight, uom, container_type, voided_at
+    FROM erp_lot_label_print
+    WHERE lot_code IN ({placeholders})
+      AND (voided_at IS NULL OR voided_at = 0 OR voided_at = '')
+    ORDER BY inserted_at DESC
+"""
+
+# Lotes por consulta IN (...) en get_label_printer_quantities
+MYSQL_LOTS_PER_QUERY = 500
+
+
+def _lot_code_variants(lot_code: str) -> Tuple[str, str]:
+    """(lote tal cual, lote con/sin prefijo L): L32570 ↔ 32570."""
+    lot_trim = lot_code.strip()
+    lot_alt = ("L" + lot_trim) if not lot_trim.upper().startswith("L") else (lot_trim[1:] if len(lot_trim) > 1 else lot_trim)
+    return lot_trim, lot_alt
+
+
+@contextmanager
+def _label_printer_mysql_connection():
     """
-    Lee el historial de impresión desde MySQL (tabla erp_lot_label_print).
-    Es la misma tabla que usa Weight Label Printer / fava-touchscreen.
+    Conexión del pool compartido (shared.mysql_backend) a la base de erp_lot_label_print.
+    Devuelve None si MySQL no está configurado o PyMySQL no está instalado.
     """
     cfg = _get_label_printer_mysql_config()
     if not cfg:
-        return []
-    try:
-        import pymysql
-    except ImportError:
+        yield None
+        return
+    from shared.mysql_backend import get_pool
+    pool = get_pool(cfg)
+    if pool is None:
         logger.debug("pymysql not installed; cannot read label printer from MySQL")
-        return []
-    lot_trim = lot_code.strip()
-    lot_alt = ("L" + lot_trim) if not lot_trim.upper().startswith("L") else (lot_trim[1:] if len(lot_trim) > 1 else lot_trim)
-    entries = []
+        yield None
+        return
+    with pool.connection() as conn:
+        yield conn
+
+
+def _fetch_print_histories_from_mysql(lot_codes: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    Lee el historial de impresión de varios lotes desde MySQL (tabla erp_lot_label_print)
+    con una consulta IN (...) por cada MYSQL_LOTS_PER_QUERY lotes.
+
+    Returns:
+        Dict lote normalizado (_normalize_lot_key) → filas (más recientes primero),
+        o None si MySQL no está disponible o la consulta falla.
+    """
+    params = list(dict.fromkeys(v for code in lot_codes for v in _lot_code_variants(code)))
+    if not params:
+        return {}
+    histories: Dict[str, List[Dict[str, Any]]] = {}
     try:
-        conn = pymysql.connect(
-            host=cfg["host"],
-            port=cfg["port"],
-            user=cfg["user"],
-            password=cfg["password"],
-            database=cfg["database"],
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor,
-        )
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT lot_code, weight, uom, container_type, voided_at
-                FROM erp_lot_label_print
-                WHERE (lot_code = %s OR lot_code = %s)
-                  AND (voided_at IS NULL OR voided_at = 0 OR voided_at = '')
-                ORDER BY inserted_at DESC
-                """,
-                (lot_trim, lot_alt),
-            )
-            rows = cur.fetchall()
-        conn.close()
-        for r in rows:
-            entry = {"lot": lot_code, "weight": r.get("weight"), "uom": r.get("uom") or ""}
-            if r.get("container_type"):
-                entry["container_type"] = r.get("container_type")
-            entry["voided_at"] = r.get("voided_at")
-            entries.append(entry)
+        with _label_printer_mysql_connection() as conn:
+            if conn is None:
+                return None
+            step = MYSQL_LOTS_PER_QUERY * 2
+            with conn.cursor() as cur:
+                for start in range(0, len(params), step):
+                    chunk = params[start:start + step]
+                    cur.execute(_LOT_HISTORY_SQL.format(placeholders=", ".join(["%s"] * len(chunk))), chunk)
+                    for r in cur.fetchall():
+                        histories.setdefault(_normalize_lot_key(r.get("lot_code") or ""), []).append(r)
+            # No dejar un snapshot de lectura abierto en la conexión del pool
+            conn.commit()
     except Exception as e:
-        logger.debug("Could not read label printer from MySQL %s: %s", cfg.get("database"), e)
+        logger.debug("Could not read label printer from MySQL: %s", e)
+        return None
+    return histories
+
+
+def _mysql_rows_to_entries(lot_code: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    entries = []
+    for r in rows:
+        entry = {"lot": lot_code, "weight": r.get("weight"), "uom": r.get("uom") or ""}
+        if r.get("container_type"):
+            entry["container_type"] = r.get("container_type")
+        entry["voided_at"] = r.get("voided_at")
+        entries.append(entry)
     return entries
 
 
+def _fetch_print_history_from_mysql(lot_code: str) -> List[Dict[str, Any]]:
+    """
+    Lee el historial de impresión desde MySQL (tabla erp_lot_label_print).
+    Es la misma tabla que usa Weight Label Printer / fava-touchscreen.
+    """
+    histories = _fetch_print_histories_from_mysql([lot_code])
+    if not histories:
+        return []
+    return _mysql_rows_to_entries(lot_code, histories.get(_normalize_lot_key(lot_code), []))
+
+
 def _normalize_lot_key(entry_lot: str) -> str:
     """Lote normalizado para agrupar (siempre con L si es numérico)."""
     s = (entry_lot or "").strip()
@@ -337,43 +420,116 @@ def _normalize_lot_key(entry_lot: str) -> str:
     return "L" + s.upper()
 
 
+class _HistoryFile:
+    """Entradas de un JSON de historial ya parseadas, con índice por lote normalizado."""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = entries
+        self.by_lot: Dict[str, List[Dict[str, Any]]] = {}
+        for e in entries:
+            if not isinstance(e, dict):
+                continue
+            lot = _normalize_lot_key(e.get("lot") or e.get("lot_code") or "")
+            if lot:
+                self.by_lot.setdefault(lot, []).append(e)
+
+
+_history_files: Dict[str, Tuple[Tuple[int, int], _HistoryFile]] = {}
+_history_files_lock = threading.Lock()
+
+
+def _load_history_file(filepath: str) -> Optional[_HistoryFile]:
+    """
+    Devuelve el historial JSON parseado e indexado por lote. Se parsea una sola vez y
+    se sirve desde memoria hasta que cambie el archivo (mtime o tamaño).
+    None si el archivo no existe o no es una lista.
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _history_files_lock:
+        cached = _history_files.get(filepath)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        history = _HistoryFile(data) if isinstance(data, list) else None
+        if history is None:
+            _history_files.pop(filepath, None)
+            return None
+        _history_files[filepath] = (signature, history)
+        return history
+
+
+def _default_history_json_path() -> str:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "production", "label_printer_history.json")
+
+
+def _read_json_history(filepath: str, lot_code: str) -> Tuple[Optional[float], Optional[str]]:
+    """Lee JSON de historial y devuelve (quantity, uom) para lot_code (acepta L32570 y 32570)."""
+    try:
+        history = _load_history_file(filepath)
+        if history is None:
+            return None, None
+        entries = list(history.by_lot.get(_normalize_lot_key(lot_code), []))
+        if not entries:
+            return None, None
+        # Total Weight (weight+uom) o Total Entries (container_type + total_entries_count)
+        if any("weight" in e for e in entries) or any(e.get("container_type") for e in entries):
+            return _aggregate_print_history(entries)
+        def _ts(e):
+            t = e.get("timestamp") or e.get("printed_at") or e.get("date") or ""
+            return (t or "")
+        entries.sort(key=_ts, reverse=True)
+        last = entries[0]
+        q = last.get("quantity") or last.get("actual_qty") or last.get("qty")
+        if q is not None:
+            try:
+                q = float(q)
+            except (TypeError, ValueError):
+                return None, None
+        u = (last.get("uom") or last.get("unit") or "").strip() or None
+        return q, u
+    except Exception as e:
+        logger.debug("Could not read label printer history file %s: %s", filepath, e)
+        return None, None
+
+
 def _get_label_printer_summary_from_json(since_date: str) -> List[Dict[str, Any]]:
     """
     Resumen por lote desde data/production/label_printer_history.json (fallback si MySQL vacío).
     Filtra por fecha si las entradas tienen timestamp/printed_at/inserted_at.
     """
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        default_json = os.path.join(project_root, "data", "production", "label_printer_history.json")
-        if not os.path.isfile(default_json):
-            return []
-        with open(default_json, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
+        history = _load_history_file(_default_history_json_path())
+        if history is None:
             return []
         since_d = datetime.strptime(since_date, "%Y-%m-%d").date()
-        by_lot: Dict[str, List[Dict[str, Any]]] = {}
-        for e in data:
+
+        def _in_range(e: Dict[str, Any]) -> bool:
             if e.get("voided_at"):
-                continue
-            lot_raw = e.get("lot") or e.get("lot_code") or ""
-            lot = _normalize_lot_key(lot_raw)
-            if not lot:
-                continue
+                return False
             ts = e.get("timestamp") or e.get("printed_at") or e.get("inserted_at") or e.get("date")
             if ts:
                 try:
                     if isinstance(ts, str) and len(ts) >= 10:
                         t_date = datetime.fromisoformat(ts.replace("Z", "+00:00")).date()
                     else:
-                        continue
+                        return False
                 except Exception:
                     t_date = None
                 if t_date is not None and t_date < since_d:
-                    continue
-            by_lot.setdefault(lot, []).append(e)
+                    return False
+            return True
+
         result = []
-        for lot, entries in by_lot.items():
+        for lot, lot_entries in history.by_lot.items():
+            entries = [e for e in lot_entries if _in_range(e)]
+            if not entries:
+                continue
             qty, uom = _aggregate_print_history(entries)
             if qty is None or qty <= 0:
                 continue
@@ -409,69 +565,114 @@ def _get_label_printer_summary_from_json(since_date: str) -> List[Dict[str, Any]
 def _get_label_printer_summary_from_sqlite(since_date: str) -> List[Dict[str, Any]]:
     """
     Resumen por lote desde el .db de WeightLabelPrinter (fallback).
-    Obtiene todos los lotes únicos y agrega por lote.
+    Una sola consulta GROUP BY sobre el lote normalizado (filtrada por fecha si la
+    tabla tiene columna de tiempo), con la misma agregación que _aggregate_print_history:
+    - Lote con alguna entrada sin container_type → suma de weight, uom de la primera de ellas.
+    - Solo entradas con container_type → número de entradas, container_type de la primera.
     """
     db_path = _get_label_printer_db_path()
     if not db_path or not os.path.isfile(db_path):
         return []
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [r[0] for r in cur.fetchall()]
-        lot_col = None
-        for table in tables:
-            try:
-                cur.execute(f"PRAGMA table_info({table})")
-                cols = [r[1] for r in cur.fetchall()]
-                cols_lower = [c.lower() for c in cols]
-                for c in ["lot_code", "lot", "lot_number"]:
-                    if c in cols_lower:
-                        lot_col = cols[cols_lower.index(c)]
-                        break
-                if not lot_col:
-                    continue
-                time_col = None
-                for tc in ["inserted_at", "created_at", "printed_at", "timestamp"]:
-                    if tc in cols_lower:
-                        time_col = cols[cols_lower.index(tc)]
-                        break
-                cur.execute(f'SELECT DISTINCT TRIM(CAST("{lot_col}" AS TEXT)) FROM "{table}"')
-                lots = [r[0] for r in cur.fetchall() if r and r[0]]
-            except (sqlite3.OperationalError, sqlite3.ProgrammingError):
-                continue
-            break
-        conn.close()
-        if not lot_col or not lots:
+        schemas = _probe_label_printer_tables(db_path)
+        if not schemas:
             return []
+        schema = schemas[0]
+        ct = f'TRIM(COALESCE(CAST("{schema["container"]}" AS TEXT), \'\'))' if schema["container"] else "''"
+        uom = f'"{schema["uom"]}"' if schema["uom"] else "''"
+        ts = f'"{schema["time"]}"' if schema["time"] else "NULL"
+        where = [f"{_normalized_lot_sql(schema['lot'])} != 'L'"]
+        params: Tuple = ()
+        if schema["void"]:
+            # _aggregate_print_history descarta toda entrada con voided_at distinto de None
+            where.append(f'"{schema["void"]}" IS NULL')
+        if schema["time"] and since_date:
+            # Fechas en texto ISO o en segundos Unix; entradas sin fecha no se filtran (como en JSON)
+            where.append(
+                f"({ts} IS NULL OR CASE WHEN typeof({ts}) IN ('integer', 'real') "
+                f"THEN {ts} >= CAST(strftime('%s', ?) AS INTEGER) ELSE {ts} >= ? END)"
+            )
+            params = (since_date, since_date)
+        query = f"""
+            WITH entries AS (
+                SELECT
+                    {_normalized_lot_sql(schema['lot'])} AS lot_key,
+                    CAST(COALESCE("{schema['weight']}", 0) AS REAL) AS weight,
+                    {uom} AS uom,
+                    {ct} AS container_type,
+                    {ts} AS ts,
+                    rowid AS rid
+                FROM "{schema['table']}"
+                WHERE {' AND '.join(where)}
+            ),
+            ranked AS (
+                SELECT *,
+                    FIRST_VALUE(container_type) OVER (PARTITION BY lot_key ORDER BY rid) AS first_container,
+                    FIRST_VALUE(uom) OVER (PARTITION BY lot_key, container_type = '' ORDER BY rid) AS first_uom
+                FROM entries
+            )
+            SELECT
+                lot_key,
+                SUM(CASE WHEN container_type = '' THEN weight ELSE 0 END) AS total_weight,
+                SUM(CASE WHEN container_type = '' THEN 1 ELSE 0 END) AS plain_count,
+                COUNT(*) AS entries_count,
+                MAX(first_container) AS first_container,
+                MAX(CASE WHEN container_type = '' THEN first_uom END) AS plain_uom,
+                MIN(ts) AS first_at,
+                MAX(ts) AS last_at
+            FROM ranked
+            GROUP BY lot_key
+            ORDER BY lot_key
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
         result = []
-        for lot_raw in lots:
-            lot = _normalize_lot_key(lot_raw)
-            if not lot:
-                continue
-            entries = _fetch_print_history_from_sqlite(db_path, lot_raw)
-            if not entries:
-                continue
-            qty, uom = _aggregate_print_history(entries)
+        for lot, total_weight, plain_count, entries_count, first_container, plain_uom, first_at, last_at in rows:
+            if plain_count:
+                qty = total_weight or None
+                uom = (str(plain_uom or "")).strip() or None
+            else:
+                qty = float(entries_count)
+                uom = first_container or None
             if qty is None or qty <= 0:
                 continue
-            has_container = bool(entries and entries[0].get("container_type"))
+            has_container = bool(first_container)
             result.append({
                 "lot_code": lot,
                 "total_entries": int(qty) if has_container else 0,
                 "total_weight": float(qty) if not has_container else 0.0,
                 "quantity": float(qty),
                 "uom": uom,
-                "first_at": None,
-                "last_at": None,
+                "first_at": first_at,
+                "last_at": last_at,
             })
-        result.sort(key=lambda x: x["lot_code"])
         return result
     except Exception as e:
         logger.debug("Could not read label printer summary from SQLite: %s", e)
         return []
 
 
+_SUMMARY_SINCE_SQL = """
+    SELECT
+        lot_code,
+        SUM(CASE WHEN (container_type IS NOT NULL AND TRIM(COALESCE(container_type,'')) != '') THEN 1 ELSE 0 END) AS entries_count,
+        SUM(CASE WHEN (container_type IS NULL OR TRIM(COALESCE(container_type,'')) = '') AND weight IS NOT NULL THEN COALESCE(weight, 0) ELSE 0 END) AS total_weight,
+        MIN(inserted_at) AS first_at,
+        MAX(inserted_at) AS last_at,
+        MAX(COALESCE(container_type, uom)) AS uom_pref,
+        MAX(uom) AS uom_fall
+    FROM erp_lot_label_print
+    WHERE (voided_at IS NULL OR voided_at = 0 OR voided_at = '')
+      AND inserted_at >= %s
+    GROUP BY lot_code
+    HAVING entries_count > 0 OR total_weight > 0
+    ORDER BY last_at DESC
+"""
+
+
 def get_label_printer_summary_since(since_date: str) -> List[Dict[str, Any]]:
     """
     Devuelve un resumen por lote desde una fecha.
@@ -484,60 +685,33 @@ def get_label_printer_summary_since(since_date: str) -> List[Dict[str, Any]]:
         Lista de dicts con: lot_code, total_entries, total_weight, quantity, uom, first_at, last_at.
     """
     # 1) MySQL (tabla erp_lot_label_print)
-    cfg = _get_label_printer_mysql_config()
-    if cfg:
-        try:
-            import pymysql
-            conn = pymysql.connect(
-                host=cfg["host"],
-                port=cfg["port"],
-                user=cfg["user"],
-                password=cfg["password"],
-                database=cfg["database"],
-                charset="utf8mb4",
-                cursorclass=pymysql.cursors.DictCursor,
-            )
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT
-                        lot_code,
-                        SUM(CASE WHEN (container_type IS NOT NULL AND TRIM(COALESCE(container_type,'')) != '') THEN 1 ELSE 0 END) AS entries_count,
-                        SUM(CASE WHEN (container_type IS NULL OR TRIM(COALESCE(container_type,'')) = '') AND weight IS NOT NULL THEN COALESCE(weight, 0) ELSE 0 END) AS total_weight,
-                        MIN(inserted_at) AS first_at,
-                        MAX(inserted_at) AS last_at,
-                        MAX(COALESCE(container_type, uom)) AS uom_pref,
-                        MAX(uom) AS uom_fall
-                    FROM erp_lot_label_print
-                    WHERE (voided_at IS NULL OR voided_at = 0 OR voided_at = '')
-                      AND inserted_at >= %s
-                    GROUP BY lot_code
-                    HAVING entries_count > 0 OR total_weight > 0
-                    ORDER BY last_at DESC
-                    """,
-                    (since_date,),
-                )
-                rows = cur.fetchall()
-            conn.close()
-            if rows:
-                result = []
-                for r in rows:
-                    entries_count = int(r.get("entries_count") or 0)
-                    total_weight = float(r.get("total_weight") or 0)
-                    quantity = entries_count if entries_count > 0 else total_weight
-                    uom = (r.get("uom_pref") or r.get("uom_fall") or "").strip() or None
-                    result.append({
-                        "lot_code": (r.get("lot_code") or "").strip(),
-                        "total_entries": entries_count,
-                        "total_weight": total_weight,
-                        "quantity": quantity,
-                        "uom": uom,
-                        "first_at": r.get("first_at"),
-                        "last_at": r.get("last_at"),
-                    })
-                return result
-        except Exception as e:
-            logger.debug("MySQL label printer summary failed: %s", e)
+    try:
+        with _label_printer_mysql_connection() as conn:
+            rows = None
+            if conn is not None:
+                with conn.cursor() as cur:
+                    cur.execute(_SUMMARY_SINCE_SQL, (since_date,))
+                    rows = cur.fetchall()
+                conn.commit()
+        if rows:
+            result = []
+            for r in rows:
+                entries_count = int(r.get("entries_count") or 0)
+                total_weight = float(r.get("total_weight") or 0)
+                quantity = entries_count if entries_count > 0 else total_weight
+                uom = (r.get("uom_pref") or r.get("uom_fall") or "").strip() or None
+                result.append({
+                    "lot_code": (r.get("lot_code") or "").strip(),
+                    "total_entries": entries_count,
+                    "total_weight": total_weight,
+                    "quantity": quantity,
+                    "uom": uom,
+                    "first_at": r.get("first_at"),
+                    "last_at": r.get("last_at"),
+                })
+            return result
+    except Exception as e:
+        logger.debug("MySQL label printer summary failed: %s", e)
 
     # 2) JSON por defecto
     json_result = _get_label_printer_summary_from_json(since_date)
@@ -570,75 +744,52 @@ def get_label_printer_quantity(lot_code: str) -> Tuple[Optional[float], Optional
     if not lot_code or not str(lot_code).strip():
         return None, None
     lot_code = lot_code.strip()
+    return get_label_printer_quantities([lot_code]).get(lot_code, (None, None))
 
-    def _lot_matches(entry_lot: str, lot_code: str) -> bool:
-        """True si el lote de la entrada coincide con lot_code (acepta L32570 y 32570)."""
-        if not entry_lot or not lot_code:
-            return False
-        entry = (entry_lot or "").strip().upper()
-        code = (lot_code or "").strip().upper()
-        if entry == code:
-            return True
-        if code.startswith("L") and len(code) > 1 and entry == code[1:]:
-            return True
-        if not code.startswith("L") and entry == "L" + code:
-            return True
-        return False
 
-    def _read_json_history(filepath: str) -> Tuple[Optional[float], Optional[str]]:
-        """Lee JSON de historial y devuelve (quantity, uom) para lot_code (acepta L32570 y 32570)."""
-        if not os.path.isfile(filepath):
-            return None, None
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, list):
-                return None, None
-            entries = [
-                e for e in data
-                if _lot_matches((e.get("lot") or e.get("lot_code") or ""), lot_code)
-            ]
-            if not entries:
-                return None, None
-            # Total Weight (weight+uom) o Total Entries (container_type + total_entries_count)
-            if any("weight" in e for e in entries) or any(e.get("container_type") for e in entries):
-                return _aggregate_print_history(entries)
-            def _ts(e):
-                t = e.get("timestamp") or e.get("printed_at") or e.get("date") or ""
-                return (t or "")
-            entries.sort(key=_ts, reverse=True)
-            last = entries[0]
-            q = last.get("quantity") or last.get("actual_qty") or last.get("qty")
-            if q is not None:
-                try:
-                    q = float(q)
-                except (TypeError, ValueError):
-                    return None, None
-            u = (last.get("uom") or last.get("unit") or "").strip() or None
-            return q, u
-        except Exception as e:
-            logger.debug("Could not read label printer history file %s: %s", filepath, e)
-            return None, None
+def get_label_printer_quantities(lot_codes: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[str]]]:
+    """
+    Versión por lotes de get_label_printer_quantity (mismas fuentes y orden).
+    MySQL se consulta una sola vez para todos los lotes; las fuentes locales se
+    consultan sólo para los lotes que no se resolvieron antes.
+
+    Returns:
+        Dict lote (sin espacios, como se pidió) → (quantity, uom) o (None, None).
+    """
+    codes = list(dict.fromkeys(str(c).strip() for c in lot_codes if c and str(c).strip()))
+    result: Dict[str, Tuple[Optional[float], Optional[str]]] = {}
 
     # 1) JSON por defecto del proyecto (Total Weight / Total Entries por lote)
     #    data/production/label_printer_history.json — mismo formato que HistorySidebar
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        default_json = os.path.join(project_root, "data", "production", "label_printer_history.json")
+        default_json = _default_history_json_path()
         if os.path.isfile(default_json):
-            q, u = _read_json_history(default_json)
-            if q is not None:
-                return q, u
+            for code in codes:
+                q, u = _read_json_history(default_json, code)
+                if q is not None:
+                    result[code] = (q, u)
     except Exception:
         pass
 
-    # 2) MySQL: tabla erp_lot_label_print (Weight Label Printer / fava-touchscreen)
-    entries_mysql = _fetch_print_history_from_mysql(lot_code)
-    if entries_mysql:
-        q, u = _aggregate_print_history(entries_mysql)
-        if q is not None and q > 0:
-            return q, u
+    # 2) MySQL: tabla erp_lot_label_print (Weight Label Printer / fava-touchscreen), una consulta
+    pending = [code for code in codes if code not in result]
+    histories = _fetch_print_histories_from_mysql(pending) if pending else None
+    for code in pending:
+        rows = (histories or {}).get(_normalize_lot_key(code))
+        if rows:
+            q, u = _aggregate_print_history(_mysql_rows_to_entries(code, rows))
+            if q is not None and q > 0:
+                result[code] = (q, u)
+
+    # 3-5) Fuentes locales, lote a lote
+    for code in codes:
+        if code not in result:
+            result[code] = _get_label_printer_quantity_local(code)
+    return result
+
 
+def _get_label_printer_quantity_local(lot_code: str) -> Tuple[Optional[float], Optional[str]]:
+    """Fuentes locales de get_label_printer_quantity (SQLite, JSON de historial, records.json)."""
     # 3) Archivo .db SQLite (si existiera en fava-touchscreen/dist o data/production)
     db_path = _get_label_printer_db_path()
     if db_path and os.path.isfile(db_path):
@@ -651,7 +802,7 @@ def get_label_printer_quantity(lot_code: str) -> Tuple[Optional[float], Optional
     # 4) Archivo JSON de historial (secrets: weightlabelprinter_history_path o env)
     history_path = _get_label_printer_history_path()
     if history_path and os.path.isfile(history_path):
-        q, u = _read_json_history(history_path)
+        q, u = _read_json_history(history_path, lot_code)
         if q is not None:
             return q, u
 
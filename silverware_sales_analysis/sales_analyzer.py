@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 import pandas as pd
 from silverware_sales_analysis.repository import SalesRepository
+from shared.sales_outliers import period_totals, same_weekday_masks, to_records, tip_percentage, zscore_outliers
 
 class SalesAnalyzer:
     def __init__(self):
@@ -41,185 +42,67 @@ class SalesAnalyzer:
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        analysis_df = df[df['start_date'].dt.date == analysis_date.date()]
-        historical_df = df[
-            (df['start_date'].dt.date < analysis_date.date()) &
-            (df['weekday'] == weekday)
-        ]
-
-        if historical_df.empty or analysis_df.empty:
-            return []
-
-        mean_total = historical_df['total'].mean()
-        std_total = historical_df['total'].std()
-
-        if std_total == 0:
-            return []
-
-        outliers = []
-        for _, row in analysis_df.iterrows():
-            total = row['total']
-            z_score = (total - mean_total) / std_total
-            if abs(z_score) > self.z_score_threshold:
-                outliers.append({
-                    'order_id': row['check_number'],
-                    'total': total,
-                    'z_score': z_score,
-                    'historical_mean': mean_total,
-                    'deviation_percentage': ((total - mean_total) / mean_total) * 100
-                })
-
-        return outliers
+        current, baseline = same_weekday_masks(df['start_date'].dt.date, df['weekday'], analysis_date.date())
+        outliers = zscore_outliers(df, 'total', current, baseline, self.z_score_threshold)
+        return to_records(outliers, {
+            'check_number': 'order_id',
+            'total': 'total',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+        })
+
+    def _daily_group_outliers(self, df: pd.DataFrame, analysis_date: datetime, key: str,
+                              first_cols=()) -> pd.DataFrame:
+        """Daily sales per `key` value compared with the same weekday in the lookback window"""
+        daily = period_totals(df.assign(date=df['start_date'].dt.date), [key], ['date', 'weekday'],
+                              'price', first_cols)
+        current, baseline = same_weekday_masks(daily['date'], daily['weekday'], analysis_date.date())
+        return zscore_outliers(daily, 'total_sales', current, baseline, self.z_score_threshold, keys=[key])
 
     def detect_item_outliers(self, df: pd.DataFrame, analysis_date: datetime):
         """Detect items with unusual sales patterns"""
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        df['date'] = df['start_date'].dt.date
-        df['price'] = df['price'].astype(float)
-
-        outliers = []
-
-        for item_sku in df['item_sku'].unique():
-            item_df = df[df['item_sku'] == item_sku]
-
-            # Get item name once for this SKU
-            item_name = item_df['item_name'].iloc[0] if not item_df.empty else item_sku
-
-            historical = item_df[
-                (item_df['date'] < analysis_date.date()) &
-                (item_df['weekday'] == weekday)
-                ]
-
-            current = item_df[item_df['date'] == analysis_date.date()]
-
-            if historical.empty or current.empty:
-                continue
-
-            # Calculate daily totals
-            historical_daily = historical.groupby('date')['price'].sum()
-            current_daily = current.groupby('date')['price'].sum()
-
-            sales_mean = historical_daily.mean()
-            sales_std = historical_daily.std()
-
-            if sales_std == 0:
-                continue
-
-            current_total = current_daily.iloc[0] if not current_daily.empty else 0
-            z_score = (current_total - sales_mean) / sales_std
-
-            if abs(z_score) > self.z_score_threshold:
-                outliers.append({
-                    'item_sku': item_sku,
-                    'item_name': item_name,  # Include item name
-                    'total_sales': current_total,  # Use total sales instead of individual price
-                    'z_score': z_score,
-                    'historical_mean': sales_mean,
-                    'deviation_percentage': ((current_total - sales_mean) / sales_mean) * 100
-                })
-
-        return outliers
+        outliers = self._daily_group_outliers(df, analysis_date, 'item_sku', ('item_name',))
+        return to_records(outliers, {
+            'item_sku': 'item_sku',
+            'item_name': 'item_name',
+            'total_sales': 'total_sales',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def detect_category_outliers(self, df: pd.DataFrame, analysis_date: datetime):
         """Detect categories with unusual sales patterns"""
         if df.empty:
             return []
 
-        weekday = analysis_date.weekday()
-
-        df['date'] = df['start_date'].dt.date
-        df['price'] = df['price'].astype(float)
-
-        outliers = []
-
-        for category in df['category_name'].unique():
-            if pd.isna(category):  # Skip if category is None/NaN
-                continue
-
-            category_df = df[df['category_name'] == category]
-
-            historical = category_df[
-                (category_df['date'] < analysis_date.date()) &
-                (category_df['weekday'] == weekday)
-                ]
-
-            current = category_df[category_df['date'] == analysis_date.date()]
-
-            if historical.empty or current.empty:
-                continue
-
-            # Calculate daily totals
-            historical_daily = historical.groupby('date')['price'].sum()
-            current_daily = current.groupby('date')['price'].sum()
-
-            sales_mean = historical_daily.mean()
-            sales_std = historical_daily.std()
-
-            if sales_std == 0:
-                continue
-
-            current_total = current_daily.iloc[0] if not current_daily.empty else 0
-            z_score = (current_total - sales_mean) / sales_std
-
-            if abs(z_score) > self.z_score_threshold:
-                outliers.append({
-                    'category_name': category,
-                    'total_sales': current_total,  # Use total sales instead of individual price
-                    'z_score': z_score,
-                    'historical_mean': sales_mean,
-                    'deviation_percentage': ((current_total - sales_mean) / sales_mean) * 100
-                })
-
-        return outliers
+        outliers = self._daily_group_outliers(df, analysis_date, 'category_name')
+        return to_records(outliers, {
+            'category_name': 'category_name',
+            'total_sales': 'total_sales',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+        })
 
     def detect_tip_outliers(self, df: pd.DataFrame, analysis_date: datetime):
         """Detect orders with unusual tip amounts"""
         if df.empty:
             return []
 
-        df['tip_percentage'] = df.apply(
-            lambda row: (row['tip_amount'] / row['total']) * 100 if row['total'] > 0 else 0,
-            axis=1
-        )
-
-        weekday = analysis_date.weekday()
-
-        historical = df[
-            (df['start_date'].dt.date < analysis_date.date()) &
-            (df['weekday'] == weekday) &
-            (df['tip_amount'] > 0)
-        ]
-
-        current = df[
-            (df['start_date'].dt.date == analysis_date.date()) &
-            (df['tip_amount'] > 0)
-        ]
-
-        if historical.empty or current.empty:
-            return []
-
-        mean_tip = historical['tip_amount'].mean()
-        std_tip = historical['tip_amount'].std()
-
-        if std_tip == 0:
-            return []
-
-        outliers = []
-        for _, row in current.iterrows():
-            z_score = (row['tip_amount'] - mean_tip) / std_tip
-            if abs(z_score) > self.z_score_threshold:
-                outliers.append({
-                    'order_id': row['check_number'],
-                    'tip_amount': row['tip_amount'],
-                    'z_score': z_score,
-                    'historical_mean': mean_tip,
-                    'deviation_percentage': ((row['tip_amount'] - mean_tip) / mean_tip) * 100
-                })
-
-        return outliers
+        df['tip_percentage'] = tip_percentage(df['tip_amount'], df['total'])
+
+        current, baseline = same_weekday_masks(df['start_date'].dt.date, df['weekday'], analysis_date.date())
+        has_tip = df['tip_amount'] > 0
+        outliers = zscore_outliers(df, 'tip_amount', current & has_tip, baseline & has_tip, self.z_score_threshold)
+        return to_records(outliers, {
+            'check_number': 'order_id',
+            'tip_amount': 'tip_amount',
+            'z_score': 'z_score',
+            'historical_mean': 'historical_mean',
+            'deviation_percentage': 'deviation_percentage',
+        })
@@ -0,0 +1,79 @@
+import pytest
+from datetime import date, datetime
+from shared.analytics_store import to_sqlite
+from shared.database_manager import DatabaseManager
+from shared.table_store import get_table_store
+from clover_sales_analysis.repository import SalesRepository
+
+
+def seed(db, table, rows, pk):
+    get_table_store(db._get_table_file(table)).upsert_many(rows, pk)
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    repository = SalesRepository()
+    db = repository.db
+    # 2025-03-03 and 2025-03-10 are Mondays
+    seed(db, 'clover_orders', [
+        {'order_id': 'A', 'created_time': '2025-03-03 09:00:00', 'total': 20.0, 'delivery_method': 'Pickup',
+         'delivery_platform': 'In-Store', 'order_level_discount_amount': 1.0},
+        {'order_id': 'B', 'created_time': '2025-03-03 18:30:00', 'total': 10.0, 'delivery_method': 'Delivery',
+         'delivery_platform': 'Doordash', 'order_level_discount_amount': 0.0},
+        {'order_id': 'C', 'created_time': '2025-03-10 12:00:00', 'total': 40.0, 'delivery_method': 'Pickup',
+         'delivery_platform': 'In-Store', 'order_level_discount_amount': 0.0},
+        {'order_id': 'OLD', 'created_time': '2024-12-01 12:00:00', 'total': 99.0},
+    ], 'order_id')
+    seed(db, 'clover_orders_items', [
+        {'item_id': 'A1', 'order_id': 'A', 'clover_name': 'Taco', 'final_price': 8.0, 'item_level_discount_amount': 0.5},
+        {'item_id': 'A2', 'order_id': 'A', 'clover_name': 'Taco', 'final_price': 8.0, 'item_level_discount_amount': 0},
+        {'item_id': 'C1', 'order_id': 'C', 'clover_name': 'Bowl', 'final_price': 12.0, 'item_level_discount_amount': 0},
+    ], 'item_id')
+    seed(db, 'clover_orders_items_modifications', [
+        {'item_id': 'A1', 'modifier_name': 'Cheese', 'price': 1.5},
+        {'item_id': 'C1', 'modifier_name': 'Rice', 'price': 2.0},
+    ], 'item_id')
+    seed(db, 'clover_orders_payments', [
+        {'order_id': 'A', 'tip_amount': 2.0, 'tax_amount': 1.0},
+        {'order_id': 'C', 'tip_amount': 4.0, 'tax_amount': 2.0},
+    ], 'order_id')
+    return repository
+
+
+class TestAnalyticsStore:
+    def test_weekday_follows_mysql_numbering(self):
+        assert "strftime('%w', co.created_time)" in to_sqlite("SELECT WEEKDAY(co.created_time) WHERE x = %s")
+        assert '?' in to_sqlite("WHERE x = %s")
+
+    def test_daily_summary_runs_joins_and_group_by(self, repository):
+        current, historical = repository.get_daily_summary(datetime(2025, 1, 1), datetime(2025, 3, 11))
+
+        assert current == {'total_sales': 40.0, 'total_tips': 4.0, 'total_mods': 2.0,
+                           'order_discounts': 0.0, 'item_discounts': 0.0}
+        assert historical == {'avg_total_sales': 30.0, 'avg_total_tips': 2.0, 'avg_total_mods': 1.5,
+                              'avg_order_discounts': 1.0, 'avg_item_discounts': 0.5}
+
+    def test_orders_between_dates_with_left_join(self, repository):
+        df = repository.get_historical_orders(datetime(2025, 3, 1), datetime(2025, 3, 31))
+
+        assert sorted(df['order_id']) == ['A', 'B', 'C']
+        assert dict(zip(df['order_id'], df['tip_amount'])) == {'A': 2.0, 'B': 0, 'C': 4.0}
+        assert set(df['weekday']) == {0}
+
+    def test_order_items_grouped(self, repository):
+        order = repository.get_order_by_id('A')
+
+        assert order.created_time == datetime(2025, 3, 3, 9, 0)
+        assert [(i.clover_name, i.quantity, float(i.total_price)) for i in order.items] == [('Taco', 2, 16.0)]
+
+    def test_mirror_reloads_after_json_changes(self, repository):
+        query = "SELECT DATE(created_time) as date, SUM(total) as total FROM clover_orders " \
+                "WHERE created_time BETWEEN %s AND %s GROUP BY DATE(created_time)"
+        params = (datetime(2025, 3, 10), datetime(2025, 3, 11))
+        assert repository.db.fetch_all(query, params) == [{'date': date(2025, 3, 10), 'total': 40.0}]
+
+        seed(repository.db, 'clover_orders', [{'order_id': 'D', 'created_time': '2025-03-10T15:00:00',
+                                               'total': 5.0}], 'order_id')
+
+        assert repository.db.fetch_all(query, params) == [{'date': date(2025, 3, 10), 'total': 45.0}]
@@ -0,0 +1,283 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+import shared.api_manager as api_module
+from shared.api_manager import APIManager
+
+
+def make_response(status_code=200, json_data=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = json_data if json_data is not None else []
+    response.headers = headers or {}
+    response.text = ''
+    return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def api():
+    fake_secrets = {'MRPEASY_API_KEY': 'key', 'MRPEASY_API_SECRET': 'secret'}
+    with patch.object(api_module, 'secrets', fake_secrets), \
+            patch.object(api_module, '_sessions', {}), \
+            patch.object(api_module, '_rate_limiter', MagicMock()), \
+            patch.object(api_module.time, 'sleep'):
+        manager = APIManager()
+        manager.session = MagicMock()
+        yield manager
+
+
+class TestTransport:
+    def test_sessions_are_shared_between_instances(self):
+        fake_secrets = {'MRPEASY_API_KEY': 'key', 'MRPEASY_API_SECRET': 'secret'}
+        with patch.object(api_module, 'secrets', fake_secrets), patch.object(api_module, '_sessions', {}):
+            assert APIManager().session is APIManager().session
+
+    def test_endpoint_timeout_is_applied(self, api):
+        api.session.request.return_value = make_response(200, {'code': 'L1'})
+
+        api._request('GET', 'lots/5')
+
+        _, kwargs = api.session.request.call_args
+        assert kwargs['timeout'] == api_module.ENDPOINT_TIMEOUTS['lots']
+
+    def test_retries_429_then_succeeds(self, api):
+        api.session.request.side_effect = [
+            make_response(429, headers={'Retry-After': '2'}),
+            make_response(200, {'code': 'PO1'}),
+        ]
+
+        response = api._request('GET', 'purchase-orders/1')
+
+        assert response.status_code == 200
+        assert api.session.request.call_count == 2
+
+    def test_post_is_not_retried_on_server_error(self, api):
+        api.session.request.return_value = make_response(502)
+
+        response = api._request('POST', 'manufacturing-orders', json={})
+
+        assert response.status_code == 502
+        assert api.session.request.call_count == 1
+
+
+    def test_get_is_retried_on_read_timeout(self, api):
+        api.session.request.side_effect = [
+            api_module.requests.exceptions.ReadTimeout(),
+            make_response(200, {'code': 'L1'}),
+        ]
+
+        response = api._request('GET', 'lots/5')
+
+        assert response.status_code == 200
+        assert api.session.request.call_count == 2
+
+    def test_pool_size_from_secrets(self):
+        fake_secrets = {'MRPEASY_API_KEY': 'key', 'MRPEASY_API_SECRET': 'secret', 'MRPEASY_POOL_SIZE': '7'}
+        with patch.object(api_module, 'secrets', fake_secrets), patch.object(api_module, '_sessions', {}):
+            APIManager()
+            assert ('key', 'secret', 7) in api_module._sessions
+
+def page_response(start, total, size=100):
+    rows = [{'id': i} for i in range(start, min(start + size, total))]
+    end = start + len(rows) - 1
+    return make_response(206, rows, {'Content-Range': f'items {start}-{end}/{total}'})
+
+
+class TestPagination:
+    def test_parse_content_range_total(self):
+        assert api_module._parse_content_range_total('items 0-99/1523') == 1523
+        assert api_module._parse_content_range_total('items 0-99/*') is None
+        assert api_module._parse_content_range_total(None) is None
+
+    def test_fetch_all_uses_content_range_total(self, api):
+        def respond(method, url, **kwargs):
+            start = int(kwargs['headers']['range'].split('=')[1].split('-')[0])
+            return page_response(start, 250)
+        api.session.request.side_effect = respond
+
+        rows = api.fetch_all('items')
+
+        assert [row['id'] for row in rows] == list(range(250))
+        # Exactly three pages, no trailing empty-page probe
+        assert api.session.request.call_count == 3
+
+    def test_fetch_all_without_total_stops_on_short_page(self, api):
+        api.session.request.side_effect = [
+            make_response(200, [{'id': i} for i in range(100)]),
+            make_response(200, [{'id': 100}]),
+        ]
+
+        rows = api.fetch_all('units')
+
+        assert len(rows) == 101
+        assert api.session.request.call_count == 2
+
+    def test_fetch_all_without_total_follows_capped_pages(self, api):
+        def respond(method, url, **kwargs):
+            start = int(kwargs['headers']['range'].split('=')[1].split('-')[0])
+            rows = [{'id': i} for i in range(start, min(start + 50, 120))]
+            return make_response(200, rows)
+        api.session.request.side_effect = respond
+
+        rows = api.fetch_all('lots')
+
+        assert [row['id'] for row in rows] == list(range(120))
+        # 50 + 50 + 20 rows; the short third page ends the walk
+        assert api.session.request.call_count == 3
+
+    def test_error_on_later_page_cancels_queued_pages(self, api):
+        release = threading.Event()
+        requested = []
+
+        def respond(method, url, **kwargs):
+            start = int(kwargs['headers']['range'].split('=')[1].split('-')[0])
+            requested.append(start)
+            if start == 200:
+                return make_response(401)
+            if start >= 300:
+                # Hold the single worker so later pages are still queued when page 3 fails
+                release.wait(5)
+            return page_response(start, 1000)
+        api.session.request.side_effect = respond
+
+        with pytest.raises(api_module.MRPeasyAPIError):
+            list(api.iter_pages('lots', max_workers=1))
+        release.set()
+
+        assert max(requested) <= 300
+
+    def test_list_fetch_returns_none_when_later_page_fails(self, api):
+        def respond(method, url, **kwargs):
+            start = int(kwargs['headers']['range'].split('=')[1].split('-')[0])
+            if start == 200:
+                return make_response(503)
+            return page_response(start, 500)
+        api.session.request.side_effect = respond
+
+        assert api.fetch_stock_lots() is None
+
+    def test_iter_pages_yields_in_order(self, api):
+        def respond(method, url, **kwargs):
+            start = int(kwargs['headers']['range'].split('=')[1].split('-')[0])
+            return page_response(start, 430)
+        api.session.request.side_effect = respond
+
+        firsts = [page[0]['id'] for page in api.iter_pages('lots')]
+
+        assert firsts == [0, 100, 200, 300, 400]
+
+    def test_list_fetch_returns_none_on_error(self, api):
+        api.session.request.return_value = make_response(401)
+
+        assert api.fetch_stock_lots() is None
+
+    def test_manufacturing_orders_error_is_described(self, api):
+        api.session.request.return_value = make_response(403)
+
+        with pytest.raises(ValueError, match='Access forbidden'):
+            api.fetch_manufacturing_orders()
+
+
+class TestTokenBucket:
+    @pytest.fixture
+    def clock(self):
+        clock = FakeClock()
+        with patch.object(api_module.time, 'monotonic', clock.monotonic), \
+                patch.object(api_module.time, 'sleep', clock.sleep):
+            yield clock
+
+    def test_burst_is_free_then_paced_at_quota(self, clock):
+        bucket = api_module.TokenBucket(60, burst=3)
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(1.0)
+        assert waits[4] == pytest.approx(1.0)
+
+    def test_penalize_blocks_all_callers(self, clock):
+        bucket = api_module.TokenBucket(600, burst=10)
+        bucket.penalize(30)
+
+        waited = bucket.acquire()
+
+        assert waited >= 30
+
+    def test_429_penalizes_shared_limiter(self, api):
+        api.session.request.side_effect = [
+            make_response(429, headers={'Retry-After': '5'}),
+            make_response(200, []),
+        ]
+        api._request('GET', 'lots')
+
+        api_module.get_rate_limiter().penalize.assert_called_once_with(5.0)
+
+    def test_final_429_still_penalizes_shared_limiter(self, api):
+        api.session.request.return_value = make_response(429, headers={'Retry-After': '7'})
+
+        response = api._request('GET', 'lots')
+
+        assert response.status_code == 429
+        limiter = api_module.get_rate_limiter()
+        assert limiter.penalize.call_count == api_module.MAX_RETRIES + 1
+
+
+class TestPurchaseOrderCache:
+    def test_each_po_is_fetched_once(self):
+        api = MagicMock()
+        api.get_single_purchase_order.side_effect = lambda po_id: {'pur_ord_id': po_id}
+        cache = api_module.PurchaseOrderCache()
+
+        for po_id in [1, 2, 1, 1, 2]:
+            assert cache.get(api, po_id) == {'pur_ord_id': po_id}
+
+        assert api.get_single_purchase_order.call_count == 2
+
+    def test_concurrent_callers_share_one_request(self):
+        release = threading.Event()
+        api = MagicMock()
+
+        def slow_fetch(po_id):
+            release.wait(5)
+            return {'pur_ord_id': po_id}
+        api.get_single_purchase_order.side_effect = slow_fetch
+        cache = api_module.PurchaseOrderCache()
+
+        threads = [threading.Thread(target=cache.get, args=(api, 7)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert api.get_single_purchase_order.call_count == 1
+
+    def test_failures_are_not_cached(self):
+        api = MagicMock()
+        api.get_single_purchase_order.side_effect = [None, {'pur_ord_id': 3}]
+        cache = api_module.PurchaseOrderCache()
+
+        assert cache.get(api, 3) is None
+        assert cache.get(api, 3) == {'pur_ord_id': 3}
+
+    def test_prefetch_skips_cached_ids(self):
+        api = MagicMock()
+        api.get_single_purchase_order.side_effect = lambda po_id: {'pur_ord_id': po_id}
+        cache = api_module.PurchaseOrderCache()
+        cache.get(api, 1)
+
+        cache.prefetch(api, [1, 2, 3, None])
+
+        fetched = sorted(call.args[0] for call in api.get_single_purchase_order.call_args_list)
+        assert fetched == [1, 2, 3]
@@ -0,0 +1,42 @@
+import os
+import pytest
+from shared.bom_parts import find_bom_parts_csv, get_bom_parts_index
+
+HEADER = 'Product number,BOM number,BOM name,Part No.,Part description,Quantity,Unit of measurement\n'
+
+
+@pytest.fixture
+def parts_csv(tmp_path):
+    path = tmp_path / 'parts_1.csv'
+    path.write_text(HEADER +
+                    'A00534,BOM1,Borek,P1,Flour,1.50,kg\n'
+                    'A00534-del,BOM1,Borek,P2,Feta,2,kg\n'
+                    'A00558,BOM2,Soup,P3,Lentils,0.25,\n', encoding='utf-8')
+    return path
+
+
+class TestBomParts:
+    def test_rows_grouped_by_base_product_number(self, parts_csv):
+        index = get_bom_parts_index(parts_csv)
+
+        assert index.get('a00534-DEL') == {'bom_number': 'BOM1', 'bom_name': 'Borek',
+                                           'rows': [('P1', 'Flour', '1.5 kg'), ('P2', 'Feta', '2 kg')]}
+        assert index.get('A00558')['rows'] == [('P3', 'Lentils', '0.25')]
+        assert index.get('A99999') is None
+
+    def test_reloaded_when_the_file_changes(self, parts_csv):
+        index = get_bom_parts_index(parts_csv)
+        assert index.get('A00600') is None
+
+        parts_csv.write_text(HEADER + 'A00600,BOM3,Pilaf,P9,Rice,3,kg\n', encoding='utf-8')
+        os.utime(parts_csv, ns=(1, 1))
+
+        assert index.get('A00600')['rows'] == [('P9', 'Rice', '3 kg')]
+        assert index.get('A00534') is None
+
+    def test_fixed_file_wins_over_newest_export(self, tmp_path, parts_csv):
+        assert find_bom_parts_csv(tmp_path) == str(parts_csv)
+
+        (tmp_path / 'bom_parts.csv').write_text(HEADER, encoding='utf-8')
+
+        assert find_bom_parts_csv(tmp_path) == str(tmp_path / 'bom_parts.csv')
@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from organizer.print_mo.cache_manager import CacheManager
+
+
+@pytest.fixture
+def cache_manager():
+    CacheManager._instance = None
+    reference_cache = MagicMock()
+    reference_cache.get_all.side_effect = lambda entity, api: {
+        'items': [
+            {'code': 'A1567', 'product_id': 10, 'article_id': 110, 'title': 'Cheese Borek'},
+            {'code': 'b200', 'product_id': 20, 'article_id': 120, 'title': 'Flour'},
+        ],
+        'lots': [{'code': 'L1', 'lot_id': 1}],
+    }[entity]
+    with patch('organizer.print_mo.cache_manager.get_reference_cache', return_value=reference_cache):
+        manager = CacheManager()
+        manager.initialize_cache(MagicMock())
+        yield manager
+    CacheManager._instance = None
+
+
+class TestCacheManagerIndexes:
+    def test_lookup_by_product_id(self, cache_manager):
+        assert cache_manager.get_product_by_id(20)['title'] == 'Flour'
+        assert cache_manager.get_product_by_id(99) is None
+
+    def test_lookup_by_article_id(self, cache_manager):
+        assert cache_manager.get_product_by_article_id(110)['code'] == 'A1567'
+
+    def test_lookup_by_code_is_case_insensitive(self, cache_manager):
+        assert cache_manager.get_product('A1567')['product_id'] == 10
+        assert cache_manager.get_product('B200 ')['product_id'] == 20
+
+    def test_clear_cache_drops_indexes(self, cache_manager):
+        with patch('organizer.print_mo.cache_manager.get_reference_cache'):
+            cache_manager.clear_cache()
+        assert cache_manager.get_product_by_id(10) is None
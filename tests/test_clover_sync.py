@@ -0,0 +1,109 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+import pages.analysis_folfol_import_sales as sales_module
+from shared.database_operations import DatabaseOperations
+from shared.table_store import get_table_store
+from pages.analysis_folfol_import_sales import CloverAPI, CloverSalesImporter
+
+
+def make_order(n):
+    return {'id': f'O{n}', 'createdTime': 1700000000000 + n * 1000, 'total': 1000,
+            'lineItems': {'elements': []}}
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    importer = CloverSalesImporter.__new__(CloverSalesImporter)
+    importer.db_ops = DatabaseOperations()
+    importer.api = CloverAPI.__new__(CloverAPI)
+    importer.api.config = sales_module.Config()
+    importer.api._fetch_line_items_batch = lambda ids: [{'order_id': i, 'items': []} for i in ids]
+    return importer
+
+
+def saved_order_ids(importer):
+    store = get_table_store(importer.db_ops.db._get_table_file('clover_orders'))
+    return sorted(row['order_id'] for row in store.rows())
+
+
+class TestCloverSync:
+    def test_interrupted_sync_resumes_at_saved_offset(self, importer):
+        importer.db_ops.save_sync_state(since_ms=None, offset=0, high_water_ms=1700000000000)
+        pages = {0: [make_order(1), make_order(2)], 2: [make_order(3)]}
+        requested = []
+
+        def crash_on_second_page(since_ms, offset):
+            requested.append(offset)
+            if offset == 2:
+                raise RuntimeError('connection reset')
+            return pages.get(offset, [])
+        importer.api._fetch_orders_page = crash_on_second_page
+        importer.run_update()
+
+        state = importer.db_ops.get_sync_state()
+        assert saved_order_ids(importer) == ['O1', 'O2']
+        assert (state['offset'], state['high_water_ms']) == (2, make_order(2)['createdTime'])
+
+        requested.clear()
+        importer.api._fetch_orders_page = MagicMock(side_effect=lambda since_ms, offset: pages.get(offset, []))
+        importer.run_update()
+
+        # Only the pages after the checkpoint are downloaded again
+        assert [c.args for c in importer.api._fetch_orders_page.call_args_list] == [
+            (state['since_ms'], 2), (state['since_ms'], 3)]
+        assert saved_order_ids(importer) == ['O1', 'O2', 'O3']
+        state = importer.db_ops.get_sync_state()
+        assert (state['since_ms'], state['offset']) == (None, 0)
+        assert state['high_water_ms'] == make_order(3)['createdTime']
+
+    def test_next_run_starts_from_high_water_mark(self, importer):
+        importer.db_ops.save_sync_state(since_ms=None, offset=0, high_water_ms=1700000005000)
+        importer.api._fetch_orders_page = MagicMock(return_value=[])
+
+        importer.run_update()
+
+        importer.api._fetch_orders_page.assert_called_once_with(1700000005000, 0)
+
+
+def http_error(status, headers=None):
+    response = MagicMock(status_code=status, headers=headers or {})
+    return requests.exceptions.HTTPError(response=response)
+
+
+@pytest.fixture
+def api():
+    api = CloverAPI.__new__(CloverAPI)
+    api.config = sales_module.Config()
+    with patch.object(sales_module, '_clover_limiter', MagicMock()), \
+            patch.object(sales_module.Config, 'get_clover_merchant_id', return_value='M1'):
+        yield api
+
+
+class TestExpandedLineItems:
+    def test_only_incomplete_expansions_are_backfilled(self, api):
+        item = {'id': 'I1', 'price': 500, 'discounts': {'elements': []}}
+        orders = [
+            {'id': 'A', 'lineItems': {'elements': [item]}},
+            {'id': 'B'},
+            {'id': 'C', 'lineItems': {'elements': [{'id': 'I2', 'discounts': {'href': 'x'}}]}},
+            {'id': 'D', 'lineItems': {'elements': [{'id': str(i)} for i in range(100)]}},
+        ]
+        api._make_request = MagicMock(return_value={'elements': [{'id': 'fetched'}]})
+
+        assert api._attach_line_items(orders) == 3
+
+        fetched = sorted(c.args[0].split('/')[-2] for c in api._make_request.call_args_list)
+        assert fetched == ['B', 'C', 'D']
+        assert orders[0]['detailed_line_items'] == [item]
+        assert orders[1]['detailed_line_items'] == [{'id': 'fetched'}]
+
+    def test_429_penalizes_shared_limiter_and_retries(self, api):
+        api._make_request = MagicMock(side_effect=[
+            http_error(429, {'Retry-After': '3'}),
+            {'elements': [{'id': 'I1'}]},
+        ])
+
+        assert api._fetch_order_line_items('A') == {'order_id': 'A', 'items': [{'id': 'I1'}]}
+        sales_module._clover_limiter.penalize.assert_called_once_with(3.0)
@@ -0,0 +1,48 @@
+import pytest
+from PyPDF2 import PdfReader
+from reportlab.lib.pagesizes import inch
+from shared.label_pdf import LabelSheet, code128_drawing, draw_code128
+
+
+def draw_lot(lot):
+    def draw(c):
+        c.setFont("Helvetica", 20)
+        c.drawString(0.05 * inch, 0.5 * inch, lot)
+        draw_code128(c, lot, 0, 0.70 * inch, 1.27 * inch, 0.30 * inch)
+    return draw
+
+
+class TestLabelSheet:
+    def test_all_labels_in_one_pdf_with_one_form_per_label(self):
+        sheet = LabelSheet()
+        assert sheet.add('L0001', draw_lot('L0001'), copies=30) == 30
+        assert sheet.add('L0002', draw_lot('L0002'), copies=2) == 2
+        assert sheet.add('L0001', lambda c: pytest.fail("label drawn twice"), copies=1) == 1
+        reader = PdfReader(sheet.save())
+
+        assert len(reader.pages) == sheet.pages == 33
+        assert 'L0001' in reader.pages[0].extract_text()
+        assert 'L0002' in reader.pages[31].extract_text()
+        assert 'L0001' in reader.pages[32].extract_text()
+        forms = {page['/Resources']['/XObject'].raw_get(name).idnum
+                 for page in reader.pages[:30] for name in page['/Resources']['/XObject']}
+        assert len(forms) == 1
+
+    def test_failed_label_adds_no_pages(self):
+        sheet = LabelSheet()
+
+        def broken(c):
+            c.drawString(0, 0, 'half drawn')
+            raise ZeroDivisionError
+
+        with pytest.raises(ZeroDivisionError):
+            sheet.add('bad', broken, copies=3)
+        assert sheet.add('L0003', draw_lot('L0003'), copies=1) == 1
+        reader = PdfReader(sheet.save())
+        assert len(reader.pages) == 1 and 'L0003' in reader.pages[0].extract_text()
+
+    def test_barcode_drawing_is_cached_per_value(self):
+        first = code128_drawing('L0004', 1.27 * inch, 0.30 * inch)
+        assert code128_drawing('L0004', 1.27 * inch, 0.30 * inch) is first
+        assert code128_drawing('L0005', 1.27 * inch, 0.30 * inch) is not first
+        assert (round(first.width), round(first.height)) == (round(1.27 * inch), round(0.30 * inch))
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import MagicMock
+from shared.reference_cache import ReferenceCache
+import shared.mo_lot_index as index_module
+from shared.mo_lot_index import MOLotIndex, normalize_lot_code
+from shared.mo_lookup import MOLookup
+
+
+def mo(mo_id, *lot_codes, created=100):
+    return {'man_ord_id': mo_id, 'code': f'MO{mo_id}', 'created': created,
+            'target_lots': [{'code': code} for code in lot_codes]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReferenceCache(tmp_path / 'reference_cache.db')
+
+
+def make_api(*responses):
+    api = MagicMock()
+    api.iter_pages.side_effect = [iter(pages) for pages in responses]
+    return api
+
+
+class TestMOLotIndex:
+    def test_normalize_lot_code(self):
+        assert normalize_lot_code(' l33126 ') == '33126'
+        assert normalize_lot_code('33126') == '33126'
+
+    def test_lookup_with_and_without_prefix(self, cache):
+        api = make_api([[mo(1, 'L100'), mo(2, 'L200', 'L201')]])
+        index = MOLotIndex(cache)
+
+        assert [m['mo']['code'] for m in index.find('200', api)] == ['MO2']
+        assert index.find('l201', api)[0]['lot_code'] == 'L201'
+        # One download serves every lookup
+        assert api.iter_pages.call_count == 1
+
+    def test_miss_triggers_delta_refresh(self, cache, monkeypatch):
+        api = make_api([[mo(1, 'L100')]], [[mo(3, 'L300', created=500)]])
+        index = MOLotIndex(cache)
+        index.find('L100', api)
+        monkeypatch.setattr(index_module, 'MISS_REFRESH_SECONDS', -1)
+
+        matches = index.find('L300', api)
+
+        assert [m['mo']['code'] for m in matches] == ['MO3']
+        _, params = api.iter_pages.call_args[0]
+        assert params == {'created_min': 100}
+
+
+class TestMOLookupSlowPath:
+    def test_unknown_lot_uses_index_and_fresh_details(self, cache):
+        api = make_api([[mo(7, 'L700')]])
+        api.get_single_lot.return_value = None
+        api.get_manufacturing_order_details.return_value = {**mo(7, 'L700'), 'status': 30}
+
+        ok, mo_data, _ = MOLookup(api, MOLotIndex(cache)).find_mo_by_lot_code('700')
+
+        assert ok
+        assert (mo_data['mo_number'], mo_data['status'], mo_data['lot_code']) == ('MO7', 30, 'L700')
+        api.fetch_manufacturing_orders.assert_not_called()
+
+    def test_lot_on_two_mos_is_rejected(self, cache):
+        api = make_api([[mo(1, 'L5'), mo(2, 'L5')]])
+        api.get_single_lot.return_value = None
+
+        ok, _, message = MOLookup(api, MOLotIndex(cache)).find_mo_by_lot_code('L5')
+
+        assert not ok
+        assert 'Multiple Manufacturing Orders' in message
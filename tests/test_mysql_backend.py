@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import shared.mysql_backend as mysql_module
+from shared.mysql_backend import ConnectionPool
+
+
+@pytest.fixture
+def connect():
+    with patch.object(mysql_module, '_connect', side_effect=lambda cfg: MagicMock()) as connect:
+        yield connect
+
+
+class TestConnectionPool:
+    def test_connections_are_reused(self, connect):
+        pool = ConnectionPool({}, max_size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert connect.call_count == 1
+        first.ping.assert_called_once_with(reconnect=True)
+
+    def test_idle_connections_are_recycled(self, connect):
+        pool = ConnectionPool({}, max_size=2, idle_seconds=0)
+        with pool.connection() as first:
+            pass
+
+        with patch.object(mysql_module.time, 'monotonic', return_value=10 ** 9):
+            with pool.connection() as second:
+                pass
+
+        assert second is not first
+        first.close.assert_called_once()
+
+    def test_unhealthy_connection_is_replaced(self, connect):
+        pool = ConnectionPool({}, max_size=2)
+        with pool.connection() as first:
+            first.ping.side_effect = Exception('gone away')
+
+        with pool.connection() as second:
+            pass
+
+        assert second is not first
+
+    def test_pool_is_bounded(self, connect):
+        pool = ConnectionPool({}, max_size=1)
+        pool.acquire()
+
+        with patch.object(mysql_module, 'POOL_ACQUIRE_TIMEOUT', 0.01):
+            with pytest.raises(RuntimeError):
+                pool.acquire()
+
+    def test_schema_is_bootstrapped_once(self):
+        conn = MagicMock()
+        with patch.object(mysql_module, '_schema_ready', False), \
+                patch.object(mysql_module, 'ensure_table', return_value=True) as ensure_table:
+            mysql_module.ensure_schema(conn)
+            mysql_module.ensure_schema(conn)
+
+        ensure_table.assert_called_once_with(conn)
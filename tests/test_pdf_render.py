@@ -0,0 +1,30 @@
+from io import BytesIO
+from types import SimpleNamespace
+from PyPDF2 import PdfReader
+from organizer.print_mo.pdf_generator_bulk import PDFGenerator
+from shared.pdf_styles import paragraph_style
+
+
+def make_mo(n):
+    lot = SimpleNamespace(code=f'L{n:05d}', location='Freezer')
+    return SimpleNamespace(code=f'MO{n:05d}', start_date=1700000000, item_code='A1567', item_title='Cheese Borek',
+                           target_lots=[lot], quantity=10, unit='tray', parts=[], notes=[])
+
+
+def page_texts(pdf_bytes):
+    return [page.extract_text() for page in PdfReader(BytesIO(pdf_bytes)).pages]
+
+
+class TestPdfRender:
+    def test_styles_are_built_once(self):
+        assert PDFGenerator().title_style is PDFGenerator().title_style
+        assert paragraph_style('Probe', 'Heading1', fontSize=9) is not paragraph_style('Probe', 'Heading1', fontSize=10)
+
+    def test_parallel_render_keeps_every_mo_in_order(self):
+        mos = [make_mo(n) for n in range(24)]
+
+        serial = page_texts(PDFGenerator().create_combined_pdf(mos, max_workers=1))
+        parallel = page_texts(PDFGenerator().create_combined_pdf(mos, max_workers=3))
+
+        assert len(parallel) == len(serial) == 24
+        assert [f'MO{n:05d}' in text for n, text in enumerate(parallel)] == [True] * 24
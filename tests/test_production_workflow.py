@@ -0,0 +1,65 @@
+import threading
+from unittest.mock import MagicMock, patch
+from shared.production_workflow import ProductionWorkflow, _BatchLookupAPI
+
+
+def make_workflow():
+    with patch('shared.production_workflow.ProductionCapture'), \
+            patch('shared.production_workflow.MOLookup'), \
+            patch('shared.production_workflow.MOUpdate'), \
+            patch('shared.production_workflow.ProductionSummary'), \
+            patch('shared.production_workflow.ProductionLogger'), \
+            patch('shared.production_workflow.JSONStorage'):
+        return ProductionWorkflow()
+
+
+class TestBatchLookupAPI:
+    def test_mo_details_are_fetched_once_for_concurrent_lots(self):
+        release = threading.Event()
+        api = MagicMock()
+
+        def slow_details(mo_id):
+            release.wait(5)
+            return {'man_ord_id': mo_id}
+        api.get_manufacturing_order_details.side_effect = slow_details
+        batch_api = _BatchLookupAPI(api)
+
+        threads = [threading.Thread(target=batch_api.get_manufacturing_order_details, args=(9,))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert api.get_manufacturing_order_details.call_count == 1
+        # Other calls go straight to the real API
+        batch_api.update_stock_lot(1)
+        api.update_stock_lot.assert_called_once_with(1)
+
+    def test_failed_lookup_is_not_shared(self):
+        api = MagicMock()
+        api.get_single_lot.side_effect = [RuntimeError('timeout'), {'code': 'L1'}]
+        batch_api = _BatchLookupAPI(api)
+
+        try:
+            batch_api.get_single_lot('L1')
+        except RuntimeError:
+            pass
+
+        assert batch_api.get_single_lot('L1') == {'code': 'L1'}
+
+
+class TestProcessBatch:
+    def test_every_lot_is_reported(self):
+        workflow = make_workflow()
+        entries = [{'id': i, 'lot_code': f'L{i}', 'quantity': 1} for i in range(6)]
+
+        def run(lot_code, quantity, uom, item_code, lookup, mo_locks):
+            return lot_code != 'L3', None, lot_code
+        with patch.object(workflow, '_run_workflow', side_effect=run):
+            results = list(workflow.process_batch(entries, max_workers=3))
+
+        assert sorted(r['index'] for r in results) == list(range(6))
+        assert [r['lot_code'] for r in results if not r['success']] == ['L3']
+        assert all(r['entry'] is entries[r['index']] for r in results)
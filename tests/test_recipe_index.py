@@ -0,0 +1,76 @@
+import pytest
+import zipfile
+from io import BytesIO
+from unittest.mock import patch
+from reportlab.pdfgen import canvas
+import shared.recipe_index as recipe_index
+from shared.pdf_text import extract_pdf_texts
+from shared.recipe_index import RecipeIndex
+
+
+def make_pdf(*lines):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for i, line in enumerate(lines):
+        pdf.drawString(72, 720 - i * 20, line)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def write_zip(path, files):
+    with zipfile.ZipFile(path, 'w') as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+
+
+BOREK = make_pdf('A1567 - Cheese Borek', 'Ingredients', 'Feta 200 g')
+
+
+@pytest.fixture
+def recipes_zip(tmp_path):
+    path = tmp_path / 'recipespdf.zip'
+    write_zip(path, {
+        'recipe_A1567_Cheese_Borek_-_tray.pdf': BOREK,
+        'recipe_Spinach_Pie.pdf': make_pdf('Spinach Pie', 'Ingredients', 'Spinach 1 kg'),
+    })
+    return path
+
+
+class TestRecipeIndex:
+    def test_finds_by_code_then_title(self, recipes_zip):
+        index = RecipeIndex(recipes_zip)
+
+        assert index.find('a1567', 'anything')['pdf_name'] == 'recipe_A1567_Cheese_Borek_-_tray.pdf'
+        assert index.find('A9999', 'Spinach Pie - Tray')['pdf_name'] == 'recipe_Spinach_Pie.pdf'
+        assert index.find('A9999', 'Spinach Pies')['pdf_name'] == 'recipe_Spinach_Pie.pdf'
+        # A title match never returns a recipe carrying another item code
+        assert index.find('A9999', 'Cheese Borek') is None
+
+    def test_persisted_index_is_reused_until_the_zip_changes(self, recipes_zip):
+        RecipeIndex(recipes_zip).find('A1567', '')
+        assert recipes_zip.with_suffix('.index.json').exists()
+
+        with patch.object(recipe_index, 'extract_pdf_texts') as extract:
+            assert RecipeIndex(recipes_zip).find('A1567', '')['item_code'] == 'A1567'
+        extract.assert_not_called()
+
+        write_zip(recipes_zip, {
+            'renamed/borek.pdf': BOREK,
+            'recipe_A2000_Lentil_Soup.pdf': make_pdf('A2000 Lentil Soup', 'Ingredients'),
+        })
+        with patch.object(recipe_index, 'extract_pdf_texts', wraps=recipe_index.extract_pdf_texts) as extract:
+            index = RecipeIndex(recipes_zip)
+            assert index.find('A2000', '')['pdf_name'] == 'recipe_A2000_Lentil_Soup.pdf'
+            assert index.find('A1567', '')['pdf_name'] == 'renamed/borek.pdf'
+            assert index.find('', 'Spinach Pie') is None
+        # Only the new PDF was parsed; the renamed one is reused by content hash
+        assert [name for name, _ in extract.call_args.args[0]] == ['recipe_A2000_Lentil_Soup.pdf']
+
+    def test_pool_extracts_every_pdf(self):
+        pdfs = [(f'{n}.pdf', make_pdf(f'A100{n} Recipe {n}')) for n in range(5)]
+
+        results = {name: (text, error) for name, text, error in extract_pdf_texts(pdfs + [('bad.pdf', b'nope')],
+                                                                                 max_workers=2)}
+
+        assert all(f'A100{n}' in results[f'{n}.pdf'][0] for n in range(5))
+        assert results['bad.pdf'][0] is None and results['bad.pdf'][1]
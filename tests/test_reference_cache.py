@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import MagicMock
+import shared.reference_cache as reference_module
+from shared.reference_cache import ReferenceCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReferenceCache(tmp_path / 'reference_cache.db')
+
+
+def make_api(*responses):
+    """Fake APIManager whose iter_pages returns the given page lists, one call each."""
+    api = MagicMock()
+    api.iter_pages.side_effect = [iter(pages) for pages in responses]
+    return api
+
+
+class TestReferenceCache:
+    def test_first_read_loads_and_persists(self, cache, tmp_path):
+        api = make_api([[{'article_id': 1, 'code': 'A1', 'updated': 100}],
+                        [{'article_id': 2, 'code': 'A2', 'updated': 200}]])
+
+        rows = cache.get_all('items', api)
+
+        assert sorted(row['code'] for row in rows) == ['A1', 'A2']
+        # A new instance on the same file (an app restart) reads from disk
+        reopened = ReferenceCache(tmp_path / 'reference_cache.db')
+        assert len(reopened.get_all('items', make_api())) == 2
+
+    def test_delta_refresh_uses_high_water_mark(self, cache):
+        api = make_api(
+            [[{'article_id': 1, 'code': 'A1', 'updated': 100}]],
+            [[{'article_id': 1, 'code': 'A1', 'title': 'New', 'updated': 300}]],
+        )
+        cache.refresh('items', api)
+
+        cache.refresh('items', api)
+
+        _, params = api.iter_pages.call_args[0]
+        assert params == {'updated_min': 100}
+        rows = cache.load('items')
+        assert len(rows) == 1 and rows[0]['title'] == 'New'
+
+    def test_stale_rows_are_served_while_revalidating(self, cache, monkeypatch):
+        api = make_api([[{'unit_id': 1, 'title': 'kg'}]])
+        cache.refresh('units', api)
+        monkeypatch.setitem(reference_module.ENTITY_SETTINGS['units'], 'ttl_minutes', 0)
+        started = []
+        monkeypatch.setattr(cache, 'refresh_in_background', lambda entity, api: started.append(entity))
+
+        rows = cache.get_all('units', api)
+
+        assert rows == [{'unit_id': 1, 'title': 'kg'}]
+        assert started == ['units']
+
+    def test_invalidate_forces_full_reload(self, cache):
+        api = make_api(
+            [[{'lot_id': 1, 'code': 'L1', 'updated': 10}, {'lot_id': 2, 'code': 'L2', 'updated': 10}]],
+            [[{'lot_id': 2, 'code': 'L2', 'updated': 20}]],
+        )
+        cache.get_all('lots', api)
+        cache.invalidate('lots')
+
+        rows = cache.get_all('lots', api)
+
+        assert [row['code'] for row in rows] == ['L2']
+        assert api.iter_pages.call_args[0][1] is None
@@ -0,0 +1,97 @@
+import pytest
+import pandas as pd
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+from clover_sales_analysis.sales_analyzer import SalesAnalyzer
+from clover_sales_analysis.sales_analyzer_weekly import SalesAnalyzer as WeeklySalesAnalyzer
+from shared.sales_outliers import zscore_outliers
+
+ANALYSIS_DATE = datetime(2025, 3, 31)  # Monday
+
+
+def mondays_before(n):
+    return [ANALYSIS_DATE - timedelta(weeks=w) for w in range(n, 0, -1)]
+
+
+def make_analyzer(cls):
+    analyzer = cls.__new__(cls)
+    analyzer.repository = MagicMock()
+    analyzer.z_score_threshold = 2
+    analyzer.lookback_days = 60
+    return analyzer
+
+
+@pytest.fixture
+def items_df():
+    rows = []
+    for day, taco, bowl in zip(mondays_before(4) + [ANALYSIS_DATE], [10, 12, 11, 13, 40], [5, 6, 5, 6, 6]):
+        rows.append({'item_sku': 'TACO', 'item_name': 'Taco', 'category_name': 'Mains',
+                     'final_price': taco, 'created_time': day + timedelta(hours=12), 'order_id': 'x'})
+        rows.append({'item_sku': 'BOWL', 'item_name': 'Bowl', 'category_name': 'Sides',
+                     'final_price': bowl, 'created_time': day + timedelta(hours=13), 'order_id': 'y'})
+    # A different weekday is not part of the baseline
+    rows.append({'item_sku': 'TACO', 'item_name': 'Taco', 'category_name': 'Mains',
+                 'final_price': 500, 'created_time': ANALYSIS_DATE - timedelta(days=2), 'order_id': 'z'})
+    df = pd.DataFrame(rows)
+    df['weekday'] = df['created_time'].dt.weekday
+    return df
+
+
+@pytest.fixture
+def orders_df():
+    totals = [20, 22, 21, 19, 20, 23, 18, 21]
+    rows = [{'order_id': f'H{i}', 'total': t, 'tip_amount': 1.0, 'created_time': day,
+             'delivery_method': 'Pickup', 'delivery_platform': 'In-Store'}
+            for i, (t, day) in enumerate(zip(totals, mondays_before(8)))]
+    rows += [{'order_id': 'BIG', 'total': 400, 'tip_amount': 1.0, 'created_time': ANALYSIS_DATE,
+              'delivery_method': 'Delivery', 'delivery_platform': 'Doordash'},
+             {'order_id': 'OK', 'total': 21, 'tip_amount': 1.0, 'created_time': ANALYSIS_DATE,
+              'delivery_method': 'Pickup', 'delivery_platform': 'In-Store'}]
+    df = pd.DataFrame(rows)
+    df['weekday'] = df['created_time'].dt.weekday
+    return df
+
+
+class TestZscoreOutliers:
+    def test_groups_use_their_own_baseline(self):
+        frame = pd.DataFrame({'sku': ['A'] * 4 + ['B'] * 4,
+                              'value': [1, 2, 3, 10, 100, 101, 102, 101],
+                              'current': [False, False, False, True] * 2})
+
+        result = zscore_outliers(frame, 'value', frame['current'], ~frame['current'], 2, keys=['sku'])
+
+        assert result['sku'].tolist() == ['A']
+        assert result['historical_mean'].iloc[0] == 2
+        assert result['z_score'].iloc[0] == pytest.approx(8.0)
+
+
+class TestSalesAnalyzer:
+    def test_item_and_category_outliers(self, items_df):
+        analyzer = make_analyzer(SalesAnalyzer)
+
+        items = analyzer.detect_item_outliers(items_df, ANALYSIS_DATE)
+        categories = analyzer.detect_category_outliers(items_df, ANALYSIS_DATE)
+
+        assert [(o['item_sku'], o['item_name'], o['total_sales']) for o in items] == [('TACO', 'Taco', 40)]
+        assert items[0]['historical_mean_sales'] == 11.5
+        assert [o['category_name'] for o in categories] == ['Mains']
+
+    def test_order_outliers_fetch_items_in_one_query(self, orders_df):
+        analyzer = make_analyzer(SalesAnalyzer)
+        analyzer.repository.get_items_for_orders.return_value = {'BIG': ['item']}
+
+        outliers = analyzer.detect_order_outliers(orders_df, ANALYSIS_DATE)
+
+        assert [(o['order_id'], o['total'], o['items']) for o in outliers] == [('BIG', 400.0, ['item'])]
+        analyzer.repository.get_items_for_orders.assert_called_once_with(['BIG'])
+        analyzer.repository.get_order_items.assert_not_called()
+
+    def test_weekly_item_outliers_compare_with_weekly_totals(self, items_df):
+        analyzer = make_analyzer(WeeklySalesAnalyzer)
+        items_df['date'] = items_df['created_time'].dt.date
+        week_start = date(2025, 3, 31)
+
+        outliers = analyzer._detect_item_outliers(items_df[items_df['final_price'] < 500], week_start,
+                                                  week_start + timedelta(days=6))
+
+        assert [o['item_sku'] for o in outliers] == ['TACO']
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime
+from shared.database_operations import DatabaseOperations
+from shared.sales_rollup import ROLLUP_TABLE, rollup_days
+from shared.table_store import get_table_store
+from clover_sales_analysis.repository import SalesRepository
+from clover_sales_analysis.repository_weekly import SalesRepository as WeeklySalesRepository
+
+
+class FakeOrder:
+    """Stands in for CloverOrder: the tuples save_orders writes"""
+
+    def __init__(self, order_id, created_time, total, platform='In-Store', items=(), tip=0.0, order_discount=0.0):
+        self.order_id, self.created_time, self.total = order_id, created_time, total
+        self.platform, self.items, self.tip, self.order_discount = platform, items, tip, order_discount
+
+    def get_order_details(self):
+        return (self.order_id, self.created_time, '', self.platform, 'Pickup', '', 'USD', self.total, '', '',
+                None, None, self.order_discount, '{}', '[]')
+
+    def get_items(self):
+        return [(item_id, self.order_id, 'Taco', price, price, price, None, None, discount, sku, '', '')
+                for item_id, sku, price, discount, _ in self.items]
+
+    def get_modifications(self):
+        return [(item_id, 'Cheese', mod) for item_id, _, _, _, mod in self.items if mod]
+
+    def get_payments(self):
+        return [(self.order_id, self.tip, 0.0)]
+
+
+@pytest.fixture
+def db_ops(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DatabaseOperations()
+
+
+def rollup_rows(db_ops, level='platform'):
+    rows = get_table_store(db_ops.db._get_table_file(ROLLUP_TABLE)).rows()
+    return {(r['date'], r['platform'], r['item_sku']): r for r in rows if r['level'] == level}
+
+
+class TestSalesRollup:
+    def test_rollup_matches_saved_orders_and_upserts_replace(self, db_ops):
+        # 2025-03-03 and 2025-03-10 are Mondays
+        db_ops.save_orders([
+            FakeOrder('A', datetime(2025, 3, 3, 9), 20.0, items=[('A1', 'TACO', 8.0, 0.5, 1.5),
+                                                               ('A2', 'TACO', 8.0, 0.0, 0)], tip=2.0,
+                      order_discount=1.0),
+            FakeOrder('B', datetime(2025, 3, 3, 18), 10.0, platform='Doordash', items=[('B1', 'BOWL', 10.0, 0, 0)]),
+        ], show_progress=False)
+        # Clover re-sends order A with a new total, tip and item price
+        db_ops.save_orders([
+            FakeOrder('A', datetime(2025, 3, 3, 9), 12.0, items=[('A1', 'TACO', 8.0, 0.5, 1.5),
+                                                               ('A2', 'TACO', 4.0, 0.0, 0)], tip=3.0,
+                      order_discount=1.0),
+            FakeOrder('C', datetime(2025, 3, 10, 12), 40.0, items=[('C1', 'BOWL', 12.0, 0, 2.0)], tip=4.0),
+        ], show_progress=False)
+
+        platform = rollup_rows(db_ops)
+        in_store = platform[('2025-03-03', 'In-Store', '')]
+        assert (in_store['orders'], in_store['quantity'], in_store['total_sales'], in_store['total_tips'],
+                in_store['total_mods'], in_store['order_discounts'], in_store['item_discounts']) == \
+               (1, 2, 12.0, 3.0, 1.5, 1.0, 0.5)
+        assert platform[('2025-03-03', 'Doordash', '')]['total_sales'] == 10.0
+        assert platform[('2025-03-10', 'In-Store', '')]['weekday'] == 0
+        taco = rollup_rows(db_ops, 'sku')[('2025-03-03', 'In-Store', 'TACO')]
+        assert (taco['quantity'], taco['total_sales']) == (2, 12.0)
+
+        incremental = get_table_store(db_ops.db._get_table_file(ROLLUP_TABLE)).rows()
+        db_ops.rebuild_daily_rollup()
+        rebuilt = get_table_store(db_ops.db._get_table_file(ROLLUP_TABLE)).rows()
+        key = lambda row: row['rollup_key']
+        assert sorted(incremental, key=key) == sorted(rebuilt, key=key)
+
+    def test_summaries_read_the_rollup(self, db_ops):
+        db_ops.save_orders([
+            FakeOrder('A', datetime(2025, 3, 3, 9), 20.0, items=[('A1', 'TACO', 8.0, 0.5, 1.5)], tip=2.0),
+            FakeOrder('C', datetime(2025, 3, 10, 12), 40.0, items=[('C1', 'BOWL', 12.0, 0, 2.0)], tip=4.0),
+        ], show_progress=False)
+
+        current, historical = SalesRepository().get_daily_summary(datetime(2025, 1, 1), datetime(2025, 3, 11))
+        assert current == {'total_sales': 40.0, 'total_tips': 4.0, 'total_mods': 2.0,
+                           'order_discounts': 0.0, 'item_discounts': 0.0}
+        assert historical['avg_total_sales'] == 20.0
+
+        totals, weekly = WeeklySalesRepository().get_daily_summary(datetime(2025, 3, 1), datetime(2025, 3, 16))
+        assert (totals['total_sales'], totals['total_mods'], totals['item_discounts']) == (60.0, 3.5, 0.5)
+        assert weekly['avg_total_sales'] == 30.0
+
+    def test_range_ending_at_midnight_excludes_that_day(self):
+        assert rollup_days(datetime(2025, 3, 1), datetime(2025, 3, 11)) == \
+               (datetime(2025, 3, 1).date(), datetime(2025, 3, 10).date())
+        assert rollup_days(datetime(2025, 3, 1), datetime(2025, 3, 11, 23, 59))[1] == datetime(2025, 3, 11).date()
@@ -0,0 +1,70 @@
+import json
+import pytest
+from unittest.mock import patch
+import shared.table_store as store_module
+from shared.table_store import JsonTableStore
+from shared.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JsonTableStore(tmp_path / 'orders.json')
+
+
+class TestJsonTableStore:
+    def test_inserts_append_to_log_and_survive_reload(self, store, tmp_path):
+        store.upsert_many([{'id': 'A', 'total': 1}, {'id': 'B', 'total': 2}], 'id')
+
+        assert not (tmp_path / 'orders.json').exists()
+        assert len((tmp_path / 'orders.log.jsonl').read_text().splitlines()) == 2
+        reopened = JsonTableStore(tmp_path / 'orders.json')
+        assert [row['id'] for row in reopened.rows()] == ['A', 'B']
+
+    def test_upsert_replaces_or_merges_by_key(self, store):
+        store.upsert({'id': 'A', 'total': 1, 'note': 'x'}, 'id')
+
+        store.upsert({'id': 'A', 'total': 5}, 'id', merge=True)
+        assert store.rows() == [{'id': 'A', 'total': 5, 'note': 'x'}]
+
+        store.upsert({'id': 'A', 'total': 7}, 'id')
+        assert store.rows() == [{'id': 'A', 'total': 7}]
+
+    def test_log_is_compacted_into_snapshot(self, store, tmp_path):
+        with patch.object(store_module, 'COMPACT_MIN_ENTRIES', 3):
+            store.upsert_many([{'id': i} for i in range(1, 4)], 'id')
+
+        assert not (tmp_path / 'orders.log.jsonl').exists()
+        assert json.loads((tmp_path / 'orders.json').read_text()) == [{'id': 1}, {'id': 2}, {'id': 3}]
+        assert store.next_id() == 4
+
+    def test_truncated_log_line_is_skipped(self, store, tmp_path):
+        store.upsert({'id': 'A'}, 'id')
+        with open(tmp_path / 'orders.log.jsonl', 'a') as f:
+            f.write('{"pk": "id", "row": {"id"')
+
+        assert [row['id'] for row in JsonTableStore(tmp_path / 'orders.json').rows()] == ['A']
+
+
+class TestDatabaseManagerStorage:
+    def test_batch_insert_upserts_by_key(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        db = DatabaseManager()
+        query = ("INSERT INTO clover_orders (id, total) VALUES (%s, %s) "
+                 "ON DUPLICATE KEY UPDATE total = VALUES(total)")
+
+        db.execute_batch_insert(query, [('O1', 10), ('O2', 20), ('O1', 15)])
+
+        rows = store_module.get_table_store(db._get_table_file('clover_orders')).rows()
+        assert [(row['id'], row['total']) for row in rows] == [('O1', 15), ('O2', 20)]
+
+    def test_batch_insert_reports_chunks_and_assigns_ids(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        db = DatabaseManager()
+        query = "INSERT INTO erp_mo_to_import (lot_code, quantity) VALUES (%s, %s)"
+
+        with patch('shared.database_manager.DatabaseManager._use_mysql_for_erp_mo', return_value=False):
+            stats = db.execute_batch_insert(query, [(f'L{i}', i) for i in range(5)], chunk_size=2)
+
+        assert [(chunk['chunk'], chunk['rows']) for chunk in stats] == [(1, 2), (2, 2), (3, 1)]
+        rows = store_module.get_table_store(db._get_table_file('erp_mo_to_import')).rows()
+        assert [row['id'] for row in rows] == [1, 2, 3, 4, 5]
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+import shared.weightlabelprinter_helper as helper
+
+
+@pytest.fixture
+def label_db(tmp_path):
+    db_path = str(tmp_path / 'labels.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE history (lot TEXT, weight REAL, uom TEXT, container_type TEXT, "
+                 "voided_at TEXT, inserted_at TEXT)")
+    conn.executemany("INSERT INTO history VALUES (?, ?, ?, ?, ?, ?)", [
+        ('L100', 10.0, 'kg', None, None, '2025-02-03 08:00:00'),
+        ('100', 6.0, 'kg', None, None, '2025-02-04 09:00:00'),
+        (' L100 ', 99.0, 'kg', None, '2025-02-04', '2025-02-04 10:00:00'),
+        ('L200', 1.0, '', 'bag (4.5 L)', None, '2025-02-05 08:00:00'),
+        ('L200', 1.0, '', 'bag (4.5 L)', None, '2025-02-05 09:00:00'),
+        ('L300', 5.0, 'kg', None, None, '2025-01-15 08:00:00'),
+    ])
+    conn.commit()
+    conn.close()
+    helper._probe_label_printer_tables.cache_clear()
+    with patch.object(helper, '_get_label_printer_db_path', return_value=db_path):
+        yield db_path
+    helper._probe_label_printer_tables.cache_clear()
+
+
+class TestLabelPrinterSqliteSummary:
+    def test_single_query_matches_per_lot_aggregation(self, label_db):
+        summary = helper._get_label_printer_summary_from_sqlite('2025-02-01')
+
+        by_lot = {row['lot_code']: row for row in summary}
+        # L300 is before since_date; L100 groups '100' and ' L100 ' and skips the voided entry
+        assert sorted(by_lot) == ['L100', 'L200']
+        assert (by_lot['L100']['quantity'], by_lot['L100']['uom']) == (16.0, 'kg')
+        assert (by_lot['L200']['total_entries'], by_lot['L200']['uom']) == (2, 'bag (4.5 L)')
+        for lot, row in by_lot.items():
+            entries = helper._fetch_print_history_from_sqlite(label_db, lot)
+            assert helper._aggregate_print_history(entries) == (row['quantity'], row['uom'])
+
+    def test_lot_index_can_be_created(self, label_db):
+        assert helper.create_label_printer_lot_index(label_db) == 1
+
+        conn = sqlite3.connect(label_db)
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM history WHERE {helper._normalized_lot_sql('lot')} = 'L100'"
+        ).fetchall()
+        conn.close()
+        assert 'idx_history_lot_norm' in str(plan)
+
+
+class TestHistoryJsonCache:
+    def test_history_is_parsed_once_until_file_changes(self, tmp_path):
+        path = tmp_path / 'label_printer_history.json'
+        path.write_text(json.dumps([
+            {'lot': 'L500', 'weight': 2.5, 'uom': 'kg', 'voided_at': None},
+            {'lot_code': '500', 'weight': 1.5, 'uom': 'kg', 'voided_at': None},
+            {'lot': 'L501', 'weight': 9, 'uom': 'kg', 'voided_at': None},
+        ]))
+        with patch.object(helper, '_default_history_json_path', return_value=str(path)), \
+                patch.object(helper.json, 'load', wraps=json.load) as load:
+            assert helper.get_label_printer_quantity('500') == (4.0, 'kg')
+            assert helper.get_label_printer_quantity('L501') == (9.0, 'kg')
+            assert load.call_count == 1
+
+            path.write_text(json.dumps([{'lot': 'L500', 'weight': 7, 'uom': 'kg', 'voided_at': None}]))
+            assert helper.get_label_printer_quantity('L500') == (7.0, 'kg')
+            assert load.call_count == 2
+
+
+@pytest.fixture
+def label_mysql(tmp_path):
+    cursor = MagicMock()
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+    cfg = {'host': 'db', 'port': 3306, 'user': 'u', 'password': '', 'database': 'starship'}
+    with patch.object(helper, '_get_label_printer_mysql_config', return_value=cfg), \
+            patch('shared.mysql_backend.get_pool', return_value=pool), \
+            patch.object(helper, '_default_history_json_path', return_value=str(tmp_path / 'missing.json')):
+        yield pool, cursor
+
+
+class TestLabelPrinterMysql:
+    def test_quantities_for_many_lots_use_one_query(self, label_mysql):
+        pool, cursor = label_mysql
+        cursor.fetchall.return_value = [
+            {'lot_code': 'L100', 'weight': 4, 'uom': 'kg', 'container_type': None, 'voided_at': None},
+            {'lot_code': '100', 'weight': 6, 'uom': 'kg', 'container_type': None, 'voided_at': None},
+            {'lot_code': 'L200', 'weight': 1, 'uom': '', 'container_type': 'bag', 'voided_at': None},
+        ]
+
+        with patch.object(helper, '_get_label_printer_quantity_local', return_value=(None, None)) as local:
+            quantities = helper.get_label_printer_quantities(['L100', ' 200', 'L300'])
+
+        assert quantities == {'L100': (10.0, 'kg'), '200': (1, 'bag'), 'L300': (None, None)}
+        assert cursor.execute.call_count == 1
+        assert cursor.execute.call_args.args[1] == ['L100', '100', '200', 'L200', 'L300', '300']
+        assert pool.connection.call_count == 1
+        local.assert_called_once_with('L300')
+
+    def test_single_lot_reuses_the_pool(self, label_mysql):
+        pool, cursor = label_mysql
+        cursor.fetchall.return_value = [
+            {'lot_code': 'L7', 'weight': 2.5, 'uom': 'kg', 'container_type': None, 'voided_at': None},
+        ]
+
+        assert helper.get_label_printer_quantity('7') == (2.5, 'kg')
+        assert helper.get_label_printer_quantity('L7') == (2.5, 'kg')
+        assert pool.connection.call_count == 2
+        assert cursor.execute.call_args_list[0].args[0] == cursor.execute.call_args_list[1].args[0]